@@ -3,10 +3,22 @@ Plan-Execute Agent - AWS IDP 패턴 기반 150줄 구현
 """
 
 import boto3
+import copy
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 
+from core.page_cache import OCR_STORE_KB_IDS, get_page_cache, make_page_key
+from clause_index import clause_excerpt, get_clause_index, is_clause_lookup, parse_clause_reference
+from core.references import PageReference
+from entity_index import get_entity_index
+from graph_expansion import KB_GRAPH_ID, GraphExpander
+from lexical_index import get_lexical_index
+from ocr_snapshot import get_ocr_snapshot
+from ontology_facts import get_ontology_fact_index
+from semantic_cache import get_query_embedding_cache, get_semantic_answer_cache, query_signature
+
 class PlanExecuteAgent:
     """150줄 목표 Plan-Execute 에이전트 (MD 가이드 Phase 2)"""
     
@@ -17,6 +29,7 @@ class PlanExecuteAgent:
         self.bedrock_runtime = boto3.client('bedrock-runtime', region_name='us-west-2')
         self.dynamodb = boto3.resource('dynamodb', region_name='us-west-2')
         self.ocr_table_name = 'ship-firefighting-ocr'
+        self.retrieval_config = getattr(config, 'retrieval_config', None) or {}
         
         # 실제 Neptune KB의 11개 문서 (S3 버킷 기반)
         self.SHIP_DOCUMENTS = [
@@ -42,12 +55,79 @@ class PlanExecuteAgent:
         start_time = time.time()
         
         try:
+            # 조항 번호 직접 조회는 검색/Rerank 없이 해당 페이지로 응답
+            clause_response = self._answer_clause_lookup(message)
+            if clause_response:
+                return {
+                    "success": True,
+                    "content": clause_response["text"],
+                    "references": clause_response["references"],
+                    "response_time": time.time() - start_time,
+                    "agent_type": "plan_execute"
+                }
+            
+            # 거의 같은 질문(숫자/연결 엔티티까지 같음)은 캐시된 답변으로 응답 (질문 임베딩은 1회 계산 후 답변과 함께 저장)
+            linked_entities = self._link_entities(message)
+            signature = query_signature(message, [entity.entity_id for entity in linked_entities])
+            query_embedding = self._embed_query(message)
+            cached_answer = self._lookup_cached_answer(query_embedding, signature)
+            if cached_answer:
+                return {
+                    "success": True,
+                    "content": cached_answer.content,
+                    "references": cached_answer.references,
+                    "response_time": time.time() - start_time,
+                    "agent_type": "plan_execute"
+                }
+            
             # Stage 1: Plan + Execute
-            plan = self._create_document_plan(message)
-            search_results = self._execute_neptune_search(plan["english_query"])
+            plan = self._create_document_plan(message, linked_entities)
+            
+            adaptive_config = self.retrieval_config.get('adaptive_top_k', {})
+            adaptive = adaptive_config.get('enabled', False)
+            
+            # BM25(조항 번호 등 정확 일치)와 KB 벡터 검색을 병렬 실행 후 RRF로 결합
+            # 적응형 top-k: 작은 k로 먼저 검색하고 점수 분포가 약하면 큰 k로 다시 검색
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                lexical_future = executor.submit(self._execute_lexical_search, f"{message} {plan['english_query']}")
+                if adaptive:
+                    vector_results = self._execute_neptune_search(
+                        plan["english_query"], number_of_results=adaptive_config.get('initial_k', 5)
+                    )
+                    widened = self._is_weak_retrieval(vector_results, adaptive_config)
+                    if widened:
+                        vector_results = self._execute_neptune_search(
+                            plan["english_query"], number_of_results=adaptive_config.get('max_k', 20)
+                        )
+                else:
+                    vector_results = self._execute_neptune_search(plan["english_query"])
+                    widened = False
+                lexical_results = lexical_future.result()
+            search_results = self._fuse_results(vector_results, lexical_results)
+            
+            expanded_results = self._expand_with_graph(search_results, linked_entities)
+            ontology_facts = self._retrieve_ontology_facts(message, plan["english_query"])
             
-            # Stage 2: Rerank + Respond  
-            final_response = self._synthesize_response(message, search_results)
+            # Stage 2: Rerank + Respond
+            rerank_window = self._rerank_window(widened)
+            candidates = self._rerank_candidates(search_results, expanded_results, rerank_window)
+            reranked_docs = self._cohere_rerank(message, candidates, rerank_window + len(expanded_results))
+            
+            # Rerank 점수도 약하면 검색을 넓혀 한 번만 다시 Rerank
+            if adaptive and not widened and self._is_weak_rerank(reranked_docs, adaptive_config):
+                vector_results = self._execute_neptune_search(
+                    plan["english_query"], number_of_results=adaptive_config.get('max_k', 20)
+                )
+                search_results = self._fuse_results(vector_results, lexical_results)
+                search_keys = {result.text_key for result in search_results}
+                expanded_results = [chunk for chunk in expanded_results if chunk.text_key not in search_keys]
+                
+                rerank_window = self._rerank_window(True)
+                candidates = self._rerank_candidates(search_results, expanded_results, rerank_window)
+                reranked_docs = self._cohere_rerank(message, candidates, rerank_window + len(expanded_results))
+            
+            final_response = self._synthesize_response(message, reranked_docs, ontology_facts)
+            self._store_cached_answer(message, signature, query_embedding, final_response)
             
             return {
                 "success": True,
@@ -65,11 +145,66 @@ class PlanExecuteAgent:
                 "agent_type": "plan_execute"
             }
     
-    def _create_document_plan(self, query: str) -> Dict:
+    def _embed_query(self, message: str) -> list:
+        """질문 임베딩 (LRU 캐시, 답변 캐시가 꺼져 있거나 실패하면 None)"""
+        cache_config = self.retrieval_config.get('semantic_cache', {})
+        if not cache_config.get('enabled', False):
+            return None
+        
+        return get_query_embedding_cache(
+            cache_config.get('embedding_model_id', 'amazon.titan-embed-text-v2:0'),
+            cache_config.get('dimensions', 512),
+            cache_config.get('max_embeddings', 1024)
+        ).embed(message)
+    
+    def _answer_cache(self):
+        """프로세스 공용 답변 캐시 (retrieval_config.semantic_cache 설정)"""
+        cache_config = self.retrieval_config.get('semantic_cache', {})
+        return get_semantic_answer_cache(
+            cache_config.get('max_answers', 256),
+            cache_config.get('min_similarity', 0.95),
+            cache_config.get('ttl_seconds', 3600)
+        )
+    
+    def _lookup_cached_answer(self, query_embedding: list, signature: tuple):
+        """유사 질문의 캐시된 답변 (참조 텍스트는 참조 자체 또는 OCR 저장소에서 다시 조회 가능)"""
+        if query_embedding is None:
+            return None
+        
+        return self._answer_cache().lookup(query_embedding, self.kb_id, signature)
+    
+    def _store_cached_answer(self, message: str, signature: tuple, query_embedding: list, final_response: Dict):
+        """참조가 있는 정상 답변만 저장 (오류/문서 없음 응답은 제외)"""
+        if query_embedding is None or not final_response["references"]:
+            return
+        
+        self._answer_cache().store(
+            message, self.kb_id, signature, query_embedding, final_response["text"], final_response["references"]
+        )
+    
+    def _link_entities(self, message: str) -> list:
+        """로컬 엔티티 색인으로 질문 속 그래프 엔티티 연결 (색인 파일이 없으면 빈 목록)"""
+        linking_config = self.retrieval_config.get('entity_linking', {})
+        if not linking_config.get('enabled', False):
+            return []
+        
+        index = get_entity_index()
+        if index is None:
+            return []
+        
+        return index.link(message)[:linking_config.get('max_entities', 10)]
+    
+    def _create_document_plan(self, query: str, linked_entities: list = None) -> Dict:
         """문서 분석 및 검색 계획 수립"""
+        entity_hint = ""
+        if linked_entities:
+            entity_hint = "\n질문에서 인식된 그래프 엔티티 (영어 검색 쿼리에 활용): " + ", ".join(
+                entity.name for entity in linked_entities
+            ) + "\n"
+        
         prompt = f"""
 한국어 질문: "{query}"
-
+{entity_hint}
 11개 선박 규정 문서:
 {chr(10).join([f"{i+1}. {doc}" for i, doc in enumerate(self.SHIP_DOCUMENTS)])}
 
@@ -119,8 +254,8 @@ JSON 형식:
                 "english_query": query
             }
     
-    def _execute_neptune_search(self, query: str, kb_id: str = None) -> list:
-        """Neptune Analytics KB 검색 실행"""
+    def _execute_neptune_search(self, query: str, kb_id: str = None, number_of_results: int = None) -> list:
+        """Neptune Analytics KB 검색 실행 (number_of_results 기본값은 retrieval_config의 top_k)"""
         try:
             actual_kb_id = kb_id or self.kb_id
             response = self.bedrock_client.retrieve(
@@ -128,13 +263,14 @@ JSON 형식:
                 retrievalQuery={'text': query},
                 retrievalConfiguration={
                     'vectorSearchConfiguration': {
-                        'numberOfResults': 10
+                        'numberOfResults': number_of_results or self.retrieval_config.get('top_k', 10)
                     }
                 }
             )
             
+            page_cache = get_page_cache()
             results = []
-            for result in response['retrievalResults']:
+            for i, result in enumerate(response['retrievalResults']):
                 metadata = result.get('metadata', {})
                 content_text = result.get('content', {}).get('text', '')
                 
@@ -151,11 +287,12 @@ JSON 형식:
                     page_number = metadata.get('x-amz-bedrock-kb-document-page-number')
                     document_id = self._extract_document_id_from_source(source_uri)
                     ocr_text = self._get_ocr_from_dynamodb(document_id, str(int(page_number)) if page_number else '1')
-                    if not ocr_text:
-                        ocr_text = content_text  # 폴백
                 else:
                     ocr_text = content_text
                 
+                # 그래프 확장 시드 (KB 청크 ID = 그래프 Chunk 노드 ID)
+                chunk_id = metadata.get('x-amz-bedrock-kb-chunk-id', '')
+                
                 # 이미지 URI 설정 - DynamoDB 기반 정확한 페이지 이미지
                 data_source_id = metadata.get('x-amz-bedrock-kb-data-source-id', '')
                 
@@ -167,65 +304,309 @@ JSON 형식:
                     if page_number and document_id:
                         # DynamoDB에서 정확한 이미지 URL 조회
                         image_uri = self._get_image_url_from_dynamodb(document_id, str(int(page_number)))
-                        has_images = bool(image_uri)
                     else:
                         image_uri = ''
-                        has_images = False
                 elif actual_kb_id == 'CDPB5AI6BH':
                     # CDPB5AI6BH: 기존 방식
                     image_uri = metadata.get('x-amz-bedrock-kb-byte-content-source', '')
-                    has_images = bool(image_uri)
                 else:
                     image_uri = ''
-                    has_images = False
+                
+                # 메타데이터의 이미지 URI 폴백
+                image_uri = (
+                    image_uri or
+                    metadata.get('x-amz-bedrock-kb-byte-content-source', '') or
+                    metadata.get('imageUri', '')
+                )
                 
                 # 페이지 번호
-                page_number = int(metadata.get('x-amz-bedrock-kb-document-page-number', 1))
+                raw_page_number = int(metadata.get('x-amz-bedrock-kb-document-page-number', 1))
+                page_number = raw_page_number
                 
                 # CDPB5AI6BH KB의 페이지 번호 보정 (1 추가)
                 if actual_kb_id == 'CDPB5AI6BH':
                     page_number = page_number + 1
                 
-                results.append({
-                    'content': ocr_text,  # OCR 텍스트 사용
-                    'source': source_file,
-                    'score': result.get('score', 0.0),
-                    # UI 호환성을 위한 추가 필드
-                    'source_file': source_file,
-                    'page_number': page_number,
-                    'ocr_text': ocr_text,
-                    'image_uri': image_uri,
-                    'has_multimodal': has_images,
-                    'data_source_id': data_source_id,
-                    'metadata': metadata
-                })
+                # OCR 저장소의 페이지 텍스트는 프로세스 공용 페이지 캐시에 두고 참조에는 페이지 키만 보관
+                # (그 외 KB는 청크 텍스트를 참조에 보관, OCR 조회 실패 시 청크 본문으로 폴백)
+                page_key = make_page_key(
+                    actual_kb_id,
+                    self._extract_document_id_from_source(source_uri),
+                    raw_page_number
+                )
+                if actual_kb_id in OCR_STORE_KB_IDS and ocr_text:
+                    page_cache.put(page_key, ocr_text)
+                    reference_text = ''
+                else:
+                    reference_text = ocr_text or content_text
+                
+                results.append(PageReference(
+                    id=f"doc_{i+1}",
+                    source_file=source_file,
+                    page_key=page_key,
+                    page_number=page_number,
+                    score=result.get('score', 0.0),
+                    image_uri=image_uri,
+                    data_source_id=data_source_id,
+                    chunk_id=chunk_id,
+                    text=reference_text
+                ))
             
             return results
             
         except Exception as e:
             return []
     
-    def _synthesize_response(self, query: str, documents: list) -> Dict:
-        """Cohere Reranking + 한국어 응답 합성"""
-        if not documents:
+    def _is_weak_retrieval(self, results: list, adaptive_config: Dict) -> bool:
+        """벡터 검색 상위 결과가 약한지 (결과 없음, 최고 점수 낮음, 최고 점수가 평균과 비슷함)"""
+        if not results:
+            return True
+        
+        scores = [result.score for result in results]
+        top_score = max(scores)
+        if top_score < adaptive_config.get('min_top_score', 0.45):
+            return True
+        return len(scores) > 1 and top_score - sum(scores) / len(scores) < adaptive_config.get('min_score_margin', 0.02)
+    
+    def _is_weak_rerank(self, reranked_docs: list, adaptive_config: Dict) -> bool:
+        """Rerank 최고 점수가 낮은지 (Rerank를 생략했거나 실패해 점수가 없으면 판단하지 않음)"""
+        scores = [doc.rerank_score for doc in reranked_docs if doc.rerank_score is not None]
+        return bool(scores) and max(scores) < adaptive_config.get('min_rerank_score', 0.2)
+    
+    def _rerank_window(self, widened: bool) -> int:
+        """Rerank에 보내는 벡터/BM25 상위 결과 수 (확대 검색이면 더 많이)"""
+        rerank_window = self.retrieval_config.get('rerank_candidates', 5)
+        if widened:
+            rerank_window = self.retrieval_config.get('adaptive_top_k', {}).get('widened_rerank_candidates', rerank_window)
+        return rerank_window
+    
+    def _rerank_candidates(self, search_results: list, expanded_results: list, rerank_window: int) -> list:
+        """그래프 확장 청크는 검색 상위 결과 바로 뒤에 두어 Rerank 후보에 포함"""
+        return search_results[:rerank_window] + expanded_results + search_results[rerank_window:]
+    
+    def _execute_lexical_search(self, query: str) -> list:
+        """로컬 BM25 색인 검색 → 참조 목록 (색인이 없거나 비활성화면 빈 목록)"""
+        lexical_config = self.retrieval_config.get('lexical', {})
+        if not lexical_config.get('enabled', False):
+            return []
+        
+        index = get_lexical_index()
+        if index is None:
+            return []
+        
+        try:
+            hits = index.search(query, limit=lexical_config.get('max_results', 10))
+        except Exception as e:
+            print(f"BM25 검색 실패: {e}")
+            return []
+        
+        return [
+            self._ocr_page_reference(f"bm25_{i+1}", hit.document_id, hit.page_number, hit.text,
+                                     hit.page_image_url, hit.source_pdf, hit.score)
+            for i, hit in enumerate(hits)
+        ]
+    
+    def _ocr_page_reference(self, ref_id: str, document_id: str, page_number, text: str,
+                            image_uri: str, source_pdf: str, score: float) -> PageReference:
+        """로컬 색인의 OCR 페이지 → 참조 (OCR 저장소가 있는 KB는 페이지 캐시, 그 외에는 참조에 텍스트 보관)"""
+        # OCR 페이지 번호(1부터) → KB 페이지 키 (CDPB5AI6BH는 원본 페이지 번호가 0부터)
+        page_number = int(page_number)
+        raw_page_number = page_number - 1 if self.kb_id == 'CDPB5AI6BH' else page_number
+        page_key = make_page_key(self.kb_id, document_id, raw_page_number)
+        if self.kb_id in OCR_STORE_KB_IDS:
+            get_page_cache().put(page_key, text)
+            text = ''
+        
+        return PageReference(
+            id=ref_id,
+            source_file=source_pdf.split('/')[-1] if source_pdf else document_id,
+            page_key=page_key,
+            page_number=page_number,
+            score=score,
+            image_uri=image_uri,
+            text=text
+        )
+    
+    def _answer_clause_lookup(self, message: str) -> Dict:
+        """조항 참조만 담긴 질문 → 해당 조항 발췌와 페이지 참조 (해당하지 않으면 None)
+        
+        조항 색인은 OCR 테이블 기준이므로 OCR 저장소가 있는 KB에서만 사용
+        """
+        clause_config = self.retrieval_config.get('clause_lookup', {})
+        if not clause_config.get('enabled', False) or self.kb_id not in OCR_STORE_KB_IDS:
+            return None
+        
+        reference = parse_clause_reference(message)
+        if reference is None or not is_clause_lookup(message, reference):
+            return None
+        
+        index = get_clause_index()
+        if index is None:
+            return None
+        
+        try:
+            hit = index.lookup(reference)
+        except Exception as e:
+            print(f"조항 색인 조회 실패: {e}")
+            return None
+        if hit is None:
+            return None
+        
+        page_reference = self._ocr_page_reference(
+            "ref_1", hit.document_id, hit.page_number, hit.text, hit.page_image_url, hit.source_pdf, 1.0
+        )
+        excerpt = clause_excerpt(hit.text, hit.offset, clause_config.get('excerpt_chars', 1200))
+        
+        return {
+            "text": f"**{page_reference.source_file} p.{hit.page_number} — 조항 {reference.clause_key}**\n\n{excerpt}",
+            "references": [page_reference]
+        }
+    
+    def _fuse_results(self, vector_results: list, lexical_results: list) -> list:
+        """Reciprocal Rank Fusion (페이지 키 기준)
+        
+        BM25 결과는 페이지 단위, 벡터 검색 결과는 청크 단위이므로 같은 페이지끼리 순위를 합산하고,
+        벡터 검색 청크가 있는 페이지의 BM25 참조는 버림 (같은 페이지를 Rerank에 두 번 보내지 않도록)
+        """
+        if not lexical_results:
+            return vector_results
+        
+        k = self.retrieval_config.get('lexical', {}).get('rrf_k', 60)
+        page_scores = {}
+        for results in (vector_results, lexical_results):
+            ranked_pages = dict.fromkeys(doc.page_key for doc in results)
+            for rank, page_key in enumerate(ranked_pages):
+                page_scores[page_key] = page_scores.get(page_key, 0.0) + 1.0 / (k + rank + 1)
+        
+        vector_pages = {doc.page_key for doc in vector_results}
+        candidates = list(vector_results) + [doc for doc in lexical_results if doc.page_key not in vector_pages]
+        
+        # 점수는 두 목록 모두 1위일 때 1.0이 되도록 정규화 (같은 점수는 벡터 검색 순서 유지)
+        max_score = 2.0 / (k + 1)
+        fused = []
+        seen_keys = set()
+        for doc in sorted(candidates, key=lambda doc: -page_scores[doc.page_key]):
+            if doc.text_key in seen_keys:
+                continue
+            seen_keys.add(doc.text_key)
+            doc = copy.copy(doc)
+            doc.score = page_scores[doc.page_key] / max_score
+            fused.append(doc)
+        return fused
+    
+    def _expand_with_graph(self, search_results: list, linked_entities: list = None) -> list:
+        """시드 청크와 엔티티를 공유하는 형제 청크를 그래프에서 찾아 참조로 변환 (점수는 시드보다 낮게 정규화)
+        
+        질문에서 연결된 엔티티가 없으면 그래프를 조회하지 않음 (매 턴 Neptune 왕복을 피함)
+        """
+        expansion_config = self.retrieval_config.get('graph_expansion', {})
+        max_entity_chunks = expansion_config.get('max_entity_chunks', 50)
+        seed_ids = [doc.chunk_id for doc in search_results if doc.chunk_id]
+        entity_ids = [
+            entity.entity_id for entity in linked_entities or []
+            if entity.chunk_count <= max_entity_chunks
+        ]
+        if not expansion_config.get('enabled', False) or not search_results or not entity_ids:
+            return []
+        
+        expander = GraphExpander(
+            graph_id=expansion_config.get('graph_id') or KB_GRAPH_ID,
+            max_entity_chunks=max_entity_chunks
+        )
+        chunks = expander.expand(
+            seed_ids,
+            depth=expansion_config.get('depth', 1),
+            max_results=expansion_config.get('max_results', 5),
+            time_budget_ms=expansion_config.get('time_budget_ms', 1500),
+            entity_ids=entity_ids
+        )
+        if not chunks:
+            return []
+        
+        seen_keys = {doc.text_key for doc in search_results}
+        score_scale = min(doc.score for doc in search_results) / chunks[0].score if chunks[0].score else 0.0
+        
+        results = []
+        for chunk in chunks:
+            document_id = self._extract_document_id_from_source(chunk.source_uri)
+            page_key = make_page_key(self.kb_id, document_id, chunk.page_number)
+            
+            # OCR 저장소가 있는 KB는 렌더링 시 페이지 OCR을 조회하고, 그 외에는 청크 본문을 참조에 보관
+            if self.kb_id in OCR_STORE_KB_IDS:
+                text_key, text = page_key, ''
+                image_uri = self._get_image_url_from_dynamodb(document_id, str(chunk.page_number))
+            else:
+                text_key, text = chunk.chunk_id, chunk.text
+                image_uri = ''
+            if text_key in seen_keys:
+                continue
+            seen_keys.add(text_key)
+            
+            results.append(PageReference(
+                id=f"graph_{len(results)+1}",
+                source_file=chunk.source_uri.split('/')[-1] if chunk.source_uri else 'Unknown',
+                page_key=page_key,
+                page_number=chunk.page_number + 1 if self.kb_id == 'CDPB5AI6BH' else chunk.page_number,
+                score=chunk.score * score_scale,
+                image_uri=image_uri,
+                data_source_id=chunk.data_source_id,
+                chunk_id=chunk.chunk_id,
+                text=text
+            ))
+        
+        return results
+    
+    def _retrieve_ontology_facts(self, message: str, english_query: str) -> list:
+        """질문 개체를 FSS 온톨로지 인스턴스에 매핑하고 연결된 사양 값을 사실 문장으로 반환"""
+        facts_config = self.retrieval_config.get('ontology_facts', {})
+        if not facts_config.get('enabled', False):
+            return []
+        
+        try:
+            index = get_ontology_fact_index(allow_remote=facts_config.get('allow_remote', False))
+            if index is None:
+                return []
+            
+            entities = index.find_entities(
+                f"{message} {english_query}",
+                max_entities=facts_config.get('max_entities', 5),
+                min_score=facts_config.get('min_score', 0.6)
+            )
+            return index.facts_for([uri for uri, _ in entities], max_facts=facts_config.get('max_facts', 20))
+            
+        except Exception as e:
+            print(f"온톨로지 사실 검색 실패: {e}")
+            return []
+    
+    def _synthesize_response(self, query: str, reranked_docs: list, ontology_facts: list = None) -> Dict:
+        """Rerank된 문서 + 온톨로지 사실로 한국어 응답 합성"""
+        if not reranked_docs and not ontology_facts:
             return {
                 "text": "관련 문서를 찾지 못했습니다.",
                 "references": []
             }
         
-        # Cohere Reranking 실행
-        reranked_docs = self._cohere_rerank(query, documents)
+        # 온톨로지 사실이 있으면 문서 컨텍스트를 줄임 (수치 사양은 사실 문장으로 전달)
+        if ontology_facts:
+            context_size = self.retrieval_config.get('ontology_facts', {}).get('context_documents', 3)
+        else:
+            context_size = self.retrieval_config.get('context_documents', 5)
         
-        # 상위 5개 문서로 컨텍스트 구성
-        context = "\n\n".join([f"[문서 {i+1}] {doc['content'][:300]}..." 
-                              for i, doc in enumerate(reranked_docs[:5])])
+        context = "\n\n".join([f"[문서 {i+1}] {doc.content[:300]}..." 
+                              for i, doc in enumerate(reranked_docs[:context_size])])
+        facts_section = ""
+        if ontology_facts:
+            facts_section = (
+                "\n\nFSS 온톨로지 사실 (구조화된 사양 값, 수치는 이 값을 우선 사용):\n"
+                + "\n".join(f"- {fact}" for fact in ontology_facts)
+            )
         
         # 한국어 응답 생성
         prompt = f"""
 질문: {query}
 
 관련 문서:
-{context}
+{context}{facts_section}
 
 위 문서들을 바탕으로 질문에 대한 정확하고 상세한 한국어 답변을 작성하세요.
 """
@@ -243,31 +624,21 @@ JSON 형식:
             result = json.loads(response['body'].read())
             synthesized_text = result['content'][0]['text']
             
-            # 참조 문서 생성 (명시적 메타데이터 추출)
+            # 참조 문서 생성 (OCR 페이지 텍스트는 렌더링 시 페이지 캐시에서 조회, 청크 텍스트는 참조에 보관)
             references = []
             for i, doc in enumerate(reranked_docs[:3]):
-                # 메타데이터에서 직접 이미지 URI 추출
-                metadata = doc.get('metadata', {})
-                image_uri = (
-                    doc.get('image_uri', '') or 
-                    metadata.get('x-amz-bedrock-kb-byte-content-source', '') or
-                    metadata.get('imageUri', '')
-                )
-                
-                references.append({
-                    "id": f"ref_{i+1}",
-                    "content": doc['content'][:500] + "..." if len(doc['content']) > 500 else doc['content'],
-                    "source": doc['source'] or "Neptune GraphRAG",
-                    "score": doc.get('rerank_score', doc['score']),
-                    # 명시적 필드 매핑
-                    "source_file": doc.get('source_file', doc['source']),
-                    "page_number": doc.get('page_number', 1),
-                    "ocr_text": doc.get('ocr_text', doc['content']),
-                    "image_uri": image_uri,
-                    "has_multimodal": doc.get('has_multimodal', False),
-                    "data_source_id": doc.get('data_source_id', ''),
-                    "metadata": metadata
-                })
+                references.append(PageReference(
+                    id=f"ref_{i+1}",
+                    source_file=doc.source_file or "Neptune GraphRAG",
+                    page_key=doc.page_key,
+                    page_number=doc.page_number,
+                    score=doc.rerank_score if doc.rerank_score is not None else doc.score,
+                    rerank_score=doc.rerank_score,
+                    image_uri=doc.image_uri,
+                    data_source_id=doc.data_source_id,
+                    chunk_id=doc.chunk_id,
+                    text=doc.text
+                ))
             
             return {
                 "text": synthesized_text,
@@ -280,14 +651,14 @@ JSON 형식:
                 "references": []
             }
     
-    def _cohere_rerank(self, query: str, documents: list) -> list:
+    def _cohere_rerank(self, query: str, documents: list, max_candidates: int = 5) -> list:
         """Cohere Reranking으로 문서 품질 보장"""
         try:
             if len(documents) <= 3:
                 return documents  # 문서가 적으면 Reranking 생략
             
-            # Cohere Rerank 호출 (최대 5개로 제한)
-            docs_for_rerank = [{"text": doc["content"]} for doc in documents[:5]]  # 최대 5개
+            # Cohere Rerank 호출 (상위 max_candidates개로 제한)
+            docs_for_rerank = [{"text": doc.content} for doc in documents[:max_candidates]]
             
             response = self.bedrock_runtime.invoke_model(
                 modelId='cohere.rerank-v3-5:0',
@@ -303,11 +674,8 @@ JSON 형식:
             reranked_results = []
             
             for item in result.get('results', []):
-                # 원본 문서의 모든 메타데이터 보존
-                import copy
-                original_doc = copy.deepcopy(documents[item['index']])
-                original_doc['rerank_score'] = item['relevance_score']
-                reranked_results.append(original_doc)
+                # 원본 참조에 Rerank 점수만 반영한 사본
+                reranked_results.append(documents[item['index']].with_rerank_score(item['relevance_score']))
             
             return reranked_results
             
@@ -316,7 +684,13 @@ JSON 형식:
             return documents[:5]
     
     def _get_ocr_from_dynamodb(self, document_id: str, page_number: str) -> str:
-        """다이나모DB에서 OCR 텍스트 조회"""
+        """다이나모DB에서 OCR 텍스트 조회 (로컬 스냅샷 우선)"""
+        snapshot = get_ocr_snapshot()
+        if snapshot:
+            page = snapshot.get_page(document_id, page_number)
+            if page:
+                return page['ocr_markdown'] or page['ocr_text']
+        
         try:
             table = self.dynamodb.Table(self.ocr_table_name)
             response = table.get_item(
@@ -327,14 +701,21 @@ JSON 형식:
             )
             
             if 'Item' in response:
-                return response['Item'].get('ocr_text', '')
+                # 레이아웃 분석 모드 페이지는 표 구조가 보존된 Markdown 우선 사용
+                return response['Item'].get('ocr_markdown') or response['Item'].get('ocr_text', '')
             return ''
             
         except Exception as e:
             return ''
     
     def _get_image_url_from_dynamodb(self, document_id: str, page_number: str) -> str:
-        """DynamoDB에서 정확한 이미지 URL 조회"""
+        """DynamoDB에서 정확한 이미지 URL 조회 (로컬 스냅샷 우선)"""
+        snapshot = get_ocr_snapshot()
+        if snapshot:
+            page = snapshot.get_page(document_id, page_number)
+            if page:
+                return page['page_image_url']
+        
         try:
             table = self.dynamodb.Table(self.ocr_table_name)
             response = table.get_item(
@@ -359,7 +740,9 @@ JSON 형식:
         filename = source_uri.split('/')[-1].replace('.pdf', '').replace('.PDF', '')
         
         # 파일명에서 문서 ID 매핑
-        if 'SOLAS' in filename:
+        if 'SOLAS_2017_Insulation' in filename:
+            return 'solas_2017_insulation_penetration'
+        elif 'SOLAS' in filename:
             return 'solas_chapter2'
         elif 'DNV-RU-SHIP-Pt4' in filename:
             return 'dnv_pt4_ch6'
@@ -5,6 +5,7 @@
 import streamlit as st
 import uuid
 from core.agent_manager import AgentManager
+from core.session_store import get_session_store
 from ui.agent_selector import AgentSelector
 from ui.chat_interface import ChatInterface
 from ui.reference_display import ReferenceDisplay
@@ -21,20 +22,20 @@ st.set_page_config(
 def get_agent_manager():
     return AgentManager()
 
-def get_ui_components(_agent_manager):
+def get_ui_components(_agent_manager, _session_store):
     return {
         'agent_selector': AgentSelector(_agent_manager),
-        'chat_interface': ChatInterface(_agent_manager),
+        'chat_interface': ChatInterface(_agent_manager, _session_store),
         'reference_display': ReferenceDisplay(),
-        'sidebar': Sidebar(_agent_manager)
+        'sidebar': Sidebar(_agent_manager, _session_store)
     }
 
 # 세션 상태 초기화
-def initialize_session():
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
+def initialize_session(session_store):
     if "session_id" not in st.session_state:
         st.session_state.session_id = str(uuid.uuid4())
+    # 대화 기록은 세션 저장소가 관리 (최근 턴만 메모리 유지, 유휴 세션 정리 후에는 새 기록)
+    st.session_state.messages = session_store.get_history(st.session_state.session_id).hot
     if "selected_agent" not in st.session_state:
         st.session_state.selected_agent = 'plan_execute'  # Plan-Execute Agent를 기본값으로
     if "selected_kb_id" not in st.session_state:
@@ -45,11 +46,11 @@ def initialize_session():
         st.session_state.previous_kb_id = None
 
 def main():
-    initialize_session()
-    
     # 매니저 및 UI 컴포넌트 초기화
     agent_manager = get_agent_manager()
-    ui_components = get_ui_components(agent_manager)
+    session_store = get_session_store(agent_manager.global_config)
+    initialize_session(session_store)
+    ui_components = get_ui_components(agent_manager, session_store)
     
     # 메인 제목
     st.title("🚢 선박 소방 규정 챗봇")
@@ -104,36 +105,46 @@ def main():
                 import streamlit.components.v1 as components
                 
                 if selected_graph_type == "📚 GraphRAG\n(bda+neptune)":
-                    from knowledge_graph_bda import create_neptune_graph_bda
+                    from graph_explorer import render_graph_explorer
+                    from knowledge_graph import render_node_details
+                    from knowledge_graph_bda import BDA_GRAPH_ID, get_graph_html_bda, style_node_bda
                     
-                    # BDA Neptune Analytics 그래프
-                    net = create_neptune_graph_bda()
-                    html_string = net.generate_html()
-                    components.html(html_string, height=900)
+                    view_mode = st.radio("보기 방식", ["🗺️ 전체 스냅샷", "🧭 이웃 탐색"], horizontal=True, key="bda_view_mode")
+                    if view_mode == "🧭 이웃 탐색":
+                        render_graph_explorer(BDA_GRAPH_ID, style_node_bda, key="bda_exploration")
+                    else:
+                        # BDA Neptune Analytics 그래프 (스냅샷 버전별 캐시된 HTML)
+                        html_string = get_graph_html_bda()
+                        components.html(html_string, height=900)
+                    render_node_details(BDA_GRAPH_ID, key="bda_node_details")
                     
                 elif selected_graph_type == "⚡ GraphRAG\n(claude+neptune)":
-                    from knowledge_graph_claude import create_neptune_graph_claude
+                    from graph_explorer import render_graph_explorer
+                    from knowledge_graph import render_node_details
+                    from knowledge_graph_claude import CLAUDE_GRAPH_ID, get_graph_html_claude, style_node_claude
                     
-                    # Claude Neptune Analytics 그래프
-                    net = create_neptune_graph_claude()
-                    html_string = net.generate_html()
-                    components.html(html_string, height=900)
+                    view_mode = st.radio("보기 방식", ["🗺️ 전체 스냅샷", "🧭 이웃 탐색"], horizontal=True, key="claude_view_mode")
+                    if view_mode == "🧭 이웃 탐색":
+                        render_graph_explorer(CLAUDE_GRAPH_ID, style_node_claude, key="claude_exploration")
+                    else:
+                        # Claude Neptune Analytics 그래프 (스냅샷 버전별 캐시된 HTML)
+                        html_string = get_graph_html_claude()
+                        components.html(html_string, height=900)
+                    render_node_details(CLAUDE_GRAPH_ID, key="claude_node_details")
                     
                 elif selected_graph_type == "🔥 FSS GraphDB":
-                    from fss_full_graph import get_full_ontology, create_full_graph
+                    from fss_full_graph import get_full_ontology, get_full_graph_html
                     
                     # FSS 온톨로지 데이터 가져오기
-                    data = get_full_ontology()
+                    ontology = get_full_ontology()
                     
-                    if data and data['results']['bindings']:
-                        st.success(f"✅ {len(data['results']['bindings'])}개 트리플 로드 완료")
+                    if ontology and ontology.triples:
+                        st.success(f"✅ {len(ontology.triples)}개 트리플 로드 완료")
                         
-                        # FSS 그래프 생성
-                        net, node_count, edge_count = create_full_graph(data)
+                        # FSS 그래프 HTML (같은 온톨로지 버전이면 캐시 사용)
+                        html_string, node_count, edge_count = get_full_graph_html(ontology)
                         st.info(f"📊 노드: {node_count}개, 엣지: {edge_count}개")
                         
-                        # HTML 생성 및 표시 (GraphRAG와 동일한 방식)
-                        html_string = net.generate_html()
                         components.html(html_string, height=900)  # 더 큰 높이
                     else:
                         st.error("❌ FSS 데이터를 가져올 수 없습니다.")
@@ -166,7 +177,7 @@ def main():
         # 에이전트나 KB 변경 감지 및 채팅 초기화
         if (st.session_state.previous_agent != selected_agent or 
             st.session_state.previous_kb_id != selected_kb_id):
-            st.session_state.messages = []
+            session_store.clear(st.session_state.session_id)
             st.session_state.session_id = str(uuid.uuid4())
             st.session_state.previous_agent = selected_agent
             st.session_state.previous_kb_id = selected_kb_id
@@ -178,7 +189,7 @@ def main():
         # 사용자 입력 처리
         if prompt := st.chat_input("질문을 입력하세요..."):
             # 사용자 메시지 추가
-            st.session_state.messages.append({
+            session_store.append(st.session_state.session_id, {
                 "role": "user", 
                 "content": prompt,
                 "agent": selected_agent
@@ -222,7 +233,7 @@ def main():
                             # st.write("🔍 디버그: 참조 없음")
                         
                         # 세션에 저장
-                        st.session_state.messages.append({
+                        session_store.append(st.session_state.session_id, {
                             "role": "assistant",
                             "content": result["content"],
                             "references": references,
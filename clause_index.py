@@ -0,0 +1,246 @@
+"""
+규정 조항 색인
+OCR 페이지 텍스트의 조항 제목(Regulation 9, Chapter 5, 2.3.1 ...)을 정규화한 조항 키 →
+(document_id, page_number, offset)로 매핑 (BM25 색인과 같은 SQLite 파일, OCR 추출 시 문서 단위로 재생성)
+키 종류: unit(규칙/장 제목), qualified(상위 단위를 붙인 단락 번호), raw(단락 원래 번호, 문서 전체에서 중복 가능)
+질문이 조항 번호 조회("SOLAS II-2 Reg 9.2.3", "IGC 11.5")이면 검색/Rerank 없이 해당 페이지로 바로 응답
+"""
+import os
+import re
+import sqlite3
+import threading
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+CLAUSE_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS clauses ("
+    "document_id TEXT, clause_key TEXT, kind TEXT, page_number INTEGER, offset INTEGER, "
+    "PRIMARY KEY (document_id, clause_key, kind, page_number, offset)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS clauses_by_key ON clauses (clause_key)"
+)
+
+# 페이지 텍스트의 제목 줄 (Markdown 제목 기호 허용)
+UNIT_HEADING_PATTERN = re.compile(r'^[ \t]*(?:#+[ \t]*)?(?:Regulation|REGULATION|Chapter|CHAPTER|Section|SECTION|Sec\.)[ \t]+(\d+)\b', re.M)
+PARAGRAPH_HEADING_PATTERN = re.compile(r'^[ \t]*(?:#+[ \t]*)?(\d+(?:\.\d+)+)\.?[ \t]+[A-Z(]', re.M)
+# 규칙/장 안의 최상위 단락 (1 Purpose, 3. Definitions) — 상위 단위가 있을 때만 등록
+TOP_PARAGRAPH_HEADING_PATTERN = re.compile(r'^[ \t]*(?:#+[ \t]*)?(\d{1,2})\.?[ \t]+[A-Z(]', re.M)
+
+# 목차 페이지 (제목 또는 점선 리더 + 페이지 번호 줄이 여러 개) — 조항 번호가 본문보다 먼저 나오므로 색인에서 제외
+CONTENTS_TITLE_PATTERN = re.compile(r'^[ \t]*(?:#+[ \t]*)?(?:Table of contents|Contents|CONTENTS|목차)[ \t]*$', re.M)
+DOT_LEADER_PATTERN = re.compile(r'(?:\.[ \t]*){4,}\d+[ \t]*$', re.M)
+MIN_DOT_LEADER_LINES = 3
+
+# 질문 속 문서 이름 → OCR 문서 ID
+DOCUMENT_PATTERNS = (
+    (re.compile(r'DNV\S*\s*(?:RU-SHIP-)?Pt\.?\s*4|Pt\.?\s*4\s*Ch\.?\s*6', re.I), 'dnv_pt4_ch6'),
+    (re.compile(r'DNV\S*\s*(?:RU-SHIP-)?Pt\.?\s*6|Pt\.?\s*6\s*Ch\.?\s*5', re.I), 'dnv_pt6_ch5'),
+    (re.compile(r'\bSOLAS\b', re.I), 'solas_chapter2'),
+    (re.compile(r'\bFSS\b', re.I), 'fss_code'),
+    (re.compile(r'\bIGC\b', re.I), 'igc_code'),
+)
+# 문서 자체의 장 표기 (SOLAS II-2)는 조항 번호가 아니므로 제거
+DOCUMENT_CHAPTER_PATTERN = re.compile(r'\b[IVX]+-\d+\b')
+UNIT_REFERENCE_PATTERN = re.compile(
+    r'(?:\bReg(?:ulation)?|\bCh(?:apter)?|\bSec(?:tion)?|규칙|제)\.?\s*(\d+)(?:\s*장)?(?:\s*[./,]?\s*(\d+(?:\.\d+)*))?',
+    re.I
+)
+NUMBER_REFERENCE_PATTERN = re.compile(r'(?<![\d.])(\d+(?:\.\d+)+)(?![\d.])')
+
+class ClauseReference(NamedTuple):
+    document_id: Optional[str]
+    clause_key: str
+    span: Tuple[int, int]
+    # Reg/Ch 표기와 함께 쓴 번호 (상위 단위가 붙은 키만 조회)
+    unit_named: bool = False
+
+class ClauseHit(NamedTuple):
+    document_id: str
+    page_number: int
+    offset: int
+    text: str
+    page_image_url: str
+    source_pdf: str
+
+def is_contents_page(text: str) -> bool:
+    """목차 페이지 여부"""
+    return bool(CONTENTS_TITLE_PATTERN.search(text)) or len(DOT_LEADER_PATTERN.findall(text)) >= MIN_DOT_LEADER_LINES
+
+def extract_clauses(pages: Iterable[Tuple[int, str]]) -> Iterator[Tuple[str, str, int, int]]:
+    """문서 페이지(페이지 순) → (조항 키, 키 종류, 페이지 번호, 오프셋)
+
+    단락 번호는 원래 번호(raw, 2.3)와 상위 단위를 붙인 번호(qualified, Regulation 9 → 9.2.3)를 함께 등록
+    (IGC처럼 단락 번호에 장 번호가 이미 포함된 경우 11.5는 qualified로 그대로, 목차 페이지는 건너뜀)
+    """
+    unit = None
+    for page_number, text in pages:
+        if is_contents_page(text):
+            continue
+
+        headings = [(match.start(), 'unit', match.group(1)) for match in UNIT_HEADING_PATTERN.finditer(text)]
+        headings += [(match.start(), 'paragraph', match.group(1)) for match in PARAGRAPH_HEADING_PATTERN.finditer(text)]
+        headings += [(match.start(), 'top', match.group(1)) for match in TOP_PARAGRAPH_HEADING_PATTERN.finditer(text)]
+
+        for offset, kind, number in sorted(headings):
+            if kind == 'unit':
+                unit = number
+                yield number, 'unit', page_number, offset
+            elif kind == 'top':
+                if unit:
+                    yield f"{unit}.{number}", 'qualified', page_number, offset
+            elif unit and number.startswith(unit + '.'):
+                yield number, 'qualified', page_number, offset
+            else:
+                yield number, 'raw', page_number, offset
+                if unit:
+                    yield f"{unit}.{number}", 'qualified', page_number, offset
+
+def parse_clause_reference(text: str) -> Optional[ClauseReference]:
+    """질문에서 조항 참조 추출 (문서 이름 또는 Reg/Ch 표기와 함께 쓴 번호만 인정)"""
+    document_id = None
+    for pattern, candidate in DOCUMENT_PATTERNS:
+        if pattern.search(text):
+            document_id = candidate
+            break
+
+    stripped = DOCUMENT_CHAPTER_PATTERN.sub(lambda match: ' ' * len(match.group(0)), text)
+
+    match = UNIT_REFERENCE_PATTERN.search(stripped)
+    if match:
+        unit, paragraph = match.groups()
+        clause_key = f"{unit}.{paragraph}" if paragraph and not paragraph.startswith(unit + '.') else (paragraph or unit)
+        return ClauseReference(document_id, clause_key, match.span(), True)
+
+    match = NUMBER_REFERENCE_PATTERN.search(stripped)
+    if match and document_id:
+        return ClauseReference(document_id, match.group(1), match.span())
+
+    return None
+
+# 조항 원문 요청에 붙는 단어 (이 외의 단어가 있으면 조항 내용에 대한 질문으로 보고 일반 검색)
+LOOKUP_STOPWORDS = {
+    'show', 'me', 'the', 'text', 'of', 'full', 'what', 'is', 'in', 'code', 'convention', 'rules', 'clause',
+    'paragraph', 'please', 'says', 'say', 'does',
+    '의', '은', '는', '을', '를', '이', '가', '에서', '내용', '원문', '전문', '조항', '조문', '규정', '항',
+    '보여줘', '보여주세요', '알려줘', '알려주세요', '찾아줘', '뭐야', '무엇인가', '무엇인가요'
+}
+
+def residual_words(text: str, reference: ClauseReference) -> List[str]:
+    """조항 참조와 문서 이름을 뺀 나머지 단어 (짧으면 단순 조항 조회로 판단)"""
+    start, end = reference.span
+    remainder = text[:start] + ' ' + text[end:]
+    remainder = DOCUMENT_CHAPTER_PATTERN.sub(' ', remainder)
+    for pattern, _ in DOCUMENT_PATTERNS:
+        remainder = pattern.sub(' ', remainder)
+    return re.findall(r'\w+', remainder)
+
+def is_clause_lookup(text: str, reference: ClauseReference) -> bool:
+    """문서가 지정된 조항 참조 외에 원문 요청 단어만 있는 질문인지 ("SOLAS II-2 Reg 9.2.3 원문 보여줘")"""
+    if not reference.document_id:
+        return False
+    return all(word.lower() in LOOKUP_STOPWORDS for word in residual_words(text, reference))
+
+def clause_excerpt(text: str, offset: int, max_chars: int = 1200) -> str:
+    """조항 제목부터 다음 조항 제목 전까지 (최대 max_chars)"""
+    end = min(len(text), offset + max_chars)
+    for pattern in (UNIT_HEADING_PATTERN, PARAGRAPH_HEADING_PATTERN, TOP_PARAGRAPH_HEADING_PATTERN):
+        match = pattern.search(text, offset + 1, end)
+        if match:
+            end = min(end, match.start())
+    return text[offset:end].strip()
+
+def ensure_clause_schema(conn: sqlite3.Connection) -> bool:
+    """조항 테이블 생성 (키 종류 컬럼이 없는 이전 테이블은 다시 만듦, 다시 만들었으면 True)"""
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(clauses)')]
+    recreated = bool(columns) and 'kind' not in columns
+    if recreated:
+        conn.execute('DROP TABLE clauses')
+
+    for statement in CLAUSE_SCHEMA:
+        conn.execute(statement)
+    return recreated
+
+def rebuild_document_clauses(conn: sqlite3.Connection, document_id: str):
+    """색인된 페이지 텍스트로 문서 1개의 조항 항목 재생성 (장/규칙 제목이 여러 페이지에 걸쳐 적용되므로 문서 단위)"""
+    if ensure_clause_schema(conn):
+        # 이전 형식 테이블을 버렸으므로 다른 문서도 함께 재생성
+        for (other_id,) in conn.execute('SELECT DISTINCT document_id FROM indexed_pages').fetchall():
+            if other_id != document_id:
+                _rebuild_clauses(conn, other_id)
+
+    _rebuild_clauses(conn, document_id)
+
+def _rebuild_clauses(conn: sqlite3.Connection, document_id: str):
+    rows = conn.execute(
+        'SELECT p.page_number, p.text FROM indexed_pages i JOIN pages p ON p.rowid = i.fts_rowid '
+        'WHERE i.document_id = ?',
+        (document_id,)
+    ).fetchall()
+    pages = sorted((int(page_number), text) for page_number, text in rows if str(page_number).isdigit())
+
+    conn.execute('DELETE FROM clauses WHERE document_id = ?', (document_id,))
+    conn.executemany(
+        'INSERT OR IGNORE INTO clauses VALUES (?, ?, ?, ?, ?)',
+        ((document_id, clause_key, kind, page_number, offset)
+         for clause_key, kind, page_number, offset in extract_clauses(pages))
+    )
+
+class ClauseIndex:
+    """읽기 전용 조항 색인 (스레드 간 공유)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._conn.execute('PRAGMA mmap_size = 268435456')
+        self._lock = threading.Lock()
+
+    def lookup(self, reference: ClauseReference) -> Optional[ClauseHit]:
+        """조항 키가 처음 나오는 페이지 (문서가 지정되지 않으면 전체 문서에서 검색)
+
+        Reg/Ch 표기가 있으면 상위 단위가 붙은 키만, 없으면 원래 단락 번호보다 상위 단위 키를 우선
+        """
+        query = (
+            'SELECT c.document_id, c.page_number, c.offset, p.text, p.page_image_url, p.source_pdf '
+            'FROM clauses c '
+            'JOIN indexed_pages i ON i.document_id = c.document_id AND i.page_number = CAST(c.page_number AS TEXT) '
+            'JOIN pages p ON p.rowid = i.fts_rowid '
+            'WHERE c.clause_key = ?'
+        )
+        parameters = [reference.clause_key]
+        if reference.document_id:
+            query += ' AND c.document_id = ?'
+            parameters.append(reference.document_id)
+        if reference.unit_named:
+            query += " AND c.kind != 'raw'"
+        query += " ORDER BY c.kind = 'raw', c.page_number, c.offset LIMIT 1"
+
+        with self._lock:
+            try:
+                row = self._conn.execute(query, parameters).fetchone()
+            except sqlite3.OperationalError:
+                # 조항 테이블이 아직 없는 이전 색인 파일
+                return None
+
+        return ClauseHit(*row) if row else None
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_clause_index() -> Optional[ClauseIndex]:
+    """프로세스 공용 조항 색인 (BM25 색인 파일이 없으면 None)"""
+    from lexical_index import DEFAULT_INDEX_PATH
+
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                path = os.getenv('LEXICAL_INDEX_PATH', DEFAULT_INDEX_PATH)
+                if not os.path.exists(path):
+                    return None
+
+                try:
+                    _index = ClauseIndex(path)
+                except Exception as e:
+                    print(f"조항 색인 로드 실패: {e}")
+                    return None
+
+    return _index
@@ -7,9 +7,12 @@ CDPB5AI6BH vs ZGBA1R5CS0
 import boto3
 import json
 
+from core.agent_manager import load_retrieval_config
+
 def test_kb_comparison():
     """두 KB를 동일한 쿼리로 비교"""
     client = boto3.client('bedrock-agent-runtime', region_name='us-west-2')
+    top_k = load_retrieval_config().get('top_k', 10)
     
     kbs = {
         "이전 KB": "CDPB5AI6BH",
@@ -40,7 +43,7 @@ def test_kb_comparison():
                     retrievalQuery={'text': query},
                     retrievalConfiguration={
                         'vectorSearchConfiguration': {
-                            'numberOfResults': 5
+                            'numberOfResults': top_k
                         }
                     }
                 )
@@ -85,6 +88,7 @@ def test_specific_query_both_kbs():
     print("=" * 60)
     
     client = boto3.client('bedrock-agent-runtime', region_name='us-west-2')
+    top_k = load_retrieval_config().get('top_k', 10)
     query = "SOLAS chapter II-2 fire protection and detection requirements for ships"
     
     kbs = {
@@ -105,7 +109,7 @@ def test_specific_query_both_kbs():
                 retrievalQuery={'text': query},
                 retrievalConfiguration={
                     'vectorSearchConfiguration': {
-                        'numberOfResults': 5
+                        'numberOfResults': top_k
                     }
                 }
             )
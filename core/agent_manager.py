@@ -24,6 +24,17 @@ class AgentConfig:
     bedrock_model_id: Optional[str] = None
     lambda_function_names: Optional[Dict] = None
     reranker_model_arn: Optional[str] = None
+    retrieval_config: Optional[Dict] = None
+
+def load_retrieval_config(agent_name: str = 'plan_execute', config_path: str = "config/agents.yaml") -> Dict:
+    """에이전트의 retrieval_config (검색 스크립트가 앱과 같은 검색 깊이를 쓰도록, 없으면 빈 dict)"""
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+        return config.get('agents', {}).get(agent_name, {}).get('retrieval_config') or {}
+    except FileNotFoundError:
+        print(f"설정 파일을 찾을 수 없습니다: {config_path}")
+        return {}
 
 class AgentManager:
     """에이전트 관리자 - 모든 에이전트의 등록, 관리, 라우팅 담당"""
@@ -32,6 +43,7 @@ class AgentManager:
         self.config_path = config_path
         self.agents: Dict[str, AgentConfig] = {}
         self.agent_instances: Dict[str, Any] = {}
+        self.global_config: Dict[str, Any] = {}
         self.load_agents()
     
     def load_agents(self):
@@ -46,6 +58,8 @@ class AgentManager:
             with open(self.config_path, 'r', encoding='utf-8') as f:
                 config = yaml.safe_load(f)
             
+            self.global_config = config.get('global_config', {})
+            
             for agent_name, agent_config in config.get('agents', {}).items():
                 # lambda_function_names에서 환경변수 치환
                 if 'lambda_function_names' in agent_config:
@@ -0,0 +1,100 @@
+"""
+페이지 텍스트 캐시
+검색 단계에서 조회한 페이지 텍스트를 프로세스 단위로 공유하고,
+참조(PageReference)는 page_key만 들고 있다가 렌더링 시점에 텍스트를 조회
+(캐시에서 밀려나도 OCR 저장소에서 다시 읽을 수 있는 페이지 텍스트만 저장)
+"""
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# OCR 스냅샷/DynamoDB에서 다시 조회할 수 있는 KB (페이지 단위 OCR 저장소 보유)
+OCR_STORE_KB_IDS = {'PWRU19RDNE'}
+
+def make_page_key(kb_id: str, document_id: str, page_number) -> str:
+    """페이지 키 생성: {kb_id}/{document_id}/{page_number}"""
+    return f"{kb_id}/{document_id}/{page_number}"
+
+def split_page_key(page_key: str):
+    """페이지 키 분해 → (kb_id, document_id, page_number)"""
+    kb_id, document_id, page_number = page_key.split('/', 2)
+    return kb_id, document_id, page_number
+
+class PageTextCache:
+    """페이지 텍스트 LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._ocr_table = None
+
+    def put(self, page_key: str, text: str):
+        """페이지 텍스트 저장"""
+        with self._lock:
+            self._entries[page_key] = text
+            self._entries.move_to_end(page_key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, page_key: str) -> Optional[str]:
+        """캐시된 텍스트 반환 (없으면 None)"""
+        with self._lock:
+            text = self._entries.get(page_key)
+            if text is not None:
+                self._entries.move_to_end(page_key)
+            return text
+
+    def resolve(self, page_key: str) -> str:
+        """페이지 텍스트 조회: 캐시 → OCR 스냅샷 → DynamoDB (OCR 저장소가 있는 KB만)"""
+        text = self.get(page_key)
+        if text is not None:
+            return text
+
+        try:
+            kb_id, document_id, page_number = split_page_key(page_key)
+        except ValueError:
+            return ''
+
+        if kb_id not in OCR_STORE_KB_IDS:
+            return ''
+
+        text = self._load_from_ocr_store(document_id, page_number)
+        if text:
+            self.put(page_key, text)
+        return text
+
+    def _load_from_ocr_store(self, document_id: str, page_number: str) -> str:
+        """OCR 스냅샷 또는 DynamoDB에서 페이지 텍스트 조회"""
+        from ocr_snapshot import get_ocr_snapshot
+
+        snapshot = get_ocr_snapshot()
+        if snapshot:
+            page = snapshot.get_page(document_id, page_number)
+            if page:
+                return page['ocr_markdown'] or page['ocr_text']
+
+        try:
+            if self._ocr_table is None:
+                import boto3
+                self._ocr_table = boto3.resource('dynamodb', region_name='us-west-2').Table('ship-firefighting-ocr')
+
+            response = self._ocr_table.get_item(
+                Key={
+                    'document_id': document_id,
+                    'page_number': page_number
+                }
+            )
+            item = response.get('Item', {})
+            return item.get('ocr_markdown') or item.get('ocr_text', '')
+
+        except Exception as e:
+            print(f"페이지 텍스트 조회 실패 ({document_id} p.{page_number}): {e}")
+            return ''
+
+_page_cache = PageTextCache()
+
+def get_page_cache() -> PageTextCache:
+    """프로세스 공용 페이지 텍스트 캐시"""
+    return _page_cache
@@ -0,0 +1,88 @@
+"""
+참조 문서 타입
+세션에 저장되는 참조는 ID, 점수, 페이지 키만 유지하고
+본문 텍스트는 렌더링 시점에 페이지 캐시에서 조회 (OCR 저장소에서 다시 읽을 수 있는 KB만,
+그 외 KB의 청크 텍스트는 캐시에서 밀려나면 복구할 수 없으므로 참조에 직접 보관)
+"""
+import copy
+from typing import Any, Dict, Optional
+
+from core.page_cache import get_page_cache, split_page_key
+
+class PageReference:
+    """검색 결과/응답 참조 1건 (메타데이터 원본과 본문 텍스트를 보관하지 않음)"""
+
+    __slots__ = (
+        'id', 'source_file', 'page_key', 'page_number', 'score',
+        'rerank_score', 'image_uri', 'data_source_id', 'chunk_id', 'text'
+    )
+
+    def __init__(self, id: str, source_file: str, page_key: str, page_number: int, score: float,
+                 rerank_score: Optional[float] = None, image_uri: str = '', data_source_id: str = '',
+                 chunk_id: str = '', text: str = ''):
+        self.id = id
+        self.source_file = source_file
+        self.page_key = page_key
+        self.page_number = page_number
+        self.score = score
+        self.rerank_score = rerank_score
+        self.image_uri = image_uri
+        self.data_source_id = data_source_id
+        self.chunk_id = chunk_id
+        self.text = text
+
+    @property
+    def ocr_text(self) -> str:
+        """본문 텍스트 (참조에 보관한 청크 텍스트 → 페이지 캐시 → OCR 저장소 순으로 조회)"""
+        return self.text or get_page_cache().resolve(self.page_key)
+
+    @property
+    def text_key(self) -> str:
+        """본문 텍스트 식별 키 (청크 텍스트를 보관한 참조는 청크 ID, 페이지 텍스트는 페이지 키)"""
+        return (self.chunk_id or self.page_key) if self.text else self.page_key
+
+    @property
+    def content(self) -> str:
+        return self.ocr_text
+
+    @property
+    def source(self) -> str:
+        return self.source_file
+
+    @property
+    def document_id(self) -> str:
+        return split_page_key(self.page_key)[1]
+
+    @property
+    def has_multimodal(self) -> bool:
+        return bool(self.image_uri)
+
+    def with_rerank_score(self, rerank_score: float) -> 'PageReference':
+        """Rerank 점수를 반영한 사본"""
+        ref = copy.copy(self)
+        ref.rerank_score = rerank_score
+        return ref
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """dict 형식 참조와 같은 방식으로 필드 조회 (UI 호환)"""
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        if not hasattr(self, key):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, key)
+
+    def to_dict(self) -> Dict:
+        """직렬화용 dict (페이지 텍스트 제외, 참조에 보관한 청크 텍스트는 포함)"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PageReference':
+        return cls(**{name: value for name, value in data.items() if name in cls.__slots__})
+
+    def __repr__(self) -> str:
+        return f"PageReference({self.id!r}, {self.page_key!r}, score={self.score:.3f})"
@@ -0,0 +1,215 @@
+"""
+세션 대화 기록 저장소
+세션마다 최근 N턴만 메모리에 유지하고 이전 턴은 로컬 SQLite로 내보내며,
+session_timeout 동안 활동이 없는 세션은 정리
+"""
+import atexit
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from core.references import PageReference
+
+class SessionHistory:
+    """세션 1개의 대화 기록 (hot 리스트는 st.session_state.messages로 그대로 사용)"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.hot: List[Dict] = []
+        self.hot_sizes: List[int] = []
+        self.spilled_count = 0
+        self.next_seq = 0
+        self.last_active = time.time()
+
+    @property
+    def hot_bytes(self) -> int:
+        return sum(self.hot_sizes)
+
+class SessionStore:
+    """세션별 메모리 예산을 지키는 대화 기록 저장소 (프로세스 공용)"""
+
+    def __init__(self, db_path: str = None, hot_turns: int = 10,
+                 max_session_bytes: int = 512 * 1024, session_timeout: int = 3600):
+        self.hot_turns = hot_turns
+        self.max_session_bytes = max_session_bytes
+        self.session_timeout = session_timeout
+
+        self.db_path = db_path or self._process_db_path()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT,
+                seq INTEGER,
+                payload TEXT,
+                PRIMARY KEY (session_id, seq)
+            )
+        """)
+        # 같은 PID를 쓰던 이전 프로세스의 세션은 복구 대상이 아니므로 정리 (파일이 프로세스별이라 다른 앱 프로세스와 공유하지 않음)
+        self._conn.execute('DELETE FROM messages')
+        self._conn.commit()
+        if db_path is None:
+            atexit.register(self._remove_db_file)
+
+        self._sessions: Dict[str, SessionHistory] = {}
+        self._lock = threading.RLock()
+        self._last_eviction = time.time()
+
+    @staticmethod
+    def _process_db_path() -> str:
+        """프로세스별 내보내기 파일 경로 (SESSION_STORE_PATH 또는 임시 디렉터리 기준, 파일 이름에 PID 추가)"""
+        path = os.getenv('SESSION_STORE_PATH', os.path.join(tempfile.gettempdir(), 'shi_chatbot_sessions.sqlite'))
+        root, ext = os.path.splitext(path)
+        return f"{root}_{os.getpid()}{ext}"
+
+    def _remove_db_file(self):
+        """프로세스 종료 시 내보내기 파일 삭제"""
+        try:
+            self._conn.close()
+            os.remove(self.db_path)
+        except OSError:
+            pass
+
+    def get_history(self, session_id: str) -> SessionHistory:
+        """세션 기록 반환 (없으면 생성, 활동 시각 갱신)"""
+        self._evict_idle_if_due()
+
+        with self._lock:
+            history = self._sessions.get(session_id)
+            if history is None:
+                history = SessionHistory(session_id)
+                self._sessions[session_id] = history
+
+            history.last_active = time.time()
+            return history
+
+    def append(self, session_id: str, message: Dict):
+        """메시지 추가 후 턴 수/바이트 예산을 넘는 이전 메시지를 디스크로 이동"""
+        history = self.get_history(session_id)
+
+        with self._lock:
+            history.hot.append(message)
+            history.hot_sizes.append(len(self._serialize(message)))
+            self._enforce_budget(history)
+
+    def load_spilled(self, session_id: str) -> List[Dict]:
+        """디스크로 이동된 이전 메시지 조회 (오래된 순)"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT payload FROM messages WHERE session_id = ? ORDER BY seq',
+                (session_id,)
+            ).fetchall()
+
+        return [self._deserialize(payload) for (payload,) in rows]
+
+    def clear(self, session_id: str):
+        """세션 기록 삭제 (새 세션 시작 시)"""
+        with self._lock:
+            history = self._sessions.pop(session_id, None)
+            if history:
+                history.hot.clear()
+                history.hot_sizes.clear()
+
+            self._conn.execute('DELETE FROM messages WHERE session_id = ?', (session_id,))
+            self._conn.commit()
+
+    def evict_idle(self) -> int:
+        """session_timeout 동안 활동이 없는 세션 정리"""
+        cutoff = time.time() - self.session_timeout
+
+        with self._lock:
+            idle_ids = [sid for sid, history in self._sessions.items() if history.last_active < cutoff]
+
+        for session_id in idle_ids:
+            self.clear(session_id)
+
+        return len(idle_ids)
+
+    def session_report(self, session_id: str) -> Dict[str, Any]:
+        """세션 1개의 메모리 사용량"""
+        with self._lock:
+            history = self._sessions.get(session_id)
+            if history is None:
+                return {'hot_messages': 0, 'hot_bytes': 0, 'spilled_messages': 0}
+
+            return {
+                'hot_messages': len(history.hot),
+                'hot_bytes': history.hot_bytes,
+                'spilled_messages': history.spilled_count
+            }
+
+    def memory_report(self) -> Dict[str, Dict[str, Any]]:
+        """전체 세션별 메모리 사용량 (session_id → 사용량)"""
+        with self._lock:
+            session_ids = list(self._sessions)
+        return {session_id: self.session_report(session_id) for session_id in session_ids}
+
+    def _enforce_budget(self, history: SessionHistory):
+        """최근 hot_turns 턴(사용자+응답)과 바이트 예산을 넘는 메시지를 오래된 순으로 디스크 이동"""
+        max_messages = self.hot_turns * 2
+        spilled = []
+
+        # 최신 응답 1턴은 예산을 넘더라도 메모리에 유지
+        while len(history.hot) > 2 and (
+            len(history.hot) > max_messages or history.hot_bytes > self.max_session_bytes
+        ):
+            message = history.hot.pop(0)
+            history.hot_sizes.pop(0)
+            spilled.append((history.session_id, history.next_seq, self._serialize(message)))
+            history.next_seq += 1
+
+        if spilled:
+            self._conn.executemany('INSERT INTO messages VALUES (?, ?, ?)', spilled)
+            self._conn.commit()
+            history.spilled_count += len(spilled)
+
+    def _evict_idle_if_due(self):
+        """유휴 세션 정리 (최대 1분에 한 번)"""
+        if time.time() - self._last_eviction < 60:
+            return
+
+        self._last_eviction = time.time()
+        evicted = self.evict_idle()
+        if evicted:
+            print(f"유휴 세션 {evicted}개 정리")
+
+    def _serialize(self, message: Dict) -> str:
+        data = dict(message)
+        if data.get('references'):
+            data['references'] = [
+                {'__page_reference__': ref.to_dict()} if isinstance(ref, PageReference) else ref
+                for ref in data['references']
+            ]
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+    def _deserialize(self, payload: str) -> Dict:
+        data = json.loads(payload)
+        if data.get('references'):
+            data['references'] = [
+                PageReference.from_dict(ref['__page_reference__'])
+                if isinstance(ref, dict) and '__page_reference__' in ref else ref
+                for ref in data['references']
+            ]
+        return data
+
+_session_store: Optional[SessionStore] = None
+_session_store_lock = threading.Lock()
+
+def get_session_store(global_config: Dict = None) -> SessionStore:
+    """프로세스 공용 세션 저장소 (agents.yaml global_config 설정 사용)"""
+    global _session_store
+
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                global_config = global_config or {}
+                _session_store = SessionStore(
+                    hot_turns=global_config.get('session_hot_turns', 10),
+                    max_session_bytes=global_config.get('session_max_bytes', 512 * 1024),
+                    session_timeout=global_config.get('session_timeout', 3600)
+                )
+
+    return _session_store
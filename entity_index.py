@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+엔티티 역색인
+Neptune Analytics의 Entity 노드 ID/이름을 로컬 JSON 파일로 내보내고,
+앱에서는 Aho-Corasick 오토마톤(한/영 동의어 포함)으로 질문 속 엔티티를 LLM/그래프 조회 없이 연결
+"""
+
+import json
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'entity_index.json')
+ENTITY_ID_PREFIX = 'x-amz-bedrock-kb-'
+
+# 한국어/약어 → 영어 엔티티 이름 (엔티티 이름과 정확히 일치하는 항목만 연결됨)
+SYNONYMS = {
+    'pipe': ['배관', '파이프'],
+    'insulation': ['단열', '단열재', '보온재', '절연'],
+    'pipe insulation': ['배관 단열', '배관 보온'],
+    'penetration': ['관통부', '관통'],
+    'hull penetration': ['선체 관통부', '선체 관통'],
+    'support': ['서포트', '지지대', '지지'],
+    'valve': ['밸브'],
+    'emergency shutdown valve': ['비상 차단 밸브', '긴급 차단 밸브', 'esd valve', 'esdv'],
+    'pressure relief valve': ['압력 릴리프 밸브', '압력 방출 밸브', 'prv'],
+    'relief valve': ['릴리프 밸브', '안전 밸브', '안전밸브'],
+    'fire pump': ['소화 펌프', '소방 펌프'],
+    'emergency fire pump': ['비상 소화 펌프', '비상 소방 펌프'],
+    'pump': ['펌프'],
+    'sprinkler': ['스프링클러'],
+    'sprinkler system': ['스프링클러 시스템', '스프링클러 설비'],
+    'co2': ['이산화탄소', '탄산가스', 'carbon dioxide'],
+    'foam': ['폼', '포말', '포소화'],
+    'fire detection': ['화재 탐지', '화재 감지'],
+    'fire main': ['소화 주관'],
+    'fire hydrant': ['소화전'],
+    'fire extinguisher': ['소화기'],
+    'fire safety': ['화재 안전', '소방 안전'],
+    'machinery space': ['기관실', '기관 구역'],
+    'accommodation': ['거주 구역', '거주구'],
+    'cargo tank': ['화물 탱크', '카고 탱크'],
+    'cargo hold': ['화물창'],
+    'deck': ['갑판', '데크'],
+    'upper deck': ['상갑판'],
+    'bulkhead': ['격벽'],
+    'ventilation': ['환기', '통풍'],
+    'gas carrier': ['가스 운반선', '가스선'],
+}
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+|[가-힣]+')
+HANGUL_PATTERN = re.compile(r'[가-힣]')
+
+def _singular(token: str) -> str:
+    """영어 복수형 단순 정규화 (valves → valve, systems → system)"""
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss') and not token[0].isdigit():
+        return token[:-1]
+    return token
+
+def normalize(text: str) -> str:
+    """소문자 + 영숫자/한글 토큰을 공백 1개로 연결"""
+    return ' '.join(_singular(token) for token in TOKEN_PATTERN.findall(text.lower()))
+
+class AhoCorasick:
+    """문자 단위 Aho-Corasick 오토마톤 (패턴 → 값 목록)"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+
+    def add(self, pattern: str, value: str):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append((len(pattern), value))
+
+    def build(self):
+        """실패 링크 계산 (BFS, 모든 패턴 추가 후 1회 호출)"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail if fail != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(시작, 끝, 값) — 겹치는 매칭 포함"""
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._output[state]:
+                yield position - length + 1, position + 1, value
+
+class EntityMatch(NamedTuple):
+    entity_id: str
+    name: str
+    surface: str
+    chunk_count: int
+
+class EntityIndex:
+    """엔티티 이름/동의어 오토마톤 (스레드 간 공유, 읽기 전용)"""
+
+    def __init__(self, entities: List[Dict], synonyms: Dict[str, List[str]] = None,
+                 graph_id: str = '', exported_at: str = ''):
+        self.graph_id = graph_id
+        self.exported_at = exported_at
+        self.names: Dict[str, str] = {entity['id']: entity['name'] for entity in entities}
+        self.chunk_counts: Dict[str, int] = {entity['id']: entity.get('chunks', 0) for entity in entities}
+
+        # 정규화 이름 → 엔티티 ID 목록 (같은 이름의 단수/복수 엔티티는 함께 연결)
+        self._by_name: Dict[str, List[str]] = {}
+        for entity_id, name in self.names.items():
+            key = normalize(name)
+            if key:
+                self._by_name.setdefault(key, []).append(entity_id)
+
+        self._automaton = AhoCorasick()
+        for key in self._by_name:
+            self._add_pattern(key, key)
+
+        for canonical, aliases in (synonyms if synonyms is not None else SYNONYMS).items():
+            canonical_key = normalize(canonical)
+            if canonical_key not in self._by_name:
+                continue
+            for alias in aliases:
+                alias_key = normalize(alias)
+                self._add_pattern(alias_key, canonical_key)
+                # 한국어 복합어는 띄어쓰기 없이 쓰는 경우가 많아 붙여 쓴 형태도 등록
+                if HANGUL_PATTERN.search(alias_key) and ' ' in alias_key:
+                    self._add_pattern(alias_key.replace(' ', ''), canonical_key)
+
+        self._automaton.build()
+
+    def _add_pattern(self, pattern: str, canonical_key: str):
+        # 영어는 단어 경계 단위로 매칭, 한글로 끝나는 패턴은 조사가 붙으므로 뒤 경계를 요구하지 않음
+        if not pattern:
+            return
+        suffix = '' if HANGUL_PATTERN.match(pattern[-1]) else ' '
+        prefix = '' if HANGUL_PATTERN.match(pattern[0]) else ' '
+        self._automaton.add(prefix + pattern + suffix, canonical_key)
+
+    def link(self, text: str, max_chunk_count: int = None) -> List[EntityMatch]:
+        """질문 속 엔티티 연결 (겹치면 가장 왼쪽-가장 긴 매칭 우선)"""
+        normalized = f" {normalize(text)} "
+        candidates = sorted(
+            self._automaton.iter_matches(normalized),
+            key=lambda match: (match[0], -(match[1] - match[0]))
+        )
+
+        matches = []
+        seen = set()
+        covered_until = 0
+        for start, end, canonical_key in candidates:
+            # 경계 공백은 인접 매칭과 공유하므로 겹침 판정에서 제외
+            if normalized[start] == ' ':
+                start += 1
+            if normalized[end - 1] == ' ':
+                end -= 1
+            if start < covered_until:
+                continue
+            covered_until = end
+
+            for entity_id in self._by_name[canonical_key]:
+                if entity_id in seen:
+                    continue
+                if max_chunk_count is not None and self.chunk_counts.get(entity_id, 0) > max_chunk_count:
+                    continue
+                seen.add(entity_id)
+                matches.append(EntityMatch(
+                    entity_id, self.names[entity_id], normalized[start:end], self.chunk_counts.get(entity_id, 0)
+                ))
+
+        return matches
+
+    def search(self, term: str, limit: int = 20) -> List[str]:
+        """UI 검색: 연결된 엔티티 → 이름에 검색어가 포함된 엔티티 (청크 수 내림차순)"""
+        entity_ids = [match.entity_id for match in self.link(term)]
+
+        key = normalize(term)
+        if key:
+            linked = set(entity_ids)
+            contained = [
+                entity_id for name_key, ids in self._by_name.items() if key in name_key
+                for entity_id in ids if entity_id not in linked
+            ]
+            contained.sort(key=lambda entity_id: -self.chunk_counts.get(entity_id, 0))
+            entity_ids.extend(contained)
+
+        return entity_ids[:limit]
+
+_index: Optional[EntityIndex] = None
+_index_mtime: Optional[float] = None
+_index_lock = threading.Lock()
+
+def get_entity_index() -> Optional[EntityIndex]:
+    """프로세스 공용 엔티티 색인 (파일이 없으면 None, 파일이 바뀌면 다시 로드)"""
+    global _index, _index_mtime
+
+    path = os.getenv('ENTITY_INDEX_PATH', DEFAULT_INDEX_PATH)
+    if not os.path.exists(path):
+        return None
+
+    with _index_lock:
+        mtime = os.path.getmtime(path)
+        if _index is None or _index_mtime != mtime:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                _index = EntityIndex(data['entities'], graph_id=data.get('graph_id', ''),
+                                     exported_at=data.get('exported_at', ''))
+                _index_mtime = mtime
+            except Exception as e:
+                print(f"엔티티 색인 로드 실패: {e}")
+                return _index
+
+        return _index
+
+def export_entity_index(graph_id: str = None, output_path: str = None) -> int:
+    """Neptune Analytics Entity 노드(ID, 이름, 포함 청크 수)를 로컬 색인 파일로 내보내기"""
+    from graph_expansion import KB_GRAPH_ID
+    from neptune_analytics_client import get_neptune_analytics_client
+
+    graph_id = graph_id or KB_GRAPH_ID
+    output_path = output_path or os.getenv('ENTITY_INDEX_PATH', DEFAULT_INDEX_PATH)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    print(f"📦 엔티티 색인 내보내기: {graph_id} → {output_path}")
+
+    entities = []
+    rows = get_neptune_analytics_client().iter_results(
+        graph_id,
+        "MATCH (e:Entity) OPTIONAL MATCH (e)<-[:CONTAINS]-(c) RETURN id(e) AS id, count(c) AS chunks"
+    )
+    for row in rows:
+        entity_id = str(row['id'])
+        name = entity_id[len(ENTITY_ID_PREFIX):] if entity_id.startswith(ENTITY_ID_PREFIX) else entity_id
+        entities.append({'id': entity_id, 'name': name, 'chunks': int(row.get('chunks') or 0)})
+
+    entities.sort(key=lambda entity: entity['id'])
+
+    # 임시 파일에 작성 후 교체 (실행 중인 앱은 이전 색인을 계속 사용)
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'graph_id': graph_id,
+            'exported_at': datetime.utcnow().isoformat() + 'Z',
+            'entities': entities
+        }, f, ensure_ascii=False)
+    os.replace(tmp_path, output_path)
+
+    print(f"✅ 색인 완료: 엔티티 {len(entities):,}개")
+    return len(entities)
+
+if __name__ == "__main__":
+    export_entity_index()
@@ -1,116 +1,71 @@
 #!/usr/bin/env python3
 import streamlit as st
-import boto3
-import requests
-from botocore.auth import SigV4Auth
-from botocore.awsrequest import AWSRequest
 from pyvis.network import Network
+from graph_html_cache import get_graph_html_cache
+from graph_layout import LAYOUT_OPTIONS, force_directed_layout
 import streamlit.components.v1 as components
-import tempfile
-import os
+from fss_ontology import get_fss_ontology, local_name
 
-NEPTUNE_ENDPOINT = "shi-neptune-2.cluster-ct0is2emg3pe.us-west-2.neptune.amazonaws.com"
-SPARQL_ENDPOINT = f"https://{NEPTUNE_ENDPOINT}:8182/sparql"
-REGION = "us-west-2"
-
-def run_sparql_query(query):
-    session = boto3.Session()
-    credentials = session.get_credentials()
-    headers = {'Content-Type': 'application/sparql-query', 'Accept': 'application/json'}
-    request = AWSRequest(method='POST', url=SPARQL_ENDPOINT, data=query, headers=headers)
-    SigV4Auth(credentials, 'neptune-db', REGION).add_auth(request)
-    
+def get_full_ontology():
+    """전체 FSS 온톨로지 가져오기 (로컬 N-Triples 스냅샷 우선, 없으면 Neptune 조회)"""
     try:
-        response = requests.post(SPARQL_ENDPOINT, data=query, headers=dict(request.headers))
-        return response.json() if response.status_code == 200 else None
+        return get_fss_ontology()
     except Exception as e:
         st.error(f"Error: {e}")
         return None
 
-def get_full_ontology():
-    """전체 FSS 온톨로지 데이터 가져오기"""
-    query = """
-    PREFIX fss: <http://www.semanticweb.org/fss#>
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    
-    SELECT ?s ?p ?o ?sType ?oType ?sLabel ?oLabel
-    WHERE {
-        ?s ?p ?o .
-        OPTIONAL { ?s rdf:type ?sType }
-        OPTIONAL { ?o rdf:type ?oType }
-        OPTIONAL { ?s rdfs:label ?sLabel }
-        OPTIONAL { ?o rdfs:label ?oLabel }
-        FILTER(STRSTARTS(STR(?s), "http://www.semanticweb.org/fss#") || 
-               STRSTARTS(STR(?p), "http://www.semanticweb.org/fss#"))
-    }
-    """
-    return run_sparql_query(query)
-
-def create_full_graph(data):
+def create_full_graph(ontology):
     """전체 온톨로지 그래프 생성"""
     net = Network(height="900px", width="100%", bgcolor="#1e1e1e", font_color="white")
+    # 좌표는 서버에서 계산 (브라우저 물리 시뮬레이션 비활성화)
     net.set_options("""
     var options = {
-      "physics": {
-        "enabled": true,
-        "barnesHut": {"gravitationalConstant": -8000, "springConstant": 0.001, "springLength": 200},
-        "stabilization": {"iterations": 150}
-      },
+      "physics": {"enabled": false},
       "nodes": {"font": {"size": 12}},
-      "edges": {"font": {"size": 10}, "arrows": {"to": {"enabled": true}}}
+      "edges": {"font": {"size": 10}, "arrows": {"to": {"enabled": true}}, "smooth": false}
     }
     """)
     
     nodes = {}
     edges = set()
     
-    for binding in data['results']['bindings']:
-        s = binding['s']['value']
-        p = binding['p']['value']
-        o = binding['o']['value']
-        
-        # Subject 노드
-        s_id = s.split('#')[-1] if '#' in s else s.split('/')[-1]
-        s_label = binding.get('sLabel', {}).get('value', s_id)
-        s_type = binding.get('sType', {}).get('value', '').split('#')[-1]
-        
-        if s_id not in nodes:
-            nodes[s_id] = {
-                'label': s_label,
-                'type': s_type,
-                'color': get_node_color(s_type),
-                'size': get_node_size(s_type)
+    def add_node(uri):
+        node_id = local_name(uri)
+        if node_id not in nodes:
+            node_type = ontology.type_of(uri)
+            nodes[node_id] = {
+                'label': ontology.label_of(uri),
+                'type': node_type,
+                'color': get_node_color(node_type),
+                'size': get_node_size(node_type)
             }
+        return node_id
+    
+    for s, p, o, object_is_uri in ontology.triples:
+        # Subject 노드
+        s_id = add_node(s)
         
         # Object가 URI인 경우
-        if o.startswith('http'):
-            o_id = o.split('#')[-1] if '#' in o else o.split('/')[-1]
-            o_label = binding.get('oLabel', {}).get('value', o_id)
-            o_type = binding.get('oType', {}).get('value', '').split('#')[-1]
-            
-            if o_id not in nodes:
-                nodes[o_id] = {
-                    'label': o_label,
-                    'type': o_type,
-                    'color': get_node_color(o_type),
-                    'size': get_node_size(o_type)
-                }
+        if object_is_uri:
+            o_id = add_node(o)
             
             # Edge 추가
-            p_label = p.split('#')[-1] if '#' in p else p.split('/')[-1]
-            edge_key = (s_id, o_id, p_label)
-            if edge_key not in edges:
-                edges.add(edge_key)
+            edges.add((s_id, o_id, local_name(p)))
+    
+    positions = force_directed_layout(list(nodes), [(s_id, o_id) for s_id, o_id, _ in edges])
     
     # 노드 추가
     for node_id, node_data in nodes.items():
+        x, y = positions[node_id]
         net.add_node(
             node_id,
             label=node_data['label'],
             title=f"Type: {node_data['type']}",
             color=node_data['color'],
-            size=node_data['size']
+            size=node_data['size'],
+            x=x,
+            y=y,
+            physics=False
         )
     
     # 엣지 추가
@@ -119,6 +74,15 @@ def create_full_graph(data):
     
     return net, len(nodes), len(edges)
 
+def get_full_graph_html(ontology):
+    """온톨로지 그래프 HTML → (html, node_count, edge_count) (같은 온톨로지 버전이면 캐시 사용)"""
+    def render():
+        net, node_count, edge_count = create_full_graph(ontology)
+        return net.generate_html(), {'node_count': node_count, 'edge_count': edge_count}
+    
+    html, info = get_graph_html_cache().get_or_render(('fss_ontology', ontology.version, LAYOUT_OPTIONS), render)
+    return html, info['node_count'], info['edge_count']
+
 def get_node_color(node_type):
     """노드 타입별 색상"""
     colors = {
@@ -175,24 +139,20 @@ def main():
         st.metric("FSS 챕터", "17")
     
     if st.button("🚀 전체 그래프 로드", type="primary"):
-        with st.spinner("Neptune에서 전체 온톨로지를 가져오는 중..."):
-            data = get_full_ontology()
+        with st.spinner("전체 온톨로지를 가져오는 중..."):
+            ontology = get_full_ontology()
         
-        if data and data['results']['bindings']:
-            st.success(f"✅ {len(data['results']['bindings'])}개 트리플 로드 완료")
+        if ontology and ontology.triples:
+            source = f"로컬 스냅샷 {ontology.exported_at}" if ontology.source == 'local' else "Neptune"
+            st.success(f"✅ {len(ontology.triples)}개 트리플 로드 완료 ({source}, 버전 {ontology.version})")
             
             with st.spinner("지식그래프 생성 중..."):
-                net, node_count, edge_count = create_full_graph(data)
+                html_content, node_count, edge_count = get_full_graph_html(ontology)
                 
                 st.info(f"📊 노드: {node_count}개, 엣지: {edge_count}개")
                 
-                # 그래프 표시
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".html") as tmp:
-                    net.save_graph(tmp.name)
-                    with open(tmp.name, 'r', encoding='utf-8') as f:
-                        html_content = f.read()
-                    components.html(html_content, height=850)
-                    os.unlink(tmp.name)
+                # 그래프 표시 (임시 파일 없이 메모리의 HTML 사용)
+                components.html(html_content, height=850)
         else:
             st.error("❌ 데이터를 가져올 수 없습니다.")
     
@@ -0,0 +1,329 @@
+"""
+FSS 온톨로지 로더
+트리플/타입/라벨을 좁은 SPARQL 쿼리 3개로 따로 조회하고 dict 인덱스로 로컬 조인
+(OPTIONAL 4개를 한 번에 조회하면 타입/라벨 수만큼 행이 곱해짐)
+
+온톨로지는 작고 정적이므로 버전이 기록된 로컬 N-Triples 파일로 내보내 두고,
+앱에서는 SPO/POS/OSP 인메모리 인덱스로 조회 (Neptune 클러스터가 꺼져 있어도 동작)
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from sparql_client import get_sparql_client
+
+FSS_NAMESPACE = "http://www.semanticweb.org/fss#"
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+RDFS_LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
+
+PREFIXES = """
+PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+"""
+
+TRIPLES_QUERY = PREFIXES + f"""
+SELECT ?s ?p ?o
+WHERE {{
+    ?s ?p ?o .
+    FILTER(STRSTARTS(STR(?s), "{FSS_NAMESPACE}") || STRSTARTS(STR(?p), "{FSS_NAMESPACE}"))
+}}
+"""
+
+TYPES_QUERY = PREFIXES + f"""
+SELECT ?x ?type
+WHERE {{
+    ?x rdf:type ?type .
+    FILTER(STRSTARTS(STR(?x), "{FSS_NAMESPACE}"))
+}}
+"""
+
+LABELS_QUERY = PREFIXES + f"""
+SELECT ?x ?label
+WHERE {{
+    ?x rdfs:label ?label .
+    FILTER(STRSTARTS(STR(?x), "{FSS_NAMESPACE}"))
+}}
+"""
+
+class Triple(NamedTuple):
+    subject: str
+    predicate: str
+    object: str
+    object_is_uri: bool
+
+def local_name(uri: str) -> str:
+    """URI의 마지막 부분 (fss#Chapter → Chapter)"""
+    return uri.split('#')[-1] if '#' in uri else uri.split('/')[-1]
+
+DEFAULT_ONTOLOGY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'fss_ontology.nt')
+
+class FSSOntology:
+    """FSS 온톨로지 (트리플 목록 + 노드별 타입/라벨 + SPO/POS/OSP 인덱스)"""
+
+    def __init__(self, triples: List[Triple], types: Dict[str, List[str]], labels: Dict[str, str],
+                 source: str = 'neptune', exported_at: str = ''):
+        self.triples = triples
+        self.types = types
+        self.labels = labels
+        self.source = source
+        self.exported_at = exported_at
+
+        digest = hashlib.sha1()
+        for triple in sorted(triples):
+            digest.update('\t'.join(map(str, triple)).encode('utf-8'))
+            digest.update(b'\n')
+        self.version = digest.hexdigest()[:16]
+
+        # 패턴 조회용 인덱스 (값: 트리플 위치 목록)
+        self._spo: Dict[str, Dict[str, List[int]]] = {}
+        self._pos: Dict[str, Dict[str, List[int]]] = {}
+        self._osp: Dict[str, Dict[str, List[int]]] = {}
+        for i, (subject, predicate, obj, _) in enumerate(triples):
+            self._spo.setdefault(subject, {}).setdefault(predicate, []).append(i)
+            self._pos.setdefault(predicate, {}).setdefault(obj, []).append(i)
+            self._osp.setdefault(obj, {}).setdefault(subject, []).append(i)
+
+    def match(self, subject: str = None, predicate: str = None, obj: str = None) -> Iterator[Triple]:
+        """트리플 패턴 조회 (None은 와일드카드)"""
+        if subject is not None:
+            by_predicate = self._spo.get(subject, {})
+            positions = by_predicate.get(predicate, []) if predicate is not None else \
+                [i for indexes in by_predicate.values() for i in indexes]
+        elif predicate is not None:
+            by_object = self._pos.get(predicate, {})
+            positions = by_object.get(obj, []) if obj is not None else \
+                [i for indexes in by_object.values() for i in indexes]
+        elif obj is not None:
+            positions = [i for indexes in self._osp.get(obj, {}).values() for i in indexes]
+        else:
+            positions = range(len(self.triples))
+
+        for i in positions:
+            triple = self.triples[i]
+            if obj is None or triple.object == obj:
+                yield triple
+
+    def instances_of(self, class_name: str) -> List[str]:
+        """클래스(로컬 이름) 인스턴스 URI 목록"""
+        return sorted({triple.subject for triple in self.match(predicate=RDF_TYPE, obj=FSS_NAMESPACE + class_name)})
+
+    def stats(self) -> Dict[str, int]:
+        """온톨로지 통계 (트리플/클래스/인스턴스/프로퍼티/챕터 수)"""
+        fss_types = [triple for triple in self.match(predicate=RDF_TYPE) if triple.object.startswith(FSS_NAMESPACE)]
+        return {
+            'triples': len(self.triples),
+            'classes': len({triple.object for triple in fss_types}),
+            'instances': len({triple.subject for triple in fss_types}),
+            'properties': len(self._pos),
+            'chapters': len(self.instances_of('Chapter'))
+        }
+
+    def type_of(self, uri: str) -> str:
+        """대표 타입 이름 (FSS 네임스페이스 타입 우선, 없으면 빈 문자열)"""
+        types = self.types.get(uri)
+        if not types:
+            return ''
+        fss_types = [t for t in types if t.startswith(FSS_NAMESPACE)]
+        return local_name((fss_types or types)[0])
+
+    def label_of(self, uri: str) -> str:
+        return self.labels.get(uri) or local_name(uri)
+
+NTRIPLE_PATTERN = re.compile(
+    r'^<([^>]*)>\s+<([^>]*)>\s+(?:<([^>]*)>|"((?:[^"\\]|\\.)*)"(?:@[\w-]+|\^\^<[^>]*>)?)\s*\.\s*$'
+)
+LITERAL_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r', '\t': '\\t'}
+LITERAL_UNESCAPE_PATTERN = re.compile(r'\\(.)')
+LITERAL_UNESCAPES = {'n': '\n', 'r': '\r', 't': '\t'}
+
+def _escape_literal(value: str) -> str:
+    return ''.join(LITERAL_ESCAPES.get(char, char) for char in value)
+
+def _unescape_literal(value: str) -> str:
+    return LITERAL_UNESCAPE_PATTERN.sub(lambda m: LITERAL_UNESCAPES.get(m.group(1), m.group(1)), value)
+
+def _index_types_and_labels(triples: List[Triple]):
+    """rdf:type / rdfs:label 트리플에서 노드별 타입/라벨 dict 생성"""
+    types: Dict[str, List[str]] = {}
+    labels: Dict[str, str] = {}
+    for subject, predicate, obj, _ in triples:
+        if not subject.startswith(FSS_NAMESPACE):
+            continue
+        if predicate == RDF_TYPE:
+            types.setdefault(subject, []).append(obj)
+        elif predicate == RDFS_LABEL:
+            labels.setdefault(subject, obj)
+
+    for type_uris in types.values():
+        type_uris.sort()
+    return types, labels
+
+def export_fss_ontology(output_path: str = None) -> Optional[FSSOntology]:
+    """Neptune SPARQL의 FSS 온톨로지를 로컬 N-Triples 파일로 내보내기 (헤더에 버전 기록)"""
+    output_path = output_path or os.getenv('FSS_ONTOLOGY_PATH', DEFAULT_ONTOLOGY_PATH)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    print(f"📦 FSS 온톨로지 내보내기 → {output_path}")
+
+    ontology = load_fss_ontology()
+    if ontology is None:
+        print("❌ 온톨로지 조회 실패")
+        return None
+
+    # 타입/라벨 트리플은 트리플 조회 결과에 포함되지만, 누락분이 있으면 함께 기록
+    triples = set(ontology.triples)
+    for subject, type_uris in ontology.types.items():
+        triples.update(Triple(subject, RDF_TYPE, type_uri, True) for type_uri in type_uris)
+    for subject, label in ontology.labels.items():
+        triples.add(Triple(subject, RDFS_LABEL, label, False))
+
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(f"# version: {ontology.version}\n")
+        f.write(f"# exported_at: {datetime.utcnow().isoformat()}Z\n")
+        for subject, predicate, obj, object_is_uri in sorted(triples):
+            object_term = f"<{obj}>" if object_is_uri else f'"{_escape_literal(obj)}"'
+            f.write(f"<{subject}> <{predicate}> {object_term} .\n")
+    os.replace(tmp_path, output_path)
+
+    print(f"✅ 내보내기 완료: {len(triples)}개 트리플 (버전 {ontology.version})")
+    return ontology
+
+def load_local_fss_ontology(path: str) -> FSSOntology:
+    """로컬 N-Triples 파일에서 온톨로지 로드"""
+    triples = []
+    header = {}
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('#'):
+                key, _, value = line[1:].partition(':')
+                header[key.strip()] = value.strip()
+                continue
+
+            match = NTRIPLE_PATTERN.match(line)
+            if not match:
+                continue
+
+            subject, predicate, object_uri, literal = match.groups()
+            if object_uri is not None:
+                triples.append(Triple(subject, predicate, object_uri, True))
+            else:
+                triples.append(Triple(subject, predicate, _unescape_literal(literal), False))
+
+    # 그래프 표시 대상은 Neptune 조회와 같은 범위 (주어 또는 술어가 FSS 네임스페이스)
+    types, labels = _index_types_and_labels(triples)
+    triples = [
+        triple for triple in triples
+        if triple.subject.startswith(FSS_NAMESPACE) or triple.predicate.startswith(FSS_NAMESPACE)
+    ]
+    return FSSOntology(triples, types, labels, source='local', exported_at=header.get('exported_at', ''))
+
+_ontology: Optional[FSSOntology] = None
+_ontology_mtime: Optional[float] = None
+_ontology_loaded_at = 0.0
+_remote_failed_at = 0.0
+_remote_loading = False
+_ontology_lock = threading.Lock()
+
+def get_fss_ontology(allow_remote: bool = True, neptune_ttl: int = 600,
+                     failure_backoff: int = 60) -> Optional[FSSOntology]:
+    """프로세스 공용 온톨로지 (로컬 파일 우선, 파일이 바뀌면 다시 로드, 없으면 Neptune 조회 결과를 TTL 동안 캐시)
+
+    파일 읽기/Neptune 조회는 잠금 밖에서 수행하고 Neptune 조회는 한 스레드만 실행 (다른 요청은 기존 온톨로지로 바로 반환)
+    조회에 실패하면 failure_backoff초 동안 다시 조회하지 않고 이전 온톨로지(없으면 None)를 계속 반환
+    allow_remote=False이면 Neptune을 조회하지 않고 캐시된 온톨로지만 반환
+    """
+    global _ontology, _ontology_mtime, _ontology_loaded_at, _remote_failed_at, _remote_loading
+
+    path = os.getenv('FSS_ONTOLOGY_PATH', DEFAULT_ONTOLOGY_PATH)
+
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+
+    if mtime is not None:
+        with _ontology_lock:
+            if _ontology is not None and _ontology_mtime == mtime:
+                return _ontology
+
+        try:
+            ontology = load_local_fss_ontology(path)
+        except Exception as e:
+            print(f"로컬 온톨로지 로드 실패: {e}")
+            with _ontology_lock:
+                return _ontology
+
+        with _ontology_lock:
+            _ontology = ontology
+            _ontology_mtime = mtime
+            return _ontology
+
+    with _ontology_lock:
+        if _ontology is not None and _ontology.source == 'neptune' and time.time() - _ontology_loaded_at <= neptune_ttl:
+            return _ontology
+        if not allow_remote or _remote_loading or time.time() - _remote_failed_at < failure_backoff:
+            return _ontology
+        _remote_loading = True
+
+    try:
+        ontology = load_fss_ontology()
+    except Exception as e:
+        print(f"Neptune 온톨로지 로드 실패: {e}")
+        ontology = None
+
+    with _ontology_lock:
+        _remote_loading = False
+        if ontology is None:
+            _remote_failed_at = time.time()
+            return _ontology
+
+        _ontology = ontology
+        _ontology_mtime = None
+        _ontology_loaded_at = time.time()
+        _remote_failed_at = 0.0
+        return _ontology
+
+def _binding_value(binding: Dict, name: str) -> str:
+    return binding[name]['value']
+
+def load_fss_ontology(client=None) -> Optional[FSSOntology]:
+    """Neptune SPARQL에서 온톨로지 로드 (트리플 조회 실패 시 None)"""
+    client = client or get_sparql_client()
+    triples_result, types_result, labels_result = client.query_many([TRIPLES_QUERY, TYPES_QUERY, LABELS_QUERY])
+
+    if triples_result is None:
+        return None
+
+    triples = [
+        Triple(
+            _binding_value(binding, 's'),
+            _binding_value(binding, 'p'),
+            _binding_value(binding, 'o'),
+            binding['o']['type'] == 'uri'
+        )
+        for binding in triples_result['results']['bindings']
+    ]
+
+    types: Dict[str, List[str]] = {}
+    for binding in (types_result or {}).get('results', {}).get('bindings', []):
+        types.setdefault(_binding_value(binding, 'x'), []).append(_binding_value(binding, 'type'))
+    for type_uris in types.values():
+        type_uris.sort()
+
+    labels: Dict[str, str] = {}
+    for binding in (labels_result or {}).get('results', {}).get('bindings', []):
+        labels.setdefault(_binding_value(binding, 'x'), _binding_value(binding, 'label'))
+
+    return FSSOntology(triples, types, labels)
+
+if __name__ == "__main__":
+    export_fss_ontology()
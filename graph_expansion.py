@@ -0,0 +1,138 @@
+"""
+그래프 확장 검색
+벡터 검색으로 찾은 시드 청크에서 Chunk -CONTAINS-> Entity <-CONTAINS- Chunk 경로를 따라
+엔티티를 공유하는 형제 청크를 찾고, 공유 엔티티의 IDF 합으로 점수를 매겨 Rerank 후보에 추가
+(hop마다 파라미터화된 openCypher 쿼리 1개, 전체 시간 예산 안에서만 실행)
+"""
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Sequence
+
+from graph_snapshot import SOURCE_URI_PROPERTY, execute_cypher
+
+KB_GRAPH_ID = os.getenv('NEPTUNE_BDA_GRAPH_ID', 'g-goxs5d7fi3')
+PAGE_NUMBER_PROPERTY = 'metadata_x-amz-bedrock-kb-document-page-number'
+DATA_SOURCE_PROPERTY = 'metadata_x-amz-bedrock-kb-data-source-id'
+
+# 시드 청크의 엔티티(+ 질문에서 연결된 엔티티) → 같은 엔티티를 포함한 청크 (엔티티 문서 빈도 df로 IDF 계산)
+# 너무 흔한 엔티티(df > max_entity_chunks)는 제외하고, 시드/이미 찾은 청크는 결과에서 뺌
+EXPANSION_QUERY = f"""
+MATCH (seed)-[:CONTAINS]->(e)
+WHERE id(seed) IN $seed_ids OR id(e) IN $entity_ids
+WITH DISTINCT e
+MATCH (e)<-[:CONTAINS]-(c)
+WITH e, collect(c) AS chunks, count(c) AS df
+WHERE df <= $max_entity_chunks
+UNWIND chunks AS c
+WITH c, sum(log(1.0 + toFloat($total_chunks) / df)) AS score, count(e) AS shared_entities
+WHERE NOT id(c) IN $exclude_ids
+RETURN id(c) AS id, substring(c.AMAZON_BEDROCK_TEXT, 0, $text_length) AS text,
+       c.`{SOURCE_URI_PROPERTY}` AS source_uri, c.`{PAGE_NUMBER_PROPERTY}` AS page_number,
+       c.`{DATA_SOURCE_PROPERTY}` AS data_source_id, score, shared_entities
+ORDER BY score DESC LIMIT $limit
+"""
+
+CHUNK_COUNT_QUERY = "MATCH (c)-[:FROM]->() RETURN count(c) AS chunks"
+
+class ExpandedChunk(NamedTuple):
+    chunk_id: str
+    text: str
+    source_uri: str
+    page_number: int
+    data_source_id: str
+    score: float
+    shared_entities: int
+    hop: int
+
+_chunk_counts: Dict[str, int] = {}
+_chunk_counts_lock = threading.Lock()
+
+class GraphExpander:
+    """시드 청크 기반 형제 청크 확장"""
+
+    def __init__(self, graph_id: str = KB_GRAPH_ID, max_entity_chunks: int = 50,
+                 text_length: int = 1000, hop_decay: float = 0.5, min_query_ms: int = 100):
+        self.graph_id = graph_id
+        self.max_entity_chunks = max_entity_chunks
+        self.text_length = text_length
+        self.hop_decay = hop_decay
+        self.min_query_ms = min_query_ms
+
+    def expand(self, seed_chunk_ids: Sequence[str], depth: int = 1, max_results: int = 5,
+               time_budget_ms: int = 1500, entity_ids: Sequence[str] = ()) -> List[ExpandedChunk]:
+        """형제 청크 → 점수 내림차순 (hop이 늘어날 때마다 점수에 hop_decay를 곱함)
+
+        entity_ids(엔티티 색인으로 질문에서 연결한 엔티티)는 첫 hop에만 시드 엔티티로 추가
+        시간 예산을 넘기거나 쿼리가 실패하면 그때까지 찾은 결과만 반환
+        """
+        deadline = time.time() + time_budget_ms / 1000
+        seen = set(seed_chunk_ids)
+        frontier = list(seed_chunk_ids)
+        linked_entities = list(entity_ids)
+        found: List[ExpandedChunk] = []
+
+        for hop in range(1, depth + 1):
+            remaining_ms = int((deadline - time.time()) * 1000)
+            if not (frontier or linked_entities) or remaining_ms < self.min_query_ms:
+                break
+
+            try:
+                rows = execute_cypher(
+                    self.graph_id,
+                    EXPANSION_QUERY,
+                    parameters={
+                        'seed_ids': frontier,
+                        'entity_ids': linked_entities,
+                        'exclude_ids': list(seen),
+                        'max_entity_chunks': self.max_entity_chunks,
+                        'total_chunks': self._total_chunks(),
+                        'text_length': self.text_length,
+                        'limit': max_results
+                    },
+                    timeout_ms=remaining_ms
+                )
+            except Exception as e:
+                print(f"그래프 확장 중단 (hop {hop}): {e}")
+                break
+
+            decay = self.hop_decay ** (hop - 1)
+            frontier = []
+            linked_entities = []
+            for row in rows:
+                chunk_id = str(row['id'])
+                seen.add(chunk_id)
+                frontier.append(chunk_id)
+                found.append(ExpandedChunk(
+                    chunk_id=chunk_id,
+                    text=row.get('text') or '',
+                    source_uri=row.get('source_uri') or '',
+                    page_number=int(float(row.get('page_number') or 1)),
+                    data_source_id=row.get('data_source_id') or '',
+                    score=float(row.get('score') or 0.0) * decay,
+                    shared_entities=int(row.get('shared_entities') or 0),
+                    hop=hop
+                ))
+
+        found.sort(key=lambda chunk: -chunk.score)
+        return found[:max_results]
+
+    def _total_chunks(self) -> int:
+        """IDF 계산용 전체 청크 수 (그래프별 1회 조회)"""
+        with _chunk_counts_lock:
+            count = _chunk_counts.get(self.graph_id)
+        if count:
+            return count
+
+        try:
+            rows = execute_cypher(self.graph_id, CHUNK_COUNT_QUERY)
+            count = int(rows[0]['chunks']) if rows else 0
+        except Exception as e:
+            # 실패는 캐시하지 않음 (IDF 순위는 전체 청크 수와 무관하게 df 순으로 유지)
+            print(f"청크 수 조회 실패: {e}")
+            return 1
+
+        count = max(count, 1)
+        with _chunk_counts_lock:
+            _chunk_counts[self.graph_id] = count
+        return count
@@ -0,0 +1,222 @@
+"""
+Neptune Analytics 그래프 이웃 탐색
+문서/엔티티 검색으로 시작 노드를 고른 뒤 이웃을 1 hop씩 페이지 단위로 조회하고
+(세션에 보관한 현재 hop의 frontier와 마지막 노드 ID 기준 keyset 페이지, hop마다 쿼리 타임아웃 적용),
+세션에 보관한 탐색 그래프에 점진적으로 병합
+"""
+from typing import Dict, List, Sequence, Tuple
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from entity_index import get_entity_index
+from graph_layout import force_directed_layout
+from graph_snapshot import Edge, Node, SOURCE_URI_PROPERTY, compact_node, execute_cypher, node_projection
+from knowledge_graph import build_network
+
+class GraphExplorer:
+    """시작 노드 검색과 1-hop 이웃 페이지 조회"""
+
+    def __init__(self, graph_id: str, page_size: int = 200, edge_limit: int = 1000, max_hops: int = 3,
+                 timeout_ms: int = 5000):
+        self.graph_id = graph_id
+        self.page_size = page_size
+        self.edge_limit = edge_limit
+        self.max_hops = max_hops
+        self.timeout_ms = timeout_ms
+
+    def search_seeds(self, term: str, limit: int = 20) -> List[Node]:
+        """엔티티 ID 또는 문서(source URI)에 검색어가 포함된 노드
+
+        로컬 엔티티 색인이 있으면 한/영 동의어로 엔티티를 먼저 찾아 ID로만 조회 (전체 노드 스캔 생략)
+        """
+        index = get_entity_index()
+        if index and index.graph_id in ('', self.graph_id):
+            entity_ids = index.search(term, limit)
+            if entity_ids:
+                rows = execute_cypher(
+                    self.graph_id,
+                    f"MATCH (n) WHERE id(n) IN $ids RETURN {node_projection('n')}",
+                    parameters={'ids': entity_ids}
+                )
+                order = {entity_id: i for i, entity_id in enumerate(entity_ids)}
+                return sorted((compact_node(row) for row in rows), key=lambda node: order.get(node[0], len(order)))
+
+        rows = execute_cypher(
+            self.graph_id,
+            f"MATCH (n) WHERE toLower(id(n)) CONTAINS $term "
+            f"OR toLower(n.`{SOURCE_URI_PROPERTY}`) CONTAINS $term "
+            f"RETURN {node_projection('n')} LIMIT $limit",
+            parameters={'term': term.strip().lower(), 'limit': limit}
+        )
+        return [compact_node(row) for row in rows]
+
+    def expand(self, frontier_ids: Sequence[str], known_ids: Sequence[str],
+               after: str = '') -> Tuple[List[Node], List[Edge], bool]:
+        """frontier 노드의 1-hop 이웃 중 아직 로드되지 않은 노드 1페이지 → (노드, 엣지, 이 hop의 다음 페이지 여부)
+
+        페이지는 노드 ID 순이며 after(이전 페이지 마지막 노드 ID) 다음부터 조회
+        엣지는 이번 페이지 노드와 이미 로드된 노드 사이의 것만 조회
+        """
+        rows = execute_cypher(
+            self.graph_id,
+            f"MATCH (s)--(m) WHERE id(s) IN $frontier_ids AND NOT id(m) IN $known_ids AND id(m) > $after "
+            f"WITH DISTINCT m ORDER BY id(m) LIMIT $limit "
+            f"RETURN {node_projection('m')}",
+            parameters={
+                'frontier_ids': list(frontier_ids),
+                'known_ids': list(known_ids),
+                'after': after,
+                'limit': self.page_size + 1
+            },
+            timeout_ms=self.timeout_ms
+        )
+
+        has_more = len(rows) > self.page_size
+        nodes = [compact_node(row) for row in rows[:self.page_size]]
+
+        new_ids = [node[0] for node in nodes]
+        all_ids = list(set(new_ids) | set(known_ids))
+        edges = self._edges_between(new_ids, all_ids) if new_ids else []
+
+        return nodes, edges, has_more
+
+    def _edges_between(self, new_ids: List[str], all_ids: List[str]) -> List[Edge]:
+        rows = execute_cypher(
+            self.graph_id,
+            "MATCH (a)-[r]->(b) "
+            "WHERE (id(a) IN $new_ids AND id(b) IN $all_ids) OR (id(b) IN $new_ids AND id(a) IN $all_ids) "
+            "RETURN type(r) as label, id(a) as source, id(b) as target LIMIT $limit",
+            parameters={'new_ids': new_ids, 'all_ids': all_ids, 'limit': self.edge_limit},
+            timeout_ms=self.timeout_ms
+        )
+        return [(str(row['source']), str(row['target']), row.get('label') or 'relates') for row in rows]
+
+def _new_exploration() -> Dict:
+    return {
+        'candidates': [],
+        'nodes': {},
+        'edges': set(),
+        'positions': {},
+        'hops': 1,
+        'hop': 1,
+        'frontier': [],
+        'next_frontier': [],
+        'after': '',
+        'has_more': False
+    }
+
+def _start_exploration(state: Dict, seed_ids: Sequence[str], hops: int):
+    """시작 노드 기준 1 hop부터 새 탐색 (이미 로드된 노드/엣지는 유지)"""
+    state['hops'] = hops
+    state['hop'] = 1
+    state['frontier'] = list(seed_ids)
+    state['next_frontier'] = []
+    state['after'] = ''
+
+def _merge_page(state: Dict, explorer: GraphExplorer):
+    """현재 hop의 다음 페이지를 탐색 그래프에 병합 (hop의 마지막 페이지면 찾은 노드를 다음 hop의 frontier로)"""
+    nodes, edges, has_more = explorer.expand(state['frontier'], list(state['nodes']), state['after'])
+
+    for node in nodes:
+        state['nodes'].setdefault(node[0], node)
+    state['edges'].update(edges)
+    state['next_frontier'].extend(node[0] for node in nodes)
+
+    if has_more:
+        state['after'] = nodes[-1][0]
+    elif state['hop'] < min(state['hops'], explorer.max_hops) and state['next_frontier']:
+        state['hop'] += 1
+        state['frontier'] = state['next_frontier']
+        state['next_frontier'] = []
+        state['after'] = ''
+        has_more = True
+    else:
+        state['frontier'] = []
+    state['has_more'] = has_more
+
+    # 기존 노드 좌표에서 시작해 새 노드만 자리를 잡도록 짧게 재계산
+    state['positions'] = force_directed_layout(
+        list(state['nodes']),
+        [(source, target) for source, target, _ in state['edges']],
+        iterations=30,
+        initial_positions=state['positions']
+    )
+
+def render_graph_explorer(graph_id: str, node_style, key: str):
+    """이웃 탐색 UI (탐색 그래프는 st.session_state[key]에 보관)"""
+    state = st.session_state.setdefault(key, _new_exploration())
+    explorer = GraphExplorer(graph_id)
+
+    # 1. 시작 노드 검색
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        term = st.text_input("문서/엔티티 검색", placeholder="예: SOLAS, fire pump", key=f"{key}_term")
+    with col2:
+        st.write("")
+        if st.button("🔍 검색", key=f"{key}_search", use_container_width=True) and term.strip():
+            try:
+                state['candidates'] = explorer.search_seeds(term)
+            except Exception as e:
+                st.error(f"검색 실패: {e}")
+
+    if state['candidates']:
+        candidate_names = {node[0]: node_style(node)[0] for node in state['candidates']}
+        seed_ids = st.multiselect(
+            "시작 노드",
+            options=list(candidate_names),
+            format_func=lambda node_id: candidate_names[node_id],
+            key=f"{key}_seeds"
+        )
+        hops = st.select_slider("탐색 깊이 (hop)", options=[1, 2, 3], value=1, key=f"{key}_hops")
+
+        if st.button("🧭 탐색 시작", key=f"{key}_start", disabled=not seed_ids):
+            candidates = state['candidates']
+            state.clear()
+            state.update(_new_exploration())
+            state['candidates'] = candidates
+            _start_exploration(state, seed_ids, hops)
+            for node in candidates:
+                if node[0] in seed_ids:
+                    state['nodes'][node[0]] = node
+
+            try:
+                _merge_page(state, explorer)
+            except Exception as e:
+                st.error(f"이웃 조회 실패: {e}")
+
+    if not state['nodes']:
+        st.info("문서나 엔티티를 검색해 시작 노드를 선택하세요.")
+        return
+
+    # 2. 추가 확장 (다음 페이지 / 선택 노드 기준 새 탐색)
+    col1, col2, col3 = st.columns([2, 3, 1])
+    with col1:
+        if state['has_more'] and st.button(f"➕ 다음 {explorer.page_size}개 불러오기", key=f"{key}_more"):
+            try:
+                _merge_page(state, explorer)
+            except Exception as e:
+                st.error(f"이웃 조회 실패: {e}")
+    with col2:
+        node_names = {node_id: node_style(node)[0] for node_id, node in state['nodes'].items()}
+        expand_id = st.selectbox(
+            "확장할 노드",
+            options=list(node_names),
+            format_func=lambda node_id: node_names[node_id],
+            key=f"{key}_expand_id"
+        )
+        if st.button("🔗 선택 노드 이웃 확장", key=f"{key}_expand"):
+            _start_exploration(state, [expand_id], state['hops'])
+            try:
+                _merge_page(state, explorer)
+            except Exception as e:
+                st.error(f"이웃 조회 실패: {e}")
+    with col3:
+        if st.button("🗑️ 초기화", key=f"{key}_reset"):
+            st.session_state[key] = _new_exploration()
+            st.rerun()
+
+    # 3. 탐색 그래프 렌더링
+    st.caption(f"탐색 그래프: 노드 {len(state['nodes']):,}개, 엣지 {len(state['edges']):,}개")
+    net = build_network(list(state['nodes'].values()), list(state['edges']), node_style, state['positions'])
+    components.html(net.generate_html(), height=900)
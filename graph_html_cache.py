@@ -0,0 +1,50 @@
+"""
+그래프 HTML 캐시
+pyvis generate_html() 결과를 (그래프 ID, 스냅샷 버전, 레이아웃 옵션) 키로 메모리에 보관하여
+같은 그래프를 다시 열거나 rerun될 때 네트워크 생성/HTML 렌더링을 건너뜀
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+class GraphHTMLCache:
+    """전체 HTML 크기 기준 LRU 캐시 (값: (html, info))"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key: Hashable, render: Callable[[], Tuple[str, Dict[str, Any]]]) -> Tuple[str, Dict[str, Any]]:
+        """캐시된 HTML 반환 (없으면 render() 결과를 저장 후 반환)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        html, info = render()
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (html, info)
+                self._total_bytes += len(html)
+
+            # 방금 넣은 항목은 한도를 넘더라도 유지
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (evicted_html, _) = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted_html)
+
+        return html, info
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+_html_cache = GraphHTMLCache()
+
+def get_graph_html_cache() -> GraphHTMLCache:
+    """프로세스 공용 그래프 HTML 캐시"""
+    return _html_cache
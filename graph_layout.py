@@ -0,0 +1,140 @@
+"""
+그래프 정적 레이아웃
+브라우저 물리 시뮬레이션 대신 서버에서 Fruchterman-Reingold 레이아웃을 NumPy로 계산하고,
+그래프 스냅샷 버전별로 좌표를 캐시
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+Position = Tuple[float, float]
+
+# 노드 1개당 표시 간격 (px)
+NODE_SPACING = 60
+# 척력 계산 시 한 번에 처리하는 행 수 (n×블록 크기 거리 행렬만 메모리에 유지)
+REPULSION_BLOCK_SIZE = 512
+DEFAULT_ITERATIONS = 60
+
+# 레이아웃 결과에 영향을 주는 옵션 (그래프 HTML 캐시 키에 포함)
+LAYOUT_OPTIONS = (('algorithm', 'fruchterman_reingold'), ('iterations', DEFAULT_ITERATIONS), ('spacing', NODE_SPACING))
+
+def force_directed_layout(node_ids: Sequence[str], edges: Iterable[Tuple[str, str]],
+                          iterations: int = DEFAULT_ITERATIONS, initial_positions: Dict[str, Position] = None,
+                          seed: int = 42) -> Dict[str, Position]:
+    """Fruchterman-Reingold 레이아웃 → {node_id: (x, y)} (px 단위, 원점 중심)"""
+    n = len(node_ids)
+    if n == 0:
+        return {}
+
+    scale = NODE_SPACING * np.sqrt(n)
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+
+    rng = np.random.default_rng(seed)
+    pos = rng.random((n, 2), dtype=np.float32)
+
+    # 기존 좌표가 있는 노드는 그 위치에서 시작 (탐색 그래프 확장 시 화면이 크게 바뀌지 않도록)
+    if initial_positions:
+        for node_id, (x, y) in initial_positions.items():
+            i = index.get(node_id)
+            if i is not None:
+                pos[i] = (x / (2 * scale) + 0.5, y / (2 * scale) + 0.5)
+
+    edge_pairs = np.array(
+        [(index[source], index[target]) for source, target in edges
+         if source in index and target in index and source != target],
+        dtype=np.int64
+    ).reshape(-1, 2)
+
+    k = np.float32(np.sqrt(1.0 / n))
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        displacement = np.zeros_like(pos)
+
+        # 척력: k² / d (블록 단위로 계산)
+        # Σ_j (p_i - p_j)·w_ij = p_i·Σ_j w_ij - (W @ P)_i 로 전개해 3차원 차이 배열 생성을 피함
+        squared_norm = (pos * pos).sum(axis=1)
+        for start in range(0, n, REPULSION_BLOCK_SIZE):
+            end = start + REPULSION_BLOCK_SIZE
+            block = pos[start:end]
+            squared_distance = squared_norm[start:end, None] + squared_norm[None, :] - 2 * block @ pos.T
+            weight = k * k / np.maximum(squared_distance, 1e-4)
+            displacement[start:end] += block * weight.sum(axis=1)[:, None] - weight @ pos
+
+        # 인력: d² / k (엣지 양 끝점)
+        if len(edge_pairs):
+            delta = pos[edge_pairs[:, 0]] - pos[edge_pairs[:, 1]]
+            distance = np.maximum(np.linalg.norm(delta, axis=1), 0.01)
+            force = delta * (distance / k)[:, None]
+            np.add.at(displacement, edge_pairs[:, 0], -force)
+            np.add.at(displacement, edge_pairs[:, 1], force)
+
+        # 온도만큼만 이동 후 냉각
+        length = np.maximum(np.linalg.norm(displacement, axis=1), 0.01)
+        pos += displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    pos -= pos.mean(axis=0)
+    extent = np.abs(pos).max() or 1.0
+    pos *= scale / extent
+
+    return {node_id: (float(pos[i, 0]), float(pos[i, 1])) for node_id, i in index.items()}
+
+class LayoutCache:
+    """레이아웃 좌표 캐시 (키: 그래프 ID + 스냅샷 버전 등, 키별 계산은 동시에 1번만)"""
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._compute_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, node_ids: Sequence[str],
+                       edges: Iterable[Tuple[str, str]]) -> Dict[str, Position]:
+        positions = self._get(key)
+        if positions is not None:
+            return positions
+
+        # 같은 키를 동시에 요청한 세션은 먼저 시작한 계산이 끝나기를 기다렸다가 결과를 사용
+        with self._lock:
+            compute_lock = self._compute_locks.setdefault(key, threading.Lock())
+
+        with compute_lock:
+            positions = self._get(key)
+            if positions is not None:
+                return positions
+
+            try:
+                positions = force_directed_layout(node_ids, edges)
+                with self._lock:
+                    self._entries[key] = positions
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            finally:
+                with self._lock:
+                    self._compute_locks.pop(key, None)
+
+        return positions
+
+    def _get(self, key: Hashable) -> Optional[Dict[str, Position]]:
+        with self._lock:
+            positions = self._entries.get(key)
+            if positions is not None:
+                self._entries.move_to_end(key)
+            return positions
+
+_layout_cache = LayoutCache()
+
+def get_snapshot_layout(snapshot) -> Optional[Dict[str, Position]]:
+    """그래프 스냅샷 레이아웃 (스냅샷 버전별 1회 계산)"""
+    if not snapshot.nodes:
+        return None
+
+    return _layout_cache.get_or_compute(
+        (snapshot.graph_id, snapshot.version),
+        [node[0] for node in snapshot.nodes],
+        [(source, target) for source, target, _ in snapshot.edges]
+    )
@@ -0,0 +1,216 @@
+"""
+Neptune Analytics 그래프 스냅샷 캐시
+그래프 ID별로 노드/엣지를 압축된 튜플 형태로 프로세스 메모리에 보관하고,
+TTL이 지나면 백그라운드 스레드에서 갱신 (갱신 중에는 이전 스냅샷으로 렌더링)
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from neptune_analytics_client import get_neptune_analytics_client
+
+# 노드 표시 이름 계산에 사용하는 본문 앞부분 길이
+TEXT_PREFIX_LENGTH = 200
+SOURCE_URI_PROPERTY = 'metadata_x-amz-bedrock-kb-source-uri'
+
+# 압축 표현
+#   노드: (id, labels, text_prefix, source_uri, property_keys)
+#   엣지: (source, target, label)
+Node = Tuple[str, Tuple[str, ...], str, str, Tuple[str, ...]]
+Edge = Tuple[str, str, str]
+
+# 노드 조회 모드
+#   label: 표시 이름 계산에 필요한 필드만 서버에서 잘라서 반환 (본문 전체를 전송하지 않음)
+#   full: properties(n) 전체를 받아 클라이언트에서 압축
+def node_projection(var: str = 'n') -> str:
+    """label 모드 RETURN 절 (그래프 탐색 쿼리와 공유)"""
+    return (
+        f"id({var}) as id, labels({var}) as labels, "
+        f"substring({var}.AMAZON_BEDROCK_TEXT, 0, {TEXT_PREFIX_LENGTH}) as text, "
+        f"{var}.`{SOURCE_URI_PROPERTY}` as source_uri, keys({var}) as property_keys"
+    )
+
+NODE_QUERIES = {
+    'label': f"MATCH (n) RETURN {node_projection('n')} LIMIT {{limit}}",
+    'full': "MATCH (n) RETURN id(n) as id, labels(n) as labels, properties(n) as properties LIMIT {limit}"
+}
+
+def execute_cypher(graph_id: str, query: str, parameters: Dict = None, timeout_ms: int = None) -> List[Dict]:
+    """openCypher 쿼리 실행 → results 목록 (공용 Neptune Analytics 클라이언트 사용)"""
+    return get_neptune_analytics_client().execute(graph_id, query, parameters, timeout_ms)
+
+def compact_node(row: Dict) -> Node:
+    """label 모드 조회 결과 1행 → 압축 노드"""
+    return (
+        str(row['id']),
+        tuple(row.get('labels') or ()),
+        row.get('text') or '',
+        row.get('source_uri') or '',
+        tuple(row.get('property_keys') or ())
+    )
+
+class GraphSnapshot:
+    """그래프 1개의 스냅샷 (변경하지 않고 교체, version은 내용이 바뀔 때만 증가)"""
+
+    __slots__ = ('graph_id', 'nodes', 'edges', 'total_nodes', 'total_edges', 'loaded_at', 'version', 'content_hash')
+
+    def __init__(self, graph_id: str, nodes: List[Node], edges: List[Edge],
+                 total_nodes: int, total_edges: int, version: int):
+        self.graph_id = graph_id
+        self.nodes = nodes
+        self.edges = edges
+        self.total_nodes = total_nodes
+        self.total_edges = total_edges
+        self.loaded_at = time.time()
+        self.version = version
+        self.content_hash = content_hash(nodes, edges, total_nodes, total_edges)
+
+def content_hash(nodes: List[Node], edges: List[Edge], total_nodes: int, total_edges: int) -> int:
+    """스냅샷 내용 해시 (프로세스 안에서만 비교, 레이아웃/HTML 캐시 무효화 판단용)"""
+    return hash((tuple(nodes), tuple(edges), total_nodes, total_edges))
+
+class GraphSnapshotCache:
+    """그래프 ID별 스냅샷 캐시 (모든 사용자 세션이 공유)"""
+
+    def __init__(self, ttl: int = 900, node_limit: int = 2000, edge_limit: int = 3000,
+                 node_mode: str = 'label'):
+        self.ttl = ttl
+        self.node_mode = node_mode
+        self.node_limit = node_limit
+        self.edge_limit = edge_limit
+
+        self._snapshots: Dict[str, GraphSnapshot] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get(self, graph_id: str) -> GraphSnapshot:
+        """스냅샷 반환 (최초 1회만 동기 로드, 만료된 경우 이전 스냅샷 반환 후 백그라운드 갱신)"""
+        snapshot = self._snapshots.get(graph_id)
+
+        if snapshot is None:
+            with self._get_load_lock(graph_id):
+                # 다른 세션이 먼저 로드했으면 그대로 사용
+                snapshot = self._snapshots.get(graph_id)
+                if snapshot is None:
+                    snapshot = self._load(graph_id)
+            return snapshot
+
+        if time.time() - snapshot.loaded_at > self.ttl:
+            self._refresh_in_background(graph_id)
+
+        return snapshot
+
+    def invalidate(self, graph_id: str):
+        """스냅샷 제거 (다음 조회 시 다시 로드)"""
+        with self._lock:
+            self._snapshots.pop(graph_id, None)
+
+    def _get_load_lock(self, graph_id: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(graph_id, threading.Lock())
+
+    def _refresh_in_background(self, graph_id: str):
+        """그래프별 갱신 스레드는 최대 1개"""
+        with self._lock:
+            if graph_id in self._refreshing:
+                return
+            self._refreshing.add(graph_id)
+
+        def refresh():
+            try:
+                with self._get_load_lock(graph_id):
+                    self._load(graph_id)
+            except Exception as e:
+                print(f"그래프 스냅샷 갱신 실패 ({graph_id}): {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(graph_id)
+
+        threading.Thread(target=refresh, name=f"graph-snapshot-{graph_id}", daemon=True).start()
+
+    def _load(self, graph_id: str) -> GraphSnapshot:
+        """Neptune에서 노드/엣지를 조회하여 압축 스냅샷 생성 (실패 시 예외 전달)"""
+        start_time = time.time()
+
+        total_nodes = self._query(graph_id, "MATCH (n) RETURN count(n) as count")
+        total_edges = self._query(graph_id, "MATCH ()-[r]->() RETURN count(r) as count")
+
+        node_rows = self._query(graph_id, NODE_QUERIES[self.node_mode].format(limit=self.node_limit))
+        edge_rows = self._query(
+            graph_id,
+            f"MATCH (a)-[r]->(b) RETURN type(r) as label, id(a) as source, id(b) as target LIMIT {self.edge_limit}"
+        )
+
+        nodes = [self._compact_node(row) for row in node_rows if row.get('id')]
+
+        edges = [
+            (str(row.get('source', '')), str(row.get('target', '')), row.get('label') or 'relates')
+            for row in edge_rows
+        ]
+
+        total_nodes = (total_nodes or [{}])[0].get('count', 0)
+        total_edges = (total_edges or [{}])[0].get('count', 0)
+
+        # 내용이 같으면 버전을 유지해 레이아웃/HTML 캐시를 그대로 사용
+        previous = self._snapshots.get(graph_id)
+        version = 1
+        if previous:
+            unchanged = previous.content_hash == content_hash(nodes, edges, total_nodes, total_edges)
+            version = previous.version if unchanged else previous.version + 1
+
+        snapshot = GraphSnapshot(graph_id, nodes, edges, total_nodes, total_edges, version)
+
+        with self._lock:
+            self._snapshots[graph_id] = snapshot
+
+        print(f"그래프 스냅샷 로드 ({graph_id}): 노드 {len(nodes)}개, 엣지 {len(edges)}개, "
+              f"{time.time() - start_time:.1f}초")
+        return snapshot
+
+    def _compact_node(self, row: Dict) -> Node:
+        if self.node_mode == 'label':
+            return compact_node(row)
+
+        properties = row.get('properties') or {}
+        return (
+            str(row['id']),
+            tuple(row.get('labels') or ()),
+            (properties.get('AMAZON_BEDROCK_TEXT') or '')[:TEXT_PREFIX_LENGTH],
+            properties.get(SOURCE_URI_PROPERTY) or '',
+            tuple(properties.keys())
+        )
+
+    def fetch_node_properties(self, graph_id: str, node_id: str) -> Optional[Dict]:
+        """노드 1개의 전체 속성 조회 (상세 보기 시점에만 호출)"""
+        rows = self._query(
+            graph_id,
+            "MATCH (n) WHERE id(n) = $node_id RETURN labels(n) as labels, properties(n) as properties",
+            parameters={'node_id': node_id}
+        )
+        return rows[0] if rows else None
+
+    def _query(self, graph_id: str, query: str, parameters: Dict = None) -> List[Dict]:
+        return execute_cypher(graph_id, query, parameters)
+
+_snapshot_cache: Optional[GraphSnapshotCache] = None
+_snapshot_cache_lock = threading.Lock()
+
+def get_graph_snapshot_cache() -> GraphSnapshotCache:
+    """프로세스 공용 그래프 스냅샷 캐시"""
+    global _snapshot_cache
+
+    if _snapshot_cache is None:
+        with _snapshot_cache_lock:
+            if _snapshot_cache is None:
+                _snapshot_cache = GraphSnapshotCache()
+
+    return _snapshot_cache
+
+def get_graph_snapshot(graph_id: str) -> GraphSnapshot:
+    """그래프 스냅샷 조회"""
+    return get_graph_snapshot_cache().get(graph_id)
+
+def fetch_node_properties(graph_id: str, node_id: str) -> Optional[Dict]:
+    """노드 전체 속성 조회 (스냅샷에는 보관하지 않음)"""
+    return get_graph_snapshot_cache().fetch_node_properties(graph_id, node_id)
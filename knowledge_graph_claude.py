@@ -1,184 +1,82 @@
-import boto3
+import os
 import streamlit as st
-from pyvis.network import Network
 
-def get_neptune_client():
-    from botocore.config import Config
-    return boto3.client(
-        'neptune-graph', 
-        region_name='us-west-2',
-        config=Config(retries={"total_max_attempts": 1, "mode": "standard"}, read_timeout=None)
-    )
+from graph_layout import get_snapshot_layout
+from graph_snapshot import get_graph_snapshot
+from knowledge_graph import build_network, snapshot_html
+
+# 환경변수에서 Claude Neptune Graph ID 가져오기
+CLAUDE_GRAPH_ID = os.getenv('NEPTUNE_CLAUDE_GRAPH_ID', 'g-ryb6suoa69')
 
 def get_neptune_graph_data_claude():
-    """Neptune Analytics Claude 그래프에서 데이터 가져오기"""
+    """Neptune Analytics Claude 그래프에서 데이터 가져오기 (공유 스냅샷 캐시 사용, 실패 시 None)"""
     try:
-        neptune_client = get_neptune_client()
-        
-        # 환경변수에서 Claude Neptune Graph ID 가져오기
-        import os
-        graph_id = os.getenv('NEPTUNE_CLAUDE_GRAPH_ID', 'g-ryb6suoa69')
-        
-        # 노드 쿼리 (최대 2000개) - openCypher
-        nodes_query = "MATCH (n) RETURN id(n) as id, labels(n) as labels, properties(n) as properties LIMIT 2000"
-        nodes_response = neptune_client.execute_query(
-            graphIdentifier=graph_id,
-            queryString=nodes_query,
-            language='OPEN_CYPHER'
-        )
-        
-        # 엣지 쿼리 (최대 3000개) - openCypher
-        edges_query = "MATCH (a)-[r]->(b) RETURN id(r) as id, type(r) as label, id(a) as source, id(b) as target LIMIT 3000"
-        edges_response = neptune_client.execute_query(
-            graphIdentifier=graph_id,
-            queryString=edges_query,
-            language='OPEN_CYPHER'
-        )
-        
-        import json
-        
-        nodes_data = json.loads(nodes_response['payload'].read().decode('utf-8'))
-        edges_data = json.loads(edges_response['payload'].read().decode('utf-8'))
-        
-        # 전체 노드/엣지 개수 확인
-        total_nodes_query = "MATCH (n) RETURN count(n) as count"
-        total_edges_query = "MATCH ()-[r]->() RETURN count(r) as count"
+        snapshot = get_graph_snapshot(CLAUDE_GRAPH_ID)
         
-        total_nodes_response = neptune_client.execute_query(
-            graphIdentifier=graph_id,
-            queryString=total_nodes_query,
-            language='OPEN_CYPHER'
-        )
+        st.info(f"**Claude 그래프 전체:** 노드 {snapshot.total_nodes:,}개, 엣지 {snapshot.total_edges:,}개\n\n**현재 표시:** 노드 {len(snapshot.nodes):,}개, 엣지 {len(snapshot.edges):,}개")
         
-        total_edges_response = neptune_client.execute_query(
-            graphIdentifier=graph_id,
-            queryString=total_edges_query,
-            language='OPEN_CYPHER'
-        )
-        
-        total_nodes_data = json.loads(total_nodes_response['payload'].read().decode('utf-8'))
-        total_edges_data = json.loads(total_edges_response['payload'].read().decode('utf-8'))
-        
-        total_nodes_count = total_nodes_data.get('results', [{}])[0].get('count', 0)
-        total_edges_count = total_edges_data.get('results', [{}])[0].get('count', 0)
-        display_nodes_count = len(nodes_data.get('results', []))
-        display_edges_count = len(edges_data.get('results', []))
-        
-        st.info(f"**Claude 그래프 전체:** 노드 {total_nodes_count:,}개, 엣지 {total_edges_count:,}개\n\n**현재 표시:** 노드 {display_nodes_count:,}개, 엣지 {display_edges_count:,}개")
-        
-        return nodes_data.get('results', []), edges_data.get('results', [])
+        return snapshot
     except Exception as e:
         st.error(f"Claude Neptune 데이터 로드 실패: {e}")
-        return [], []
+        return None
 
-def create_neptune_graph_claude():
-    """Neptune Analytics Claude 그래프 시각화"""
-    net = Network(height="900px", width="100%", bgcolor="#1e1e1e", font_color="white")
-    
-    nodes, edges = get_neptune_graph_data_claude()
-    
-    if not nodes:
-        net.add_node("empty", label="데이터 없음", color="#ff6b6b")
-        return net
-    
-    # 노드 ID 수집
-    node_ids = set()
-    
-    # 노드 추가
-    for node in nodes:
-        node_id = str(node.get('id', ''))
-        if node_id:
-            node_ids.add(node_id)
-            labels = node.get('labels', ['Node'])
-            properties = node.get('properties', {})
-            
-            # 더 의미있는 속성 우선 활용
-            bedrock_text = properties.get('AMAZON_BEDROCK_TEXT', '')
-            source_uri = properties.get('metadata_x-amz-bedrock-kb-source-uri', '')
-            
-            # 1순위: AMAZON_BEDROCK_TEXT에서 의미있는 키워드 추출
-            if bedrock_text and len(bedrock_text) > 10:
-                # HTML 태그와 특수문자 제거 후 의미있는 텍스트 추출
-                import re
-                clean_text = re.sub(r'<[^>]+>', '', bedrock_text)  # HTML 태그 제거
-                clean_text = re.sub(r'[#\-\*\|\\]+', ' ', clean_text)  # 특수문자 제거
-                clean_text = clean_text.strip()
-                
-                if clean_text:
-                    text_words = [word for word in clean_text.split() if len(word) > 1]  # 1글자 단어 제외
-                    if len(text_words) >= 3:
-                        name = f"[Chunk] {' '.join(text_words[:3])}"
-                    elif len(text_words) >= 1:
-                        chunk_name = ' '.join(text_words[:2]) if len(text_words) >= 2 else text_words[0]
-                        name = f"[Chunk] {chunk_name}"
-                    else:
-                        name = f"[Chunk] {bedrock_text[:20].strip()}"
-                else:
-                    name = f"[Chunk] {bedrock_text[:20].strip()}"
-            # 2순위: 파일명에서 추출
-            elif source_uri:
-                filename = source_uri.split('/')[-1].replace('.PDF', '').replace('.pdf', '')
-                name = filename
-            # 3순위: Entity 노드의 ID 정리
-            elif 'Entity' in labels and node_id.startswith('x-amz-bedrock-kb-'):
-                clean_id = node_id.replace('x-amz-bedrock-kb-', '')
-                # 긴 ID는 줄여서 표시
-                if len(clean_id) > 20:
-                    name = clean_id[:20] + '...'
-                else:
-                    name = clean_id
-            # 4순위: 라벨 기반
+def style_node_claude(node):
+    """노드 표시 이름/색상/툴팁 계산 → (name, color, title)"""
+    node_id, labels, bedrock_text, source_uri, property_keys = node
+    labels = list(labels)
+
+    # 1순위: AMAZON_BEDROCK_TEXT에서 의미있는 키워드 추출
+    if bedrock_text and len(bedrock_text) > 10:
+        # HTML 태그와 특수문자 제거 후 의미있는 텍스트 추출
+        import re
+        clean_text = re.sub(r'<[^>]+>', '', bedrock_text)  # HTML 태그 제거
+        clean_text = re.sub(r'[#\-\*\|\\]+', ' ', clean_text)  # 특수문자 제거
+        clean_text = clean_text.strip()
+
+        if clean_text:
+            text_words = [word for word in clean_text.split() if len(word) > 1]  # 1글자 단어 제외
+            if len(text_words) >= 3:
+                name = f"[Chunk] {' '.join(text_words[:3])}"
+            elif len(text_words) >= 1:
+                chunk_name = ' '.join(text_words[:2]) if len(text_words) >= 2 else text_words[0]
+                name = f"[Chunk] {chunk_name}"
             else:
-                if 'Chunk' in labels:
-                    name = f"[Chunk] {node_id[:15]}..."
-                else:
-                    name = str(labels[0]) if labels and labels[0] != 'DocumentID' else f"Node-{node_id[:8]}"
-            
-            # Claude 그래프 색상 (주황색 계열)
-            color = "#e67e22" if 'Document' in str(node.get('labels', [])) else "#d35400" if 'Entity' in str(node.get('labels', [])) else "#f39c12"
-            
-            net.add_node(node_id, 
-                        label=str(name), 
-                        color=color, 
-                        size=15,
-                        title=f"Claude Graph\\nLabels: {node.get('labels', [])}\\nProperties: {list(properties.keys())}\\nID: {node_id}")
-    
-    # 엣지 추가
-    for edge in edges:
-        source = str(edge.get('source', ''))
-        target = str(edge.get('target', ''))
-        edge_label = edge.get('label', 'relates')
-        
-        if source in node_ids and target in node_ids:
-            net.add_edge(source, target, label=edge_label, color="#666")
+                name = f"[Chunk] {bedrock_text[:20].strip()}"
+        else:
+            name = f"[Chunk] {bedrock_text[:20].strip()}"
+    # 2순위: 파일명에서 추출
+    elif source_uri:
+        filename = source_uri.split('/')[-1].replace('.PDF', '').replace('.pdf', '')
+        name = filename
+    # 3순위: Entity 노드의 ID 정리
+    elif 'Entity' in labels and node_id.startswith('x-amz-bedrock-kb-'):
+        clean_id = node_id.replace('x-amz-bedrock-kb-', '')
+        # 긴 ID는 줄여서 표시
+        if len(clean_id) > 20:
+            name = clean_id[:20] + '...'
+        else:
+            name = clean_id
+    # 4순위: 라벨 기반
+    else:
+        if 'Chunk' in labels:
+            name = f"[Chunk] {node_id[:15]}..."
+        else:
+            name = str(labels[0]) if labels and labels[0] != 'DocumentID' else f"Node-{node_id[:8]}"
+
+    # Claude 그래프 색상 (주황색 계열)
+    color = "#e67e22" if 'Document' in str(labels) else "#d35400" if 'Entity' in str(labels) else "#f39c12"
     
-    # 그래프 옵션 설정
-    net.set_options("""
-    var options = {
-      "physics": {
-        "enabled": true,
-        "stabilization": {"iterations": 100},
-        "barnesHut": {
-          "gravitationalConstant": -10000,
-          "centralGravity": 0.2,
-          "springLength": 120,
-          "springConstant": 0.02,
-          "damping": 0.12
-        }
-      },
-      "nodes": {
-        "font": {"size": 10},
-        "widthConstraint": {"maximum": 150}
-      },
-      "edges": {
-        "font": {"size": 8},
-        "smooth": {"enabled": true, "type": "continuous"}
-      },
-      "interaction": {
-        "hideEdgesOnDrag": true,
-        "hideNodesOnDrag": true
-      }
-    }
-    """)
+    return str(name), color, f"Claude Graph\\nLabels: {labels}\\nProperties: {list(property_keys)}\\nID: {node_id}"
+
+def create_neptune_graph_claude():
+    """Neptune Analytics Claude 그래프 시각화"""
+    snapshot = get_neptune_graph_data_claude()
+    if snapshot is None:
+        return build_network([], [], style_node_claude)
     
-    return net
\ No newline at end of file
+    # 스냅샷 버전별로 1회 계산한 좌표 사용
+    return build_network(snapshot.nodes, snapshot.edges, style_node_claude, get_snapshot_layout(snapshot))
+
+def get_graph_html_claude():
+    """Neptune Analytics Claude 그래프 HTML (캐시 사용)"""
+    return snapshot_html(get_neptune_graph_data_claude(), style_node_claude)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+OCR 페이지 BM25 색인
+ship-firefighting-ocr 페이지 텍스트를 SQLite FTS5 색인으로 만들어 조항 번호(Reg. 10.5.1, A-60) 같은
+정확 일치 검색을 KB 벡터 검색과 병렬로 수행
+OCR 추출 시 페이지 단위로 증분 갱신하고(같은 파일의 조항 색인도 문서 단위로 재생성), 앱에서는 읽기 전용 + mmap으로 열어 사용
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from clause_index import rebuild_document_clauses
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'lexical_index.sqlite')
+
+SCHEMA = (
+    # porter + unicode61 토크나이저: pumps → pump, "10.5.1" → 10, 5, 1 (조항 번호는 구문 검색으로 연속 토큰 일치)
+    "CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5("
+    "text, document_id UNINDEXED, page_number UNINDEXED, page_image_url UNINDEXED, source_pdf UNINDEXED, "
+    "tokenize = 'porter unicode61')",
+    # 페이지 → FTS rowid, 추출 시각 (증분 갱신 판단용)
+    "CREATE TABLE IF NOT EXISTS indexed_pages ("
+    "document_id TEXT, page_number TEXT, extracted_at TEXT, fts_rowid INTEGER, "
+    "PRIMARY KEY (document_id, page_number)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+)
+
+# 조항 번호/부호 (10.5.1, A-60, II-2, 2.2.1.1)와 일반 영숫자 토큰
+QUERY_TOKEN_PATTERN = re.compile(r'[A-Za-z0-9]+(?:[.\-/][A-Za-z0-9]+)+|[A-Za-z0-9]+')
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it', 'of', 'on', 'or',
+    'shall', 'should', 'that', 'the', 'to', 'what', 'which', 'with', 'how', 'does', 'do', 'requirements'
+}
+MAX_QUERY_TERMS = 32
+
+def build_match_query(text: str) -> str:
+    """질문 → FTS5 MATCH 식 (조항 번호는 구문, 나머지는 OR, 한국어는 OCR 텍스트가 영문이라 제외)"""
+    terms = []
+    for token in QUERY_TOKEN_PATTERN.findall(text):
+        token = token.lower()
+        parts = re.split(r'[.\-/]', token)
+        if len(parts) > 1:
+            term = '"' + ' '.join(parts) + '"'
+        elif token in STOPWORDS or (len(token) < 2 and not token.isdigit()):
+            continue
+        else:
+            term = f'"{token}"'
+        if term not in terms:
+            terms.append(term)
+
+    return ' OR '.join(terms[:MAX_QUERY_TERMS])
+
+def page_text(page: Dict) -> str:
+    """색인할 페이지 텍스트 (레이아웃 모드 Markdown 우선)"""
+    return page.get('ocr_markdown') or page.get('ocr_text', '')
+
+class LexicalHit(NamedTuple):
+    document_id: str
+    page_number: str
+    text: str
+    page_image_url: str
+    source_pdf: str
+    score: float
+
+class LexicalIndex:
+    """읽기 전용 BM25 색인 (스레드 간 공유)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._conn.execute('PRAGMA mmap_size = 268435456')
+        self._lock = threading.Lock()
+
+    def search(self, text: str, limit: int = 10) -> List[LexicalHit]:
+        """BM25 상위 페이지 (점수는 클수록 관련도 높음)"""
+        match_query = build_match_query(text)
+        if not match_query:
+            return []
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT document_id, page_number, text, page_image_url, source_pdf, -bm25(pages) AS score "
+                "FROM pages WHERE pages MATCH ? ORDER BY bm25(pages) LIMIT ?",
+                (match_query, limit)
+            ).fetchall()
+
+        return [LexicalHit(*row) for row in rows]
+
+class LexicalIndexWriter:
+    """색인 증분 갱신 (OCR 추출 프로세스에서 사용, WAL 모드라 앱은 갱신 중에도 조회 가능)"""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv('LEXICAL_INDEX_PATH', DEFAULT_INDEX_PATH)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute('PRAGMA journal_mode = WAL')
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+
+        # 페이지가 바뀐 문서 (commit 시 조항 색인 재생성)
+        self._dirty_documents = set()
+
+    def indexed_pages(self) -> Dict[tuple, str]:
+        """(document_id, page_number) → 색인된 페이지의 extracted_at"""
+        rows = self._conn.execute('SELECT document_id, page_number, extracted_at FROM indexed_pages').fetchall()
+        return {(document_id, page_number): extracted_at for document_id, page_number, extracted_at in rows}
+
+    def upsert_page(self, page: Dict):
+        """페이지 1개 색인 (이미 있으면 교체)"""
+        document_id, page_number = page['document_id'], str(page['page_number'])
+        self.delete_page(document_id, page_number)
+        self._dirty_documents.add(document_id)
+
+        cursor = self._conn.execute(
+            'INSERT INTO pages (text, document_id, page_number, page_image_url, source_pdf) VALUES (?, ?, ?, ?, ?)',
+            (page_text(page), document_id, page_number, page.get('page_image_url', ''), page.get('source_pdf', ''))
+        )
+        self._conn.execute(
+            'INSERT INTO indexed_pages VALUES (?, ?, ?, ?)',
+            (document_id, page_number, page.get('extracted_at', ''), cursor.lastrowid)
+        )
+
+    def delete_document(self, document_id: str, keep_pages: Iterable[str] = ()) -> int:
+        """문서의 색인 페이지 삭제 (keep_pages에 포함된 페이지는 유지)"""
+        keep_pages = set(keep_pages)
+        rows = self._conn.execute(
+            'SELECT page_number FROM indexed_pages WHERE document_id = ?', (document_id,)
+        ).fetchall()
+
+        removed = 0
+        for (page_number,) in rows:
+            if page_number not in keep_pages:
+                self.delete_page(document_id, page_number)
+                removed += 1
+        return removed
+
+    def delete_page(self, document_id: str, page_number: str):
+        """페이지 1개 색인 삭제"""
+        row = self._conn.execute(
+            'SELECT fts_rowid FROM indexed_pages WHERE document_id = ? AND page_number = ?',
+            (document_id, page_number)
+        ).fetchone()
+        if row:
+            self._dirty_documents.add(document_id)
+            self._conn.execute('DELETE FROM pages WHERE rowid = ?', row)
+            self._conn.execute(
+                'DELETE FROM indexed_pages WHERE document_id = ? AND page_number = ?', (document_id, page_number)
+            )
+
+    def commit(self):
+        for document_id in sorted(self._dirty_documents):
+            rebuild_document_clauses(self._conn, document_id)
+        self._dirty_documents.clear()
+
+        self._conn.execute(
+            'INSERT OR REPLACE INTO meta VALUES (?, ?)', ('updated_at', datetime.utcnow().isoformat() + 'Z')
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self) -> 'LexicalIndexWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        self.close()
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_lexical_index() -> Optional[LexicalIndex]:
+    """프로세스 공용 색인 (파일이 없으면 None → 벡터 검색만 사용)"""
+
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                path = os.getenv('LEXICAL_INDEX_PATH', DEFAULT_INDEX_PATH)
+                if not os.path.exists(path):
+                    return None
+
+                try:
+                    _index = LexicalIndex(path)
+                except Exception as e:
+                    print(f"BM25 색인 로드 실패: {e}")
+                    return None
+
+    return _index
+
+def build_lexical_index(output_path: str = None, table_name: str = 'ship-firefighting-ocr') -> Dict[str, int]:
+    """OCR 테이블과 색인 동기화 (extracted_at이 바뀐 페이지만 재색인, 테이블에 없는 페이지 삭제)"""
+
+    import boto3
+
+    print(f"📦 BM25 색인 동기화: {table_name}")
+
+    table = boto3.resource('dynamodb', region_name='us-west-2').Table(table_name)
+    stats = {'indexed': 0, 'unchanged': 0, 'deleted': 0}
+
+    with LexicalIndexWriter(output_path) as writer:
+        indexed = writer.indexed_pages()
+        seen = set()
+
+        scan_kwargs = {}
+        while True:
+            response = table.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                key = (item['document_id'], str(item['page_number']))
+                seen.add(key)
+                if key in indexed and indexed[key] == item.get('extracted_at', ''):
+                    stats['unchanged'] += 1
+                    continue
+                writer.upsert_page(item)
+                stats['indexed'] += 1
+
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+        for document_id, page_number in set(indexed) - seen:
+            writer.delete_page(document_id, page_number)
+            stats['deleted'] += 1
+
+    print(f"✅ 색인 완료: 재색인 {stats['indexed']}페이지, 유지 {stats['unchanged']}페이지, 삭제 {stats['deleted']}페이지")
+    return stats
+
+if __name__ == "__main__":
+    build_lexical_index()
@@ -0,0 +1,238 @@
+"""
+Neptune Analytics 공용 쿼리 클라이언트
+- boto3 클라이언트 1개를 프로세스 전체에서 재사용 (연결 풀 유지)
+- 연결/읽기 타임아웃, 지수 백오프 + full jitter 재시도
+- openCypher 파라미터 전달, 쿼리별 서버 측 타임아웃
+- 응답 payload를 통째로 읽지 않고 results 배열을 항목 단위로 파싱
+- 쿼리별 소요 시간/행 수 기록
+"""
+import codecs
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import (
+    ClientError, ConnectionError as BotoConnectionError, HTTPClientError, IncompleteReadError
+)
+
+# 재시도 대상 오류 코드 (일시적 오류만)
+RETRYABLE_ERROR_CODES = {
+    'ThrottlingException', 'ServiceQuotaExceededException', 'InternalServerException',
+    'ServiceUnavailableException', 'ConflictException'
+}
+
+# 응답 payload를 읽는 중 발생하는 오류 (읽기 타임아웃, 연결 끊김, 잘린 응답)
+PAYLOAD_READ_ERRORS = (HTTPClientError, IncompleteReadError, json.JSONDecodeError)
+
+RESULTS_START_PATTERN = re.compile(r'"results"\s*:\s*\[')
+
+class PartialResultsError(Exception):
+    """스트리밍 중 응답 읽기 실패 (이미 일부 항목을 반환했으므로 재시도하지 않음)"""
+
+    def __init__(self, row_count: int, cause: Exception):
+        super().__init__(f"{row_count}행 반환 후 응답 읽기 실패: {cause}")
+        self.row_count = row_count
+
+def iter_json_results(stream, chunk_size: int = 64 * 1024) -> Iterator[Dict]:
+    """{"results": [...]} 형식 스트림에서 results 항목을 하나씩 파싱
+
+    전체 payload를 메모리에 올리지 않고 chunk_size 단위로 읽으며 raw_decode로 항목을 꺼냄
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+
+    def read_more() -> bool:
+        nonlocal buffer
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return False
+        buffer += utf8.decode(chunk)
+        return True
+
+    # results 배열 시작 위치 탐색
+    while True:
+        match = RESULTS_START_PATTERN.search(buffer)
+        if match:
+            buffer = buffer[match.end():]
+            break
+        if not read_more():
+            return
+
+    position = 0
+    while True:
+        # 항목 사이 공백/쉼표 건너뛰기
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+
+        if position >= len(buffer):
+            buffer, position = '', 0
+            if not read_more():
+                return
+            continue
+
+        if buffer[position] == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # 항목이 청크 경계에 걸린 경우 더 읽고 다시 시도
+            buffer, position = buffer[position:], 0
+            if not read_more():
+                raise
+            continue
+
+        yield item
+        position = end
+
+        # 처리한 앞부분은 주기적으로 버림
+        if position > chunk_size:
+            buffer, position = buffer[position:], 0
+
+class NeptuneAnalyticsClient:
+    """Neptune Analytics openCypher 쿼리 클라이언트 (스레드 간 공유)"""
+
+    def __init__(self, region: str = 'us-west-2', connect_timeout: int = 10, read_timeout: int = 120,
+                 max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 8.0,
+                 max_pool_connections: int = 20, log_queries: bool = False):
+        # 재시도는 직접 처리 (jitter 적용, 스트리밍 중 오류 포함)
+        self.client = boto3.client(
+            'neptune-graph',
+            region_name=region,
+            config=Config(
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                retries={"total_max_attempts": 1, "mode": "standard"},
+                max_pool_connections=max_pool_connections,
+                tcp_keepalive=True
+            )
+        )
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.log_queries = log_queries
+
+        self.metrics = deque(maxlen=500)
+        self._metrics_lock = threading.Lock()
+
+    def execute(self, graph_id: str, query: str, parameters: Dict = None, timeout_ms: int = None) -> List[Dict]:
+        """쿼리 실행 → results 목록 (응답 전체를 읽은 뒤 반환하므로 payload 읽기 실패도 재시도)"""
+        return list(self.iter_results(graph_id, query, parameters, timeout_ms, buffered=True))
+
+    def iter_results(self, graph_id: str, query: str, parameters: Dict = None,
+                     timeout_ms: int = None, buffered: bool = False) -> Iterator[Dict]:
+        """쿼리 실행 → results 항목을 파싱되는 대로 반환
+
+        재시도는 첫 항목을 반환하기 전까지만 수행 (이미 반환한 항목이 중복되지 않도록)
+        스트리밍 중 응답 읽기가 실패하면 재시도하지 않고 PartialResultsError로 중단
+        (buffered=True면 응답을 모두 읽은 뒤 반환하므로 읽기 실패도 재시도)
+        timeout_ms를 지정하면 서버에서 해당 시간 안에 끝나지 않은 쿼리를 중단
+        """
+        kwargs = {'parameters': parameters} if parameters else {}
+        if timeout_ms:
+            kwargs['queryTimeoutMilliseconds'] = int(timeout_ms)
+
+        for attempt in range(1, self.max_attempts + 1):
+            start_time = time.time()
+            row_count = 0
+
+            try:
+                response = self.client.execute_query(
+                    graphIdentifier=graph_id,
+                    queryString=query,
+                    language='OPEN_CYPHER',
+                    **kwargs
+                )
+
+                if buffered:
+                    rows = list(iter_json_results(response['payload']))
+                else:
+                    for item in iter_json_results(response['payload']):
+                        row_count += 1
+                        yield item
+
+            except (ClientError, BotoConnectionError) + PAYLOAD_READ_ERRORS as e:
+                if row_count:
+                    self._record(graph_id, query, start_time, row_count, attempt, error=str(e))
+                    raise PartialResultsError(row_count, e) from e
+                if attempt == self.max_attempts or not self._is_retryable(e):
+                    self._record(graph_id, query, start_time, row_count, attempt, error=str(e))
+                    raise
+
+                # full jitter: 0 ~ min(max_delay, base_delay * 2^(attempt-1))
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+                print(f"Neptune 쿼리 재시도 {attempt}/{self.max_attempts - 1} ({delay:.1f}초 후): {e}")
+                time.sleep(delay)
+                continue
+
+            if buffered:
+                self._record(graph_id, query, start_time, len(rows), attempt)
+                yield from rows
+            else:
+                self._record(graph_id, query, start_time, row_count, attempt)
+            return
+
+    def get_graph(self, graph_id: str) -> Dict:
+        """그래프 정보 조회"""
+        return self.client.get_graph(graphIdentifier=graph_id)
+
+    def metrics_summary(self) -> Dict:
+        """최근 쿼리 통계"""
+        with self._metrics_lock:
+            metrics = list(self.metrics)
+
+        if not metrics:
+            return {'queries': 0}
+
+        elapsed = sorted(m['elapsed'] for m in metrics)
+        return {
+            'queries': len(metrics),
+            'errors': sum(1 for m in metrics if m.get('error')),
+            'rows': sum(m['rows'] for m in metrics),
+            'total_seconds': sum(elapsed),
+            'p50_seconds': elapsed[len(elapsed) // 2],
+            'max_seconds': elapsed[-1]
+        }
+
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, (BotoConnectionError,) + PAYLOAD_READ_ERRORS):
+            return True
+        return error.response.get('Error', {}).get('Code') in RETRYABLE_ERROR_CODES
+
+    def _record(self, graph_id: str, query: str, start_time: float, row_count: int,
+                attempts: int, error: str = None):
+        metric = {
+            'graph_id': graph_id,
+            'query': ' '.join(query.split())[:120],
+            'elapsed': time.time() - start_time,
+            'rows': row_count,
+            'attempts': attempts,
+            'error': error
+        }
+
+        with self._metrics_lock:
+            self.metrics.append(metric)
+
+        if self.log_queries:
+            print(f"Neptune 쿼리 {metric['elapsed']:.2f}초, {row_count}행: {metric['query']}")
+
+_client: Optional[NeptuneAnalyticsClient] = None
+_client_lock = threading.Lock()
+
+def get_neptune_analytics_client() -> NeptuneAnalyticsClient:
+    """프로세스 공용 Neptune Analytics 클라이언트"""
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = NeptuneAnalyticsClient()
+
+    return _client
@@ -5,42 +5,95 @@ KB에서 페이지 번호를 받아서 별도 저장소에서 OCR 데이터 조
 """
 
 import boto3
+import copy
 import json
 import re
-from typing import Dict, List, Optional, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Any, Tuple
+
+from core.references import PageReference
+from ocr_snapshot import get_ocr_snapshot
+
+# 참조의 페이지 번호 패턴 (소스 파일명 / 본문 표기)
+SOURCE_PAGE_PATTERN = re.compile(r'(?:page|p)[-_]?(\d+)', re.IGNORECASE)
+CONTENT_PAGE_PATTERN = re.compile(r'(?:page|페이지)\s*(\d+)', re.IGNORECASE)
 
 class OCRLookupService:
     
-    def __init__(self):
+    # 두 저장소 모두에 없는 페이지의 부재 캐시 (인스턴스 간 공유)
+    NEGATIVE_CACHE_TTL = 600
+    NEGATIVE_CACHE_SIZE = 10000
+    _missing_pages: Dict[Tuple[str, str], float] = {}
+    _missing_lock = threading.Lock()
+    
+    def __init__(self, max_s3_workers: int = 8):
         self.dynamodb = boto3.resource('dynamodb', region_name='us-west-2')
         self.s3_client = boto3.client('s3', region_name='us-west-2')
         
         # OCR 데이터 저장용 테이블/버킷
         self.ocr_table_name = 'ship-firefighting-ocr'
         self.ocr_bucket = 'claude-neptune-ocr'
+        
+        # S3 폴백 동시 조회 수
+        self.max_s3_workers = max_s3_workers
+        self.last_lookup_failures = {}
     
     def extract_page_numbers_from_kb_response(self, kb_response: Dict) -> List[str]:
         """KB 응답에서 페이지 번호 추출"""
         
         page_numbers = []
+        for ref_pages in self.extract_reference_pages(kb_response):
+            page_numbers.extend(ref_pages)
+        
+        return list(dict.fromkeys(page_numbers))  # 중복 제거
+    
+    def extract_reference_pages(self, kb_response: Dict) -> List[List[str]]:
+        """참조 문서별 페이지 번호 목록 (references와 같은 순서, 우선순위 순)
         
-        # 참조 문서에서 페이지 번호 추출
-        references = kb_response.get('references', [])
-        for ref in references:
-            source = ref.get('source', '')
-            content = ref.get('content', '')
+        명시적 페이지 필드가 있으면 그것만 사용 (본문 속 숫자를 페이지로 오인하지 않도록)
+        PageReference 본문은 조회 시 OCR 저장소를 읽으므로 여기서는 접근하지 않음
+        """
+        
+        reference_pages = []
+        
+        for ref in kb_response.get('references', []):
+            # 명시적 페이지 필드 (Plan-Execute Agent 참조 형식)
+            page_number = ref.get('page_number')
+            if page_number:
+                try:
+                    reference_pages.append([str(int(float(page_number)))])
+                    continue
+                except (TypeError, ValueError):
+                    pass
+            
+            pages = []
             
             # 소스에서 페이지 번호 추출 (파일명 패턴)
-            page_match = re.search(r'(?:page|p)[-_]?(\d+)', source, re.IGNORECASE)
+            page_match = SOURCE_PAGE_PATTERN.search(ref.get('source', ''))
             if page_match:
-                page_numbers.append(page_match.group(1))
+                pages.append(page_match.group(1))
             
-            # 콘텐츠에서 페이지 번호 추출
-            content_match = re.search(r'(?:page|페이지)\s*(\d+)', content, re.IGNORECASE)
-            if content_match:
-                page_numbers.append(content_match.group(1))
+            # 콘텐츠에서 페이지 번호 추출 (dict 형식 참조에 이미 들어 있는 텍스트만)
+            if isinstance(ref, dict):
+                content_match = CONTENT_PAGE_PATTERN.search(ref.get('content', ''))
+                if content_match:
+                    pages.append(content_match.group(1))
+            
+            reference_pages.append(list(dict.fromkeys(pages)))
+        
+        return reference_pages
+    
+    def get_ocr_from_snapshot(self, page_number: str, document_id: str = 'default') -> Optional[Dict]:
+        """로컬 OCR 스냅샷에서 조회 (스냅샷 파일이 없으면 None)"""
+        
+        snapshot = get_ocr_snapshot()
+        if not snapshot:
+            return None
         
-        return list(set(page_numbers))  # 중복 제거
+        page = snapshot.get_page(document_id, page_number)
+        return self._format_page(page_number, page, 'snapshot') if page else None
     
     def get_ocr_from_dynamodb(self, page_number: str, document_id: str = 'default') -> Optional[Dict]:
         """DynamoDB에서 OCR 데이터 조회"""
@@ -56,13 +109,7 @@ class OCRLookupService:
             )
             
             if 'Item' in response:
-                return {
-                    'page_number': page_number,
-                    'ocr_text': response['Item'].get('ocr_text', ''),
-                    'page_image_url': response['Item'].get('page_image_url', ''),
-                    'extracted_at': response['Item'].get('extracted_at', ''),
-                    'source': 'dynamodb'
-                }
+                return self._format_page(page_number, response['Item'], 'dynamodb')
             
             return None
             
@@ -74,41 +121,178 @@ class OCRLookupService:
         """S3에서 OCR 데이터 조회"""
         
         try:
-            # S3 키 패턴: ocr/{document_id}/page_{page_number}.json
-            key = f'ocr/{document_id}/page_{page_number}.json'
-            
-            response = self.s3_client.get_object(
-                Bucket=self.ocr_bucket,
-                Key=key
-            )
-            
-            ocr_data = json.loads(response['Body'].read())
-            ocr_data['source'] = 's3'
-            
-            return ocr_data
-            
+            return self._fetch_s3_page(page_number, document_id)
         except Exception as e:
             print(f"S3 조회 실패: {e}")
             return None
     
     def lookup_ocr_data(self, page_numbers: List[str], document_id: str = 'default') -> Dict[str, Dict]:
-        """페이지 번호 리스트로 OCR 데이터 일괄 조회"""
+        """페이지 번호 리스트로 OCR 데이터 일괄 조회
+        
+        스냅샷 → DynamoDB batch_get_item 1회 → S3 동시 조회 순서로 처리
+        조회 실패 페이지는 self.last_lookup_failures에 기록 (page_number → 사유)
+        """
         
         ocr_results = {}
+        failures = {}
         
-        for page_num in page_numbers:
-            # 1순위: DynamoDB 조회
-            ocr_data = self.get_ocr_from_dynamodb(page_num, document_id)
-            
-            # 2순위: S3 조회
-            if not ocr_data:
-                ocr_data = self.get_ocr_from_s3(page_num, document_id)
+        # 부재가 확인된 페이지는 재조회하지 않음
+        pending = [
+            page_num for page_num in dict.fromkeys(page_numbers)
+            if not self._is_known_missing(document_id, page_num)
+        ]
+        
+        # 0순위: 로컬 스냅샷 조회
+        snapshot = get_ocr_snapshot()
+        if snapshot and pending:
+            for page_num, page in snapshot.get_pages(document_id, pending).items():
+                ocr_results[page_num] = self._format_page(page_num, page, 'snapshot')
+            pending = [page_num for page_num in pending if page_num not in ocr_results]
+        
+        # 1순위: DynamoDB 일괄 조회
+        if pending:
+            found, dynamodb_failures = self._batch_get_from_dynamodb(pending, document_id)
+            ocr_results.update(found)
+            failures.update(dynamodb_failures)
+            pending = [page_num for page_num in pending if page_num not in found]
+        
+        # 2순위: S3 동시 조회
+        if pending:
+            found, missing, s3_failures = self._fetch_from_s3_concurrently(pending, document_id)
+            ocr_results.update(found)
+            failures.update(s3_failures)
             
-            if ocr_data:
-                ocr_results[page_num] = ocr_data
+            # 두 저장소 모두에 없음이 확인된 페이지만 부재 캐시에 기록
+            for page_num in missing:
+                if page_num not in dynamodb_failures:
+                    self._remember_missing(document_id, page_num)
+        
+        # 다른 저장소에서 찾은 페이지는 실패에서 제외
+        failures = {page_num: reason for page_num, reason in failures.items() if page_num not in ocr_results}
+        self.last_lookup_failures = failures
+        if failures:
+            print(f"OCR 일괄 조회 일부 실패: {len(failures)}/{len(page_numbers)}페이지")
         
         return ocr_results
     
+    def _batch_get_from_dynamodb(self, page_numbers: List[str], document_id: str) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+        """batch_get_item으로 페이지 조회 (100개 단위, UnprocessedKeys 재시도)"""
+        
+        found = {}
+        failures = {}
+        
+        for start in range(0, len(page_numbers), 100):
+            keys = [
+                {'document_id': document_id, 'page_number': page_num}
+                for page_num in page_numbers[start:start + 100]
+            ]
+            
+            try:
+                for attempt in range(3):
+                    response = self.dynamodb.batch_get_item(
+                        RequestItems={self.ocr_table_name: {'Keys': keys}}
+                    )
+                    
+                    for item in response.get('Responses', {}).get(self.ocr_table_name, []):
+                        found[item['page_number']] = self._format_page(item['page_number'], item, 'dynamodb')
+                    
+                    keys = response.get('UnprocessedKeys', {}).get(self.ocr_table_name, {}).get('Keys', [])
+                    if not keys:
+                        break
+                    time.sleep(0.05 * (2 ** attempt))
+                
+                for key in keys:
+                    failures[key['page_number']] = 'dynamodb: unprocessed'
+                    
+            except Exception as e:
+                for key in keys:
+                    failures[key['page_number']] = f"dynamodb: {e}"
+        
+        return found, failures
+    
+    def _fetch_from_s3_concurrently(self, page_numbers: List[str], document_id: str) -> Tuple[Dict[str, Dict], List[str], Dict[str, str]]:
+        """S3 페이지 JSON 동시 조회 → (조회 결과, 부재 페이지, 실패 사유)"""
+        
+        found = {}
+        missing = []
+        failures = {}
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_s3_workers, len(page_numbers))) as executor:
+            futures = {
+                executor.submit(self._fetch_s3_page, page_num, document_id): page_num
+                for page_num in page_numbers
+            }
+            
+            for future in as_completed(futures):
+                page_num = futures[future]
+                try:
+                    ocr_data = future.result()
+                except Exception as e:
+                    failures[page_num] = f"s3: {e}"
+                    continue
+                
+                if ocr_data:
+                    found[page_num] = ocr_data
+                else:
+                    missing.append(page_num)
+        
+        return found, missing, failures
+    
+    def _fetch_s3_page(self, page_number: str, document_id: str) -> Optional[Dict]:
+        """S3 페이지 JSON 조회 (키가 없으면 None, 그 외 오류는 예외)"""
+        
+        # S3 키 패턴: ocr/{document_id}/page_{page_number}.json
+        key = f'ocr/{document_id}/page_{page_number}.json'
+        
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.ocr_bucket,
+                Key=key
+            )
+        except self.s3_client.exceptions.NoSuchKey:
+            return None
+        
+        ocr_data = json.loads(response['Body'].read())
+        ocr_data['source'] = 's3'
+        
+        return ocr_data
+    
+    def _format_page(self, page_number: str, item: Dict, source: str) -> Dict:
+        """스냅샷/DynamoDB 항목을 조회 결과 형식으로 변환"""
+        
+        return {
+            'page_number': page_number,
+            'ocr_text': item.get('ocr_text', ''),
+            # 레이아웃 분석 모드로 추출된 페이지만 존재 (표/섹션 구조 Markdown, bbox 인덱스)
+            'ocr_markdown': item.get('ocr_markdown', ''),
+            'block_index': item.get('block_index', ''),
+            'page_image_url': item.get('page_image_url', ''),
+            'thumbnail_url': item.get('thumbnail_url', ''),
+            'extracted_at': item.get('extracted_at', ''),
+            'source': source
+        }
+    
+    def _is_known_missing(self, document_id: str, page_number: str) -> bool:
+        """부재 캐시 확인 (TTL 경과 시 만료)"""
+        
+        expires_at = self._missing_pages.get((document_id, page_number))
+        if expires_at is None:
+            return False
+        
+        if expires_at < time.time():
+            self._missing_pages.pop((document_id, page_number), None)
+            return False
+        
+        return True
+    
+    def _remember_missing(self, document_id: str, page_number: str):
+        """부재 페이지 기록 (프로세스 공용, 크기 제한)"""
+        
+        with self._missing_lock:
+            if len(self._missing_pages) >= self.NEGATIVE_CACHE_SIZE:
+                self._missing_pages.clear()
+            self._missing_pages[(document_id, page_number)] = time.time() + self.NEGATIVE_CACHE_TTL
+    
     def enhance_kb_response_with_ocr(self, kb_response: Dict, kb_id: str, document_id: str = 'default') -> Dict:
         """KB 응답에 OCR 데이터 추가 (PWRU19RDNE KB에만 적용)"""
         
@@ -120,8 +304,9 @@ class OCRLookupService:
         if kb_id != 'PWRU19RDNE':
             return kb_response
         
-        # 1. KB 응답에서 페이지 번호 추출
-        page_numbers = self.extract_page_numbers_from_kb_response(kb_response)
+        # 1. KB 응답에서 참조별 페이지 번호 추출
+        reference_pages = self.extract_reference_pages(kb_response)
+        page_numbers = list(dict.fromkeys(page for pages in reference_pages for page in pages))
         
         if not page_numbers:
             return kb_response
@@ -133,15 +318,35 @@ class OCRLookupService:
         enhanced_response = kb_response.copy()
         enhanced_response['ocr_data'] = ocr_data
         enhanced_response['page_numbers'] = page_numbers
+        if self.last_lookup_failures:
+            enhanced_response['ocr_failures'] = dict(self.last_lookup_failures)
         
-        # 4. 참조 문서에 OCR 텍스트 추가
-        for ref in enhanced_response.get('references', []):
-            for page_num, ocr_info in ocr_data.items():
-                if page_num in ref.get('source', '') or page_num in ref.get('content', ''):
-                    ref['ocr_text'] = ocr_info.get('ocr_text', '')
-                    ref['page_image_url'] = ocr_info.get('page_image_url', '')
+        # 4. 참조 문서에 OCR 텍스트 추가 (참조별 페이지 번호로 직접 조인, 원본 참조는 변경하지 않음)
+        references = list(enhanced_response.get('references', []))
+        for i, (ref, pages) in enumerate(zip(references, reference_pages)):
+            for page_num in pages:
+                ocr_info = ocr_data.get(page_num)
+                if ocr_info:
+                    references[i] = self._with_ocr(ref, ocr_info)
+                    break
+        if 'references' in enhanced_response:
+            enhanced_response['references'] = references
         
         return enhanced_response
+    
+    def _with_ocr(self, ref, ocr_info: Dict):
+        """OCR 텍스트/이미지를 반영한 참조 사본 (PageReference는 본문 텍스트와 이미지 URI 필드에 반영)"""
+        
+        if isinstance(ref, PageReference):
+            ref = copy.copy(ref)
+            ref.text = ocr_info.get('ocr_text', '')
+            ref.image_uri = ocr_info.get('page_image_url', '') or ref.image_uri
+            return ref
+        
+        ref = dict(ref)
+        ref['ocr_text'] = ocr_info.get('ocr_text', '')
+        ref['page_image_url'] = ocr_info.get('page_image_url', '')
+        return ref
 
 # DynamoDB 테이블 생성 스크립트
 def create_ocr_table():
@@ -176,28 +381,56 @@ def create_ocr_table():
     
     return table
 
+def create_ocr_manifest_table():
+    """증분 OCR 추출용 매니페스트 테이블 생성 (pdf_key → ETag)"""
+    
+    dynamodb = boto3.resource('dynamodb', region_name='us-west-2')
+    
+    table = dynamodb.create_table(
+        TableName='ship-firefighting-ocr-manifest',
+        KeySchema=[
+            {
+                'AttributeName': 'pdf_key',
+                'KeyType': 'HASH'  # Partition key
+            }
+        ],
+        AttributeDefinitions=[
+            {
+                'AttributeName': 'pdf_key',
+                'AttributeType': 'S'
+            }
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    
+    return table
+
 # 사용 예시
 def test_ocr_lookup():
     service = OCRLookupService()
     
-    # 가상의 KB 응답
+    # 가상의 KB 응답 (Plan-Execute Agent 참조 형식)
     kb_response = {
         'content': '선박의 소화기 요구사항은 페이지 15에 명시되어 있습니다.',
         'references': [
-            {
-                'source': 'solas_chapter2_page_15.pdf',
-                'content': '고정식 소화 시스템... (page 15)',
-                'score': 0.85
-            }
+            PageReference(
+                id='ref_1',
+                source_file='solas_chapter2.pdf',
+                page_key='PWRU19RDNE/solas_chapter2/15',
+                page_number=15,
+                score=0.85
+            )
         ]
     }
     
     # OCR 데이터로 KB 응답 강화
-    enhanced = service.enhance_kb_response_with_ocr(kb_response)
+    enhanced = service.enhance_kb_response_with_ocr(kb_response, kb_id='PWRU19RDNE', document_id='solas_chapter2')
     
     print("강화된 응답:")
     print(f"페이지 번호: {enhanced.get('page_numbers', [])}")
     print(f"OCR 데이터: {enhanced.get('ocr_data', {})}")
+    for ref in enhanced['references']:
+        print(f"참조 {ref.id}: p.{ref.page_number}, 텍스트 {len(ref.ocr_text)}자, 이미지 {ref.image_uri or '-'}")
 
 if __name__ == "__main__":
     test_ocr_lookup()
\ No newline at end of file
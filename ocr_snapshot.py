@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+OCR 테이블 로컬 스냅샷
+ship-firefighting-ocr 테이블을 읽기 전용 SQLite 파일로 내보내고,
+앱에서는 mmap으로 열어 DynamoDB 조회 없이 페이지 텍스트를 조회
+"""
+
+import boto3
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ocr_snapshot.sqlite')
+
+# 압축 저장하는 대용량 텍스트 컬럼
+COMPRESSED_COLUMNS = ('ocr_text', 'ocr_markdown')
+PAGE_COLUMNS = (
+    'document_id', 'page_number', 'ocr_text', 'ocr_markdown', 'block_index',
+    'page_image_url', 'thumbnail_url', 'extracted_at', 'source_pdf', 'extraction_method'
+)
+
+class OCRSnapshot:
+    """읽기 전용 OCR 스냅샷 (스레드 간 공유)
+
+    immutable=1로 열어 잠금/변경 감지를 생략하므로 열려 있는 파일은 절대 수정하면 안 됨
+    (export_ocr_snapshot은 임시 파일에 작성한 뒤 os.replace로 교체하므로 열린 파일은 그대로 유지되고,
+    get_ocr_snapshot이 mtime 변경을 보고 새 파일을 연 뒤 이전 연결을 닫음)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+        self._conn.execute('PRAGMA mmap_size = 268435456')
+        self._lock = threading.Lock()
+
+        self.meta = dict(self._conn.execute('SELECT key, value FROM meta').fetchall())
+
+    def get_page(self, document_id: str, page_number: str) -> Optional[Dict]:
+        """페이지 1개 조회 (없으면 None)"""
+
+        with self._lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                f"SELECT {', '.join(PAGE_COLUMNS)} FROM pages WHERE document_id = ? AND page_number = ?",
+                (document_id, str(page_number))
+            ).fetchone()
+
+        return self._row_to_page(row) if row else None
+
+    def get_pages(self, document_id: str, page_numbers: List[str]) -> Dict[str, Dict]:
+        """여러 페이지 일괄 조회 (page_number → 페이지)"""
+
+        page_numbers = [str(page_number) for page_number in page_numbers]
+        if not page_numbers:
+            return {}
+
+        placeholders = ', '.join('?' for _ in page_numbers)
+        with self._lock:
+            if self._conn is None:
+                return {}
+            rows = self._conn.execute(
+                f"SELECT {', '.join(PAGE_COLUMNS)} FROM pages "
+                f"WHERE document_id = ? AND page_number IN ({placeholders})",
+                [document_id] + page_numbers
+            ).fetchall()
+
+        pages = [self._row_to_page(row) for row in rows]
+        return {page['page_number']: page for page in pages}
+
+    def close(self):
+        """연결 닫기 (진행 중인 조회가 끝난 뒤, 이후 조회는 없음으로 처리되어 DynamoDB로 폴백)"""
+
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _row_to_page(self, row) -> Dict:
+        page = dict(zip(PAGE_COLUMNS, row))
+        for column in COMPRESSED_COLUMNS:
+            page[column] = zlib.decompress(page[column]).decode('utf-8') if page[column] else ''
+        return page
+
+_snapshot: Optional[OCRSnapshot] = None
+_snapshot_mtime: Optional[float] = None
+_snapshot_lock = threading.Lock()
+
+def get_ocr_snapshot() -> Optional[OCRSnapshot]:
+    """프로세스 공용 스냅샷 (파일이 없으면 None → DynamoDB 폴백, 파일이 바뀌면 다시 열기)"""
+
+    global _snapshot, _snapshot_mtime
+
+    path = os.getenv('OCR_SNAPSHOT_PATH', DEFAULT_SNAPSHOT_PATH)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    if _snapshot is not None and _snapshot_mtime == mtime:
+        return _snapshot
+
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot_mtime != mtime:
+            try:
+                snapshot = OCRSnapshot(path)
+            except Exception as e:
+                print(f"OCR 스냅샷 로드 실패: {e}")
+                return _snapshot
+
+            # 교체된 이전 스냅샷의 파일 핸들/mmap 해제
+            previous, _snapshot, _snapshot_mtime = _snapshot, snapshot, mtime
+            if previous is not None:
+                previous.close()
+
+        return _snapshot
+
+def export_ocr_snapshot(output_path: str = None, table_name: str = 'ship-firefighting-ocr') -> int:
+    """DynamoDB OCR 테이블 전체를 SQLite 스냅샷으로 내보내기"""
+
+    output_path = output_path or os.getenv('OCR_SNAPSHOT_PATH', DEFAULT_SNAPSHOT_PATH)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    print(f"📦 OCR 스냅샷 내보내기: {table_name} → {output_path}")
+
+    table = boto3.resource('dynamodb', region_name='us-west-2').Table(table_name)
+
+    # 임시 파일에 작성 후 교체 (실행 중인 앱은 교체 전까지 이전 스냅샷을 사용하고, 교체되면 다시 엶)
+    tmp_path = output_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+    conn.execute(f"""
+        CREATE TABLE pages (
+            {', '.join(f'{column} TEXT' if column not in COMPRESSED_COLUMNS else f'{column} BLOB' for column in PAGE_COLUMNS)},
+            PRIMARY KEY (document_id, page_number)
+        ) WITHOUT ROWID
+    """)
+
+    page_count = 0
+    scan_kwargs = {}
+    while True:
+        response = table.scan(**scan_kwargs)
+
+        rows = []
+        for item in response.get('Items', []):
+            row = []
+            for column in PAGE_COLUMNS:
+                value = item.get(column, '')
+                if column in COMPRESSED_COLUMNS:
+                    value = zlib.compress(value.encode('utf-8'), 9) if value else b''
+                row.append(value if isinstance(value, bytes) else str(value))
+            rows.append(row)
+
+        conn.executemany(
+            f"INSERT OR REPLACE INTO pages VALUES ({', '.join('?' for _ in PAGE_COLUMNS)})",
+            rows
+        )
+        page_count += len(rows)
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    conn.executemany('INSERT INTO meta VALUES (?, ?)', [
+        ('table_name', table_name),
+        ('page_count', str(page_count)),
+        ('exported_at', datetime.utcnow().isoformat() + 'Z')
+    ])
+    conn.commit()
+    conn.execute('VACUUM')
+    conn.close()
+
+    os.replace(tmp_path, output_path)
+
+    print(f"✅ 스냅샷 완료: {page_count}페이지 ({os.path.getsize(output_path) / 1024 / 1024:.1f} MB)")
+    return page_count
+
+if __name__ == "__main__":
+    export_ocr_snapshot()
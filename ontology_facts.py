@@ -0,0 +1,120 @@
+"""
+온톨로지 기반 사실 검색
+질문 속 개체를 사전 계산한 라벨 인덱스로 FSS 온톨로지 인스턴스에 매핑하고,
+연결된 사양 노드(hasSpecification 등)의 값을 짧은 사실 문장으로 만들어 RAG 컨텍스트에 추가
+"""
+import math
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from fss_ontology import RDF_TYPE, RDFS_LABEL, FSSOntology, get_fss_ontology, local_name
+
+TOKEN_PATTERN = re.compile(r'[A-Za-z][A-Za-z0-9]*|\d+(?:\.\d+)?|[가-힣]+')
+CAMEL_CASE_PATTERN = re.compile(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
+
+def tokenize(text: str) -> List[str]:
+    """소문자 토큰 목록 (CamelCase/밑줄 분리: CO2_DischargeTime → co2, discharge, time)"""
+    return [token.lower() for token in TOKEN_PATTERN.findall(CAMEL_CASE_PATTERN.sub(' ', text))]
+
+class OntologyFactIndex:
+    """온톨로지 인스턴스 라벨 인덱스 + 사실 추출기"""
+
+    def __init__(self, ontology: FSSOntology):
+        self.ontology = ontology
+        self.version = ontology.version
+
+        # 인스턴스별 이름 토큰 (로컬 이름 + rdfs:label)
+        self._names: Dict[str, Set[str]] = {}
+        for subject in ontology.types:
+            tokens = set(tokenize(local_name(subject)))
+            tokens.update(tokenize(ontology.labels.get(subject, '')))
+            if tokens:
+                self._names[subject] = tokens
+
+        # 토큰 → 인스턴스 역색인, 토큰 IDF (system/space처럼 흔한 토큰의 가중치를 낮춤)
+        self._postings: Dict[str, Set[str]] = {}
+        for subject, tokens in self._names.items():
+            for token in tokens:
+                self._postings.setdefault(token, set()).add(subject)
+
+        total = len(self._names) or 1
+        self._idf = {token: math.log(1 + total / len(subjects)) for token, subjects in self._postings.items()}
+
+    def find_entities(self, text: str, max_entities: int = 5, min_score: float = 0.6) -> List[Tuple[str, float]]:
+        """질문 텍스트에 이름이 포함된 인스턴스 → [(URI, 점수)] (점수: 일치 토큰의 IDF 비율)"""
+        query_tokens = set(tokenize(text))
+
+        candidates = set()
+        for token in query_tokens:
+            candidates.update(self._postings.get(token, ()))
+
+        scored = []
+        for subject in candidates:
+            tokens = self._names[subject]
+            matched = sum(self._idf[token] for token in tokens & query_tokens)
+            score = matched / sum(self._idf[token] for token in tokens)
+            if score >= min_score:
+                scored.append((subject, score))
+
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:max_entities]
+
+    def facts_for(self, subjects: List[str], max_facts: int = 20) -> List[str]:
+        """인스턴스의 리터럴 값과 1단계 연결 노드(사양 등)의 값 → 사실 문장 목록"""
+        facts = []
+        seen = set()
+
+        def add(fact: str):
+            if fact not in seen and len(facts) < max_facts:
+                seen.add(fact)
+                facts.append(fact)
+
+        for subject in subjects:
+            name = self._display_name(subject)
+
+            # 사양 노드가 직접 매칭된 경우 상위 노드와 함께 표시
+            values = self._literal_values(subject)
+            if values:
+                parents = [triple for triple in self.ontology.match(obj=subject) if triple.predicate != RDF_TYPE]
+                for triple in parents:
+                    add(f"{self._display_name(triple.subject)} › {local_name(triple.predicate)} › {name}: {values}")
+                if not parents:
+                    add(f"{name}: {values}")
+
+            # 하위 노드 (CO2System --hasSpecification--> CO2_Pressure --value--> "15 bar")
+            for triple in self.ontology.match(subject=subject):
+                if triple.object_is_uri and triple.predicate != RDF_TYPE:
+                    child_values = self._literal_values(triple.object)
+                    if child_values:
+                        add(f"{name} › {local_name(triple.predicate)} › {self._display_name(triple.object)}: {child_values}")
+
+        return facts
+
+    def _literal_values(self, subject: str) -> str:
+        values = [
+            f"{local_name(triple.predicate)}={triple.object}"
+            for triple in self.ontology.match(subject=subject)
+            if not triple.object_is_uri and triple.predicate != RDFS_LABEL
+        ]
+        return ', '.join(values)
+
+    def _display_name(self, uri: str) -> str:
+        type_name = self.ontology.type_of(uri)
+        return f"{local_name(uri)} ({type_name})" if type_name else local_name(uri)
+
+_index: Optional[OntologyFactIndex] = None
+_index_lock = threading.Lock()
+
+def get_ontology_fact_index(allow_remote: bool = True) -> Optional[OntologyFactIndex]:
+    """프로세스 공용 사실 인덱스 (온톨로지 버전이 바뀌면 다시 생성)"""
+    global _index
+
+    ontology = get_fss_ontology(allow_remote=allow_remote)
+    if ontology is None:
+        return None
+
+    with _index_lock:
+        if _index is None or _index.version != ontology.version:
+            _index = OntologyFactIndex(ontology)
+        return _index
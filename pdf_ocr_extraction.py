@@ -5,12 +5,18 @@
 
 import boto3
 import json
+import sys
+import time
+from boto3.dynamodb.conditions import Key
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from lexical_index import LexicalIndexWriter
+from textract_layout import encode_block_index, render_page_markdown
 
 class PDFOCRExtraction:
     
-    def __init__(self):
+    def __init__(self, layout: bool = False, rasterize: bool = False):
         self.s3_client = boto3.client('s3', region_name='us-west-2')
         self.textract_client = boto3.client('textract', region_name='us-west-2')
         self.dynamodb = boto3.resource('dynamodb', region_name='us-west-2')
@@ -19,138 +25,446 @@ class PDFOCRExtraction:
         self.source_bucket = 'shi-kb-bucket'
         self.source_prefix = 'documents/all/'
         self.ocr_table_name = 'ship-firefighting-ocr'
+        # 증분 추출용 매니페스트 (pdf_key → ETag, OCR 테이블 옆 별도 테이블)
+        self.manifest_table_name = 'ship-firefighting-ocr-manifest'
+        
+        # 레이아웃 분석 모드: TABLES/LAYOUT 기능으로 표·섹션 헤더를 Markdown으로 보존
+        self.layout_mode = layout
+        self.extraction_method = 'textract_layout' if layout else 'textract_pdf'
+        
+        # 래스터화 단계: 추출된 PDF의 페이지 WebP 이미지/썸네일 생성
+        self.rasterize = rasterize
+        self._rasterizer = None
     
     def extract_pdf_pages_ocr(self, pdf_key: str) -> List[Dict]:
-        """PDF 파일의 모든 페이지 OCR 추출"""
+        """PDF 파일의 모든 페이지 OCR 추출 (리스트 반환)"""
+        
+        try:
+            return list(self.iter_pdf_pages_ocr(pdf_key))
+        except Exception as e:
+            print(f"   ❌ PDF OCR 실패: {e}")
+            return []
+    
+    def iter_pdf_pages_ocr(self, pdf_key: str) -> Iterator[Dict]:
+        """PDF 페이지 OCR 결과를 완성되는 즉시 하나씩 반환 (실패 시 예외 발생)
+        
+        Textract 결과 페이지(최대 1000블록)와 현재 PDF 페이지의 줄만 메모리에 유지
+        """
         
         print(f"📄 PDF 처리 중: {pdf_key}")
         
-        try:
-            # Textract로 PDF 전체 분석
+        # Textract로 PDF 전체 분석
+        document_location = {
+            'S3Object': {
+                'Bucket': self.source_bucket,
+                'Name': pdf_key
+            }
+        }
+        
+        if self.layout_mode:
+            response = self.textract_client.start_document_analysis(
+                DocumentLocation=document_location,
+                FeatureTypes=['TABLES', 'LAYOUT']
+            )
+        else:
             response = self.textract_client.start_document_text_detection(
-                DocumentLocation={
-                    'S3Object': {
-                        'Bucket': self.source_bucket,
-                        'Name': pdf_key
-                    }
-                }
+                DocumentLocation=document_location
             )
+        
+        job_id = response['JobId']
+        print(f"   작업 ID: {job_id}")
+        
+        # 문서 ID 생성 (파일명에서)
+        document_id = self._extract_document_id(pdf_key)
+        
+        # Textract 비동기 결과는 보통 페이지 순서로 반환되므로
+        # 페이지 번호가 바뀌는 시점에 이전 페이지를 완성본으로 내보냄
+        # (레이아웃 모드는 표/셀 관계 해석을 위해 페이지의 모든 블록 유지)
+        current_page = None
+        current_blocks = []
+        emitted_pages = set()
+        late_pages = set()
+        
+        for page_num, block in self._iter_page_blocks(job_id):
+            if page_num in emitted_pages:
+                # 이미 내보낸 페이지의 블록이 뒤늦게 오면 스트림 종료 후 해당 페이지만 다시 구성
+                late_pages.add(page_num)
+                continue
             
-            job_id = response['JobId']
-            print(f"   작업 ID: {job_id}")
+            if page_num != current_page:
+                if current_blocks:
+                    yield self._build_page_item(document_id, pdf_key, current_page, current_blocks)
+                    emitted_pages.add(current_page)
+                current_page = page_num
+                current_blocks = []
             
-            # 작업 완료 대기
-            import time
-            while True:
-                result = self.textract_client.get_document_text_detection(JobId=job_id)
-                status = result['JobStatus']
-                
-                if status == 'SUCCEEDED':
-                    break
-                elif status == 'FAILED':
-                    print(f"   ❌ Textract 실패")
-                    return []
+            current_blocks.append(block)
+        
+        if current_blocks:
+            yield self._build_page_item(document_id, pdf_key, current_page, current_blocks)
+            emitted_pages.add(current_page)
+        
+        if late_pages:
+            # 결과를 한 번 더 읽어 해당 페이지의 전체 블록으로 다시 저장 (이전에 저장한 일부 페이지를 덮어씀)
+            print(f"   ↺ 순서가 섞인 페이지 재구성: {sorted(late_pages)}")
+            late_blocks = {page_num: [] for page_num in late_pages}
+            for page_num, block in self._iter_page_blocks(job_id):
+                if page_num in late_blocks:
+                    late_blocks[page_num].append(block)
+            
+            for page_num in sorted(late_blocks):
+                yield self._build_page_item(document_id, pdf_key, page_num, late_blocks[page_num])
+        
+        print(f"   ✅ 완료: {len(emitted_pages)}페이지")
+    
+    def _iter_page_blocks(self, job_id: str) -> Iterator[Tuple[int, Dict]]:
+        """Textract 결과 블록 → (페이지 번호, 블록) (텍스트 모드는 LINE 블록만)"""
+        
+        page_num = 1
+        for result in self._iter_textract_results(job_id):
+            for block in result['Blocks']:
+                if not self.layout_mode and block['BlockType'] != 'LINE':
+                    continue
                 
-                print(f"   ⏳ 대기 중... ({status})")
-                time.sleep(5)
+                page_num = block.get('Page', page_num)
+                yield page_num, block
+    
+    def _iter_textract_results(self, job_id: str) -> Iterator[Dict]:
+        """작업 완료 대기 후 Textract 결과 페이지를 NextToken 순서대로 반환"""
+        
+        if self.layout_mode:
+            get_results = self.textract_client.get_document_analysis
+        else:
+            get_results = self.textract_client.get_document_text_detection
+        
+        # 작업 완료 대기 (완료 응답이 첫 번째 결과 페이지)
+        while True:
+            result = get_results(JobId=job_id)
+            status = result['JobStatus']
             
-            # 페이지별 텍스트 추출
-            pages_ocr = {}
+            if status == 'SUCCEEDED':
+                break
+            elif status == 'FAILED':
+                raise RuntimeError(f"Textract 실패: {result.get('StatusMessage', job_id)}")
             
-            # 모든 결과 페이지 처리
-            next_token = None
-            while True:
-                if next_token:
-                    result = self.textract_client.get_document_text_detection(
-                        JobId=job_id, 
-                        NextToken=next_token
-                    )
-                else:
-                    result = self.textract_client.get_document_text_detection(JobId=job_id)
-                
-                # 블록별 처리
-                for block in result['Blocks']:
-                    if block['BlockType'] == 'LINE':
-                        page_num = block['Page']
-                        text = block['Text']
-                        
-                        if page_num not in pages_ocr:
-                            pages_ocr[page_num] = []
-                        pages_ocr[page_num].append(text)
+            print(f"   ⏳ 대기 중... ({status})")
+            time.sleep(5)
+        
+        while True:
+            yield result
+            
+            next_token = result.get('NextToken')
+            if not next_token:
+                break
+            
+            result = get_results(
+                JobId=job_id,
+                NextToken=next_token
+            )
+    
+    def _build_page_item(self, document_id: str, pdf_key: str, page_num: int, blocks: List[Dict]) -> Dict:
+        """페이지별 OCR 데이터 구성"""
+        
+        text_lines = [block['Text'] for block in blocks if block['BlockType'] == 'LINE']
+        
+        item = {
+            'document_id': document_id,
+            'page_number': str(page_num),
+            'ocr_text': '\n'.join(text_lines),
+            # WebP 이미지/썸네일 URI는 래스터화 단계가 업로드에 성공한 페이지에만 기록
+            'page_image_url': f's3://{self.source_bucket}/{pdf_key}#page={page_num}',
+            'extracted_at': datetime.utcnow().isoformat() + 'Z',
+            'source_pdf': pdf_key,
+            'extraction_method': self.extraction_method
+        }
+        
+        if self.layout_mode:
+            # 표/섹션 헤더를 보존한 Markdown과 하이라이트용 블록 좌표 인덱스
+            markdown, block_index = render_page_markdown(blocks)
+            item['ocr_markdown'] = markdown
+            item['block_index'] = encode_block_index(block_index)
+        
+        return item
+    
+    def list_source_pdfs(self) -> Dict[str, Dict]:
+        """원본 버킷의 PDF 목록과 ETag 조회"""
+        
+        pdfs = {}
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        
+        for page in paginator.paginate(Bucket=self.source_bucket, Prefix=self.source_prefix):
+            for obj in page.get('Contents', []):
+                key = obj['Key']
+                if not key.lower().endswith('.pdf'):
+                    continue
                 
-                next_token = result.get('NextToken')
-                if not next_token:
-                    break
+                pdfs[key] = {
+                    'etag': obj['ETag'].strip('"'),
+                    'size': obj['Size'],
+                    'last_modified': obj['LastModified'].isoformat()
+                }
+        
+        return pdfs
+    
+    def process_all_pdfs(self) -> Iterator[Dict]:
+        """모든 PDF 파일 처리 (페이지 단위 스트리밍)"""
+        
+        print("🚀 전체 PDF OCR 추출 시작")
+        
+        # 원본 버킷의 PDF 전체 (documents/all/), 목록 조회 시점의 ETag를 매니페스트에 기록
+        # (추출 중 교체된 PDF는 다음 증분 실행에서 ETag 불일치로 재추출)
+        self.source_pdfs = self.list_source_pdfs()
+        pdf_files = sorted(self.source_pdfs)
+        self.failed_pdfs = set()
+        
+        for pdf_key in pdf_files:
+            try:
+                yield from self.iter_pdf_pages_ocr(pdf_key)
+            except Exception as e:
+                # 한 문서 실패가 전체 추출을 중단하지 않도록 기록만 하고 계속 진행
+                print(f"   ❌ PDF OCR 실패: {e}")
+                self.failed_pdfs.add(pdf_key)
+    
+    def load_manifest(self) -> Dict[str, Dict]:
+        """매니페스트 테이블 전체 로드 (pdf_key → 마지막 추출 정보)"""
+        
+        table = self.dynamodb.Table(self.manifest_table_name)
+        manifest = {}
+        
+        scan_kwargs = {}
+        while True:
+            response = table.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                manifest[item['pdf_key']] = item
+            
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        
+        return manifest
+    
+    def plan_incremental_sync(self, current: Dict[str, Dict], manifest: Dict[str, Dict]) -> Tuple[List[str], List[str]]:
+        """신규/변경 PDF와 삭제된 PDF 계산"""
+        
+        # 내용(ETag) 또는 추출 방식이 바뀐 PDF만 재추출
+        changed = [
+            pdf_key for pdf_key, info in sorted(current.items())
+            if manifest.get(pdf_key, {}).get('etag') != info['etag']
+            or manifest.get(pdf_key, {}).get('extraction_method', 'textract_pdf') != self.extraction_method
+        ]
+        deleted = [pdf_key for pdf_key in sorted(manifest) if pdf_key not in current]
+        
+        return changed, deleted
+    
+    def process_incremental(self) -> Dict[str, int]:
+        """증분 모드: ETag가 바뀐 PDF만 Textract 재추출, 삭제된 문서의 페이지 제거"""
+        
+        print("🚀 증분 PDF OCR 추출 시작")
+        
+        current = self.list_source_pdfs()
+        manifest = self.load_manifest()
+        changed, deleted = self.plan_incremental_sync(current, manifest)
+        
+        print(f"   원본 PDF: {len(current)}개, 변경/신규: {len(changed)}개, 삭제: {len(deleted)}개")
+        
+        stats = {'processed': 0, 'failed': 0, 'deleted': 0, 'pages': 0}
+        
+        for pdf_key in changed:
+            kept_pages = set()
+            pages = self._track_pages(self.iter_pdf_pages_ocr(pdf_key), kept_pages)
+            
+            if not self.save_to_dynamodb(pages) or not kept_pages:
+                # 매니페스트를 갱신하지 않으므로 다음 실행에서 재시도
+                stats['failed'] += 1
+                continue
             
-            # 문서 ID 생성 (파일명에서)
             document_id = self._extract_document_id(pdf_key)
             
-            # 페이지별 OCR 데이터 구성
-            ocr_results = []
-            for page_num, text_lines in pages_ocr.items():
-                ocr_results.append({
-                    'document_id': document_id,
-                    'page_number': str(page_num),
-                    'ocr_text': '\n'.join(text_lines),
-                    'page_image_url': f's3://{self.source_bucket}/{pdf_key}#page={page_num}',
-                    'extracted_at': datetime.utcnow().isoformat() + 'Z',
-                    'source_pdf': pdf_key,
-                    'extraction_method': 'textract_pdf'
-                })
-            
-            print(f"   ✅ 완료: {len(ocr_results)}페이지")
-            return ocr_results
+            # 페이지 수가 줄어든 경우 남은 이전 페이지 정리
+            self._delete_document_pages(document_id, keep_pages=kept_pages)
+            self.rasterize_pages(pdf_key)
+            self._update_manifest(pdf_key, current[pdf_key], document_id, len(kept_pages))
+            
+            stats['processed'] += 1
+            stats['pages'] += len(kept_pages)
+        
+        # 삭제된 PDF: 같은 문서 ID를 쓰는 다른 PDF가 없을 때만 페이지 삭제
+        live_document_ids = {self._extract_document_id(pdf_key) for pdf_key in current}
+        for pdf_key in deleted:
+            document_id = manifest[pdf_key].get('document_id') or self._extract_document_id(pdf_key)
+            
+            if document_id not in live_document_ids:
+                removed = self._delete_document_pages(document_id)
+                print(f"🗑️ 삭제된 문서 정리: {document_id} ({removed}페이지)")
             
+            self.dynamodb.Table(self.manifest_table_name).delete_item(Key={'pdf_key': pdf_key})
+            stats['deleted'] += 1
+        
+        return stats
+    
+    def record_manifest(self, page_counts: Dict[str, int]):
+        """전체 추출 결과를 매니페스트에 기록 (이후 증분 실행의 기준점, ETag는 추출 대상 목록 조회 시점 값)"""
+        
+        failed_pdfs = getattr(self, 'failed_pdfs', set())
+        
+        for pdf_key, page_count in page_counts.items():
+            if pdf_key in self.source_pdfs and pdf_key not in failed_pdfs:
+                self._update_manifest(pdf_key, self.source_pdfs[pdf_key], self._extract_document_id(pdf_key), page_count)
+    
+    def prune_full_extraction(self, document_pages: Dict[str, Set[str]], manifest: Dict[str, Dict]) -> Dict[str, int]:
+        """전체 추출 후 정리: 원본에서 삭제된 PDF의 페이지/매니페스트, 페이지 수가 줄어든 문서의 남은 페이지 삭제
+        
+        추출에 실패한 PDF의 문서는 이전 페이지를 유지
+        """
+        
+        failed_documents = {self._extract_document_id(pdf_key) for pdf_key in getattr(self, 'failed_pdfs', set())}
+        live_document_ids = {self._extract_document_id(pdf_key) for pdf_key in self.source_pdfs}
+        stats = {'deleted_documents': 0, 'deleted_pages': 0}
+        
+        for document_id in sorted(self._list_ocr_document_ids() - live_document_ids):
+            removed = self._delete_document_pages(document_id)
+            print(f"🗑️ 삭제된 문서 정리: {document_id} ({removed}페이지)")
+            stats['deleted_documents'] += 1
+            stats['deleted_pages'] += removed
+        
+        for document_id, pages in sorted(document_pages.items()):
+            if document_id not in failed_documents:
+                stats['deleted_pages'] += self._delete_document_pages(document_id, keep_pages=pages)
+        
+        manifest_table = self.dynamodb.Table(self.manifest_table_name)
+        for pdf_key in sorted(set(manifest) - set(self.source_pdfs)):
+            manifest_table.delete_item(Key={'pdf_key': pdf_key})
+        
+        return stats
+    
+    def _list_ocr_document_ids(self) -> Set[str]:
+        """OCR 테이블에 페이지가 있는 문서 ID 전체"""
+        
+        table = self.dynamodb.Table(self.ocr_table_name)
+        document_ids = set()
+        
+        scan_kwargs = {'ProjectionExpression': 'document_id'}
+        while True:
+            response = table.scan(**scan_kwargs)
+            document_ids.update(item['document_id'] for item in response.get('Items', []))
+            
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        
+        return document_ids
+    
+    def rasterize_pages(self, pdf_key: str):
+        """래스터화 모드일 때 PDF 페이지 이미지 생성 (실패해도 OCR 결과는 유지)"""
+        
+        if not self.rasterize:
+            return
+        
+        if self._rasterizer is None:
+            from pdf_page_rasterizer import PDFPageRasterizer
+            self._rasterizer = PDFPageRasterizer()
+        
+        try:
+            self._rasterizer.rasterize_pdf(pdf_key, self._extract_document_id(pdf_key))
         except Exception as e:
-            print(f"   ❌ PDF OCR 실패: {e}")
-            return []
+            print(f"   ⚠️ 페이지 이미지 생성 실패 (pdf_page_rasterizer.py로 재실행 가능): {e}")
     
-    def process_all_pdfs(self) -> List[Dict]:
-        """모든 PDF 파일 처리"""
+    def _track_pages(self, pages: Iterable[Dict], page_numbers: Set[str]) -> Iterator[Dict]:
+        """스트림을 통과시키며 저장된 페이지 번호 기록"""
         
-        print("🚀 전체 PDF OCR 추출 시작")
+        for page in pages:
+            page_numbers.add(page['page_number'])
+            yield page
+    
+    def _delete_document_pages(self, document_id: str, keep_pages: Set[str] = frozenset()) -> int:
+        """문서의 OCR 페이지 삭제 (keep_pages에 포함된 페이지는 유지)"""
         
-        # PDF 파일 리스트 (전체 11개)
-        pdf_files = [
-            'documents/all/02-2 SOLAS Chapter II-2_Construction Fire Protection, Fire Detection and Fire Extinction.pdf',
-            'documents/all/DNV-RU-SHIP-Pt4 Ch6.pdf',
-            'documents/all/DNV-RU-SHIP-Pt6 Ch5 Sec4.pdf',
-            'documents/all/Design guidance_Spoolcutting.PDF',
-            'documents/all/Design guidance_Support.PDF',
-            'documents/all/Design_guidance_hull_penetration.PDF',
-            'documents/all/FSS.pdf',
-            'documents/all/IGC_Code_latest.pdf',
-            'documents/all/Piping practice_Support.PDF',
-            'documents/all/Piping_practice_hull_penetration.PDF'
-        ]
+        table = self.dynamodb.Table(self.ocr_table_name)
+        removed = 0
         
-        all_ocr_results = []
+        query_kwargs = {
+            'KeyConditionExpression': Key('document_id').eq(document_id),
+            'ProjectionExpression': 'document_id, page_number'
+        }
         
-        for pdf_key in pdf_files:
-            ocr_results = self.extract_pdf_pages_ocr(pdf_key)
-            all_ocr_results.extend(ocr_results)
+        with table.batch_writer() as batch:
+            while True:
+                response = table.query(**query_kwargs)
+                for item in response.get('Items', []):
+                    if item['page_number'] in keep_pages:
+                        continue
+                    batch.delete_item(Key={
+                        'document_id': item['document_id'],
+                        'page_number': item['page_number']
+                    })
+                    removed += 1
+                
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        
+        # 로컬 BM25 색인에서도 같은 페이지 제거
+        try:
+            with LexicalIndexWriter() as writer:
+                writer.delete_document(document_id, keep_pages=keep_pages)
+        except Exception as e:
+            print(f"   ⚠️ BM25 색인 정리 실패 (lexical_index.py로 재동기화 가능): {e}")
+        
+        return removed
+    
+    def _update_manifest(self, pdf_key: str, info: Dict, document_id: str, page_count: int):
+        """추출 성공한 PDF의 ETag를 매니페스트에 기록"""
         
-        return all_ocr_results
+        self.dynamodb.Table(self.manifest_table_name).put_item(Item={
+            'pdf_key': pdf_key,
+            'etag': info['etag'],
+            'size': info['size'],
+            'last_modified': info['last_modified'],
+            'document_id': document_id,
+            'page_count': page_count,
+            'extraction_method': self.extraction_method,
+            'extracted_at': datetime.utcnow().isoformat() + 'Z'
+        })
     
-    def save_to_dynamodb(self, ocr_results: List[Dict]) -> bool:
-        """DynamoDB에 저장"""
+    def save_to_dynamodb(self, ocr_results: Iterable[Dict]) -> bool:
+        """DynamoDB에 저장 (페이지가 도착하는 대로 batch_writer로 기록)"""
         
-        print(f"💾 DynamoDB 저장: {len(ocr_results)}개 페이지")
+        print(f"💾 DynamoDB 스트리밍 저장 시작")
         
+        saved = 0
+        lexical_writer = self._open_lexical_writer()
         try:
             table = self.dynamodb.Table(self.ocr_table_name)
             
-            # 배치 저장
+            # 배치 저장 (batch_writer가 25개 단위로 즉시 flush)
             with table.batch_writer() as batch:
                 for ocr_data in ocr_results:
                     batch.put_item(Item=ocr_data)
+                    saved += 1
+                    # 같은 페이지를 로컬 BM25 색인에도 반영 (증분)
+                    if lexical_writer:
+                        lexical_writer.upsert_page(ocr_data)
             
-            print("✅ DynamoDB 저장 완료")
+            print(f"✅ DynamoDB 저장 완료: {saved}개 페이지")
             return True
             
         except Exception as e:
-            print(f"❌ DynamoDB 저장 실패: {e}")
+            print(f"❌ DynamoDB 저장 실패 ({saved}개 페이지 저장 후): {e}")
             return False
+        
+        finally:
+            if lexical_writer:
+                lexical_writer.commit()
+                lexical_writer.close()
+    
+    def _open_lexical_writer(self):
+        """BM25 색인 writer (열 수 없으면 None, OCR 저장은 계속 진행)"""
+        
+        try:
+            return LexicalIndexWriter()
+        except Exception as e:
+            print(f"   ⚠️ BM25 색인을 열 수 없음 (lexical_index.py로 재동기화 가능): {e}")
+            return None
     
     def _extract_document_id(self, pdf_key: str) -> str:
         """PDF 파일명에서 문서 ID 추출"""
@@ -158,7 +472,9 @@ class PDFOCRExtraction:
         filename = pdf_key.split('/')[-1].replace('.pdf', '').replace('.PDF', '')
         
         # 파일명 정리
-        if 'SOLAS' in filename:
+        if 'SOLAS_2017_Insulation' in filename:
+            return 'solas_2017_insulation_penetration'
+        elif 'SOLAS' in filename:
             return 'solas_chapter2'
         elif 'DNV-RU-SHIP-Pt4' in filename:
             return 'dnv_pt4_ch6'
@@ -181,30 +497,63 @@ class PDFOCRExtraction:
         else:
             return filename.lower().replace(' ', '_').replace('-', '_')
 
-def execute_pdf_ocr_extraction():
+def execute_pdf_ocr_extraction(layout: bool = False, rasterize: bool = False):
     """PDF OCR 추출 실행"""
     
-    extractor = PDFOCRExtraction()
+    extractor = PDFOCRExtraction(layout=layout, rasterize=rasterize)
+    
+    # 1. 모든 PDF 처리 → 2. DynamoDB 저장 (페이지 단위 스트리밍)
+    # 순서가 섞인 페이지는 다시 저장되므로 페이지 번호 집합으로 집계
+    pdf_pages = {}
+    document_pages = {}
+    manifest = extractor.load_manifest()
     
-    # 1. 모든 PDF 처리
-    ocr_results = extractor.process_all_pdfs()
+    def count_pages(pages):
+        for result in pages:
+            pdf_pages.setdefault(result['source_pdf'], set()).add(result['page_number'])
+            document_pages.setdefault(result['document_id'], set()).add(result['page_number'])
+            yield result
     
-    if ocr_results:
-        # 2. DynamoDB 저장
-        success = extractor.save_to_dynamodb(ocr_results)
+    success = extractor.save_to_dynamodb(count_pages(extractor.process_all_pdfs()))
+    page_counts = {pdf_key: len(pages) for pdf_key, pages in pdf_pages.items()}
+    doc_stats = {document_id: len(pages) for document_id, pages in document_pages.items()}
+    
+    if success and page_counts:
+        # 3. 매니페스트 기록 + 삭제된 PDF/남은 이전 페이지 정리
+        extractor.record_manifest(page_counts)
+        pruned = extractor.prune_full_extraction(document_pages, manifest)
         
-        if success:
-            print(f"\n🎉 완료!")
-            print(f"   - 처리된 페이지: {len(ocr_results)}개")
-            print(f"   - 문서별 통계:")
-            
-            doc_stats = {}
-            for result in ocr_results:
-                doc_id = result['document_id']
-                doc_stats[doc_id] = doc_stats.get(doc_id, 0) + 1
-            
-            for doc_id, page_count in doc_stats.items():
-                print(f"     {doc_id}: {page_count}페이지")
+        # 4. 페이지 이미지 생성 (--rasterize)
+        for pdf_key in page_counts:
+            extractor.rasterize_pages(pdf_key)
+        
+        print(f"\n🎉 완료!")
+        print(f"   - 처리된 페이지: {sum(doc_stats.values())}개")
+        print(f"   - 정리된 문서/페이지: {pruned['deleted_documents']}개 / {pruned['deleted_pages']}페이지")
+        print(f"   - 문서별 통계:")
+        
+        for doc_id, page_count in doc_stats.items():
+            print(f"     {doc_id}: {page_count}페이지")
+
+def execute_incremental_ocr_extraction(layout: bool = False, rasterize: bool = False):
+    """증분 PDF OCR 추출 실행 (변경된 문서만)"""
+    
+    extractor = PDFOCRExtraction(layout=layout, rasterize=rasterize)
+    stats = extractor.process_incremental()
+    
+    print(f"\n🎉 증분 추출 완료!")
+    print(f"   - 재추출 문서: {stats['processed']}개 ({stats['pages']}페이지)")
+    print(f"   - 삭제 문서: {stats['deleted']}개")
+    if stats['failed']:
+        print(f"   - 실패 문서: {stats['failed']}개 (다음 실행에서 재시도)")
 
 if __name__ == "__main__":
-    execute_pdf_ocr_extraction()
\ No newline at end of file
+    # --layout: 표/섹션 구조를 보존하는 Textract 분석 모드
+    layout = '--layout' in sys.argv
+    # --rasterize: 추출된 PDF의 페이지 WebP 이미지/썸네일 생성
+    rasterize = '--rasterize' in sys.argv
+    
+    if '--incremental' in sys.argv:
+        execute_incremental_ocr_extraction(layout=layout, rasterize=rasterize)
+    else:
+        execute_pdf_ocr_extraction(layout=layout, rasterize=rasterize)
\ No newline at end of file
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+원본 PDF 페이지를 로컬에서 래스터화하여 WebP 페이지 이미지/썸네일을 S3에 저장
+OCR 테이블의 page_image_url, thumbnail_url을 실제 이미지 URI로 기록
+
+필요 패키지 (수집 단계 전용): pymupdf, Pillow
+"""
+
+import boto3
+import io
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+# 결정적 S3 레이아웃: s3://{bucket}/page-images/{document_id}/page_0001.webp
+PAGE_IMAGE_BUCKET = 'shi-kb-bucket'
+PAGE_IMAGE_PREFIX = 'page-images/'
+
+def page_image_uri(document_id: str, page_number: int) -> str:
+    """페이지 이미지 S3 URI"""
+    return f"s3://{PAGE_IMAGE_BUCKET}/{_page_image_key(document_id, page_number)}"
+
+def page_thumbnail_uri(document_id: str, page_number: int) -> str:
+    """페이지 썸네일 S3 URI"""
+    return f"s3://{PAGE_IMAGE_BUCKET}/{_page_thumbnail_key(document_id, page_number)}"
+
+def _page_image_key(document_id: str, page_number: int) -> str:
+    return f"{PAGE_IMAGE_PREFIX}{document_id}/page_{int(page_number):04d}.webp"
+
+def _page_thumbnail_key(document_id: str, page_number: int) -> str:
+    return f"{PAGE_IMAGE_PREFIX}{document_id}/thumb/page_{int(page_number):04d}.webp"
+
+def _render_page_range(pdf_path: str, start: int, end: int, dpi: int,
+                       thumbnail_width: int, quality: int) -> List[Tuple[int, bytes, bytes]]:
+    """프로세스 풀 작업: 페이지 범위 [start, end)를 WebP 이미지와 썸네일로 변환
+
+    문서를 작업마다 한 번만 열도록 페이지 단위가 아닌 범위 단위로 처리
+    """
+
+    import fitz  # PyMuPDF
+    from PIL import Image
+
+    rendered = []
+    with fitz.open(pdf_path) as document:
+        for page_index in range(start, end):
+            pixmap = document[page_index].get_pixmap(dpi=dpi, alpha=False)
+            image = Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+
+            page_buffer = io.BytesIO()
+            image.save(page_buffer, 'WEBP', quality=quality, method=4)
+
+            thumbnail = image.copy()
+            thumbnail.thumbnail((thumbnail_width, thumbnail_width * 4))
+            thumbnail_buffer = io.BytesIO()
+            thumbnail.save(thumbnail_buffer, 'WEBP', quality=quality, method=4)
+
+            rendered.append((page_index + 1, page_buffer.getvalue(), thumbnail_buffer.getvalue()))
+
+    return rendered
+
+class PDFPageRasterizer:
+
+    def __init__(self, dpi: int = 110, thumbnail_width: int = 320, quality: int = 75,
+                 max_workers: Optional[int] = None, pages_per_task: int = 8):
+        self.s3_client = boto3.client('s3', region_name='us-west-2')
+        self.dynamodb = boto3.resource('dynamodb', region_name='us-west-2')
+
+        # 원본 소스
+        self.source_bucket = 'shi-kb-bucket'
+        self.ocr_table_name = 'ship-firefighting-ocr'
+
+        # 렌더링 설정
+        self.dpi = dpi
+        self.thumbnail_width = thumbnail_width
+        self.quality = quality
+        self.max_workers = max_workers or os.cpu_count()
+        self.pages_per_task = pages_per_task
+
+    def rasterize_pdf(self, pdf_key: str, document_id: str) -> int:
+        """PDF 한 개의 모든 페이지를 래스터화하여 S3 업로드 + OCR 테이블 갱신"""
+
+        print(f"🖼️ 페이지 이미지 생성 중: {pdf_key}")
+
+        try:
+            import fitz  # PyMuPDF
+        except ImportError:
+            raise ImportError("페이지 래스터화에는 pymupdf와 Pillow가 필요합니다: pip install pymupdf Pillow")
+
+        table = self.dynamodb.Table(self.ocr_table_name)
+        uploaded = 0
+
+        with tempfile.NamedTemporaryFile(suffix='.pdf') as tmp:
+            self.s3_client.download_fileobj(self.source_bucket, pdf_key, tmp)
+            tmp.flush()
+
+            with fitz.open(tmp.name) as document:
+                page_count = document.page_count
+
+            ranges = [
+                (start, min(start + self.pages_per_task, page_count))
+                for start in range(0, page_count, self.pages_per_task)
+            ]
+
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(_render_page_range, tmp.name, start, end,
+                                    self.dpi, self.thumbnail_width, self.quality)
+                    for start, end in ranges
+                ]
+
+                # 완료된 범위부터 바로 업로드 (메모리에는 작업 몇 개 분량만 유지)
+                for future in as_completed(futures):
+                    for page_number, image_bytes, thumbnail_bytes in future.result():
+                        self._upload_page(document_id, page_number, image_bytes, thumbnail_bytes)
+                        self._record_page_urls(table, document_id, page_number)
+                        uploaded += 1
+
+        print(f"   ✅ 완료: {uploaded}페이지")
+        return uploaded
+
+    def _upload_page(self, document_id: str, page_number: int, image_bytes: bytes, thumbnail_bytes: bytes):
+        """페이지 이미지와 썸네일 S3 업로드"""
+
+        for key, body in (
+            (_page_image_key(document_id, page_number), image_bytes),
+            (_page_thumbnail_key(document_id, page_number), thumbnail_bytes)
+        ):
+            self.s3_client.put_object(
+                Bucket=PAGE_IMAGE_BUCKET,
+                Key=key,
+                Body=body,
+                ContentType='image/webp',
+                CacheControl='max-age=31536000'
+            )
+
+    def _record_page_urls(self, table, document_id: str, page_number: int):
+        """OCR 테이블에 이미지 URI 기록 (OCR 페이지가 없는 빈 페이지는 건너뜀)"""
+
+        try:
+            table.update_item(
+                Key={
+                    'document_id': document_id,
+                    'page_number': str(page_number)
+                },
+                UpdateExpression='SET page_image_url = :image, thumbnail_url = :thumbnail',
+                ConditionExpression='attribute_exists(document_id)',
+                ExpressionAttributeValues={
+                    ':image': page_image_uri(document_id, page_number),
+                    ':thumbnail': page_thumbnail_uri(document_id, page_number)
+                }
+            )
+        except self.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            pass
+
+def execute_page_rasterization(pdf_keys: List[str] = None):
+    """원본 PDF 페이지 이미지 생성 실행 (기본: documents/all/ 전체)"""
+
+    from pdf_ocr_extraction import PDFOCRExtraction
+
+    extractor = PDFOCRExtraction()
+    rasterizer = PDFPageRasterizer()
+
+    pdf_keys = pdf_keys or sorted(extractor.list_source_pdfs())
+    doc_stats = {}
+
+    for pdf_key in pdf_keys:
+        document_id = extractor._extract_document_id(pdf_key)
+        try:
+            doc_stats[document_id] = rasterizer.rasterize_pdf(pdf_key, document_id)
+        except Exception as e:
+            print(f"   ❌ 페이지 이미지 생성 실패: {e}")
+
+    print(f"\n🎉 완료!")
+    for document_id, page_count in doc_stats.items():
+        print(f"     {document_id}: {page_count}페이지")
+
+if __name__ == "__main__":
+    execute_page_rasterization(sys.argv[1:])
@@ -3,26 +3,10 @@
 KB와 Neptune DB의 실제 통계를 조회하는 스크립트
 """
 import boto3
-import json
-import requests
-from botocore.auth import SigV4Auth
-from botocore.awsrequest import AWSRequest
 
-def process_neptune_response(response):
-    """Neptune 응답 처리 헬퍼 함수"""
-    try:
-        # payload를 직접 읽어서 디코드
-        payload_data = response['payload'].read().decode('utf-8')
-        
-        # 전체 JSON으로 파싱
-        json_response = json.loads(payload_data)
-        
-        # results 배열 반환
-        return json_response.get('results', [])
-        
-    except Exception as e:
-        print(f"응답 처리 오류: {e}")
-        return []
+from core.agent_manager import load_retrieval_config
+from neptune_analytics_client import get_neptune_analytics_client
+from sparql_client import get_sparql_client
 
 def get_kb_stats():
     """Knowledge Base 통계 조회"""
@@ -52,6 +36,7 @@ def get_kb_stats():
             print(f"- {ds['name']}: {ds['status']}")
             
         # 샘플 검색으로 대략적인 문서 수 추정
+        top_k = load_retrieval_config().get('stats_top_k', 50)
         sample_queries = ["SOLAS", "FSS", "소화", "화재", "규정"]
         total_results = 0
         unique_sources = set()
@@ -63,7 +48,7 @@ def get_kb_stats():
                     retrievalQuery={'text': query},
                     retrievalConfiguration={
                         'vectorSearchConfiguration': {
-                            'numberOfResults': 50
+                            'numberOfResults': top_k
                         }
                     }
                 )
@@ -95,25 +80,19 @@ def get_neptune_stats():
     """Neptune Analytics 통계 조회"""
     print("\n=== Neptune Analytics 통계 조회 ===")
     
-    neptune_client = boto3.client('neptune-graph', region_name='us-west-2')
+    neptune_client = get_neptune_analytics_client()
     graph_id = 'g-gqisj8edd6'
     
     try:
         # 그래프 정보 조회
-        graph_info = neptune_client.get_graph(graphIdentifier=graph_id)
+        graph_info = neptune_client.get_graph(graph_id)
         print(f"그래프 이름: {graph_info['name']}")
         print(f"그래프 상태: {graph_info['status']}")
         
         # 노드 수 조회 쿼리
         node_count_query = "MATCH (n) RETURN count(n) as node_count"
         
-        response = neptune_client.execute_query(
-            graphIdentifier=graph_id,
-            queryString=node_count_query,
-            language='OPEN_CYPHER'
-        )
-        
-        result_data = process_neptune_response(response)
+        result_data = neptune_client.execute(graph_id, node_count_query)
         
         if result_data:
             node_count = result_data[0].get('node_count', 0)
@@ -122,13 +101,7 @@ def get_neptune_stats():
         # 관계 수 조회
         edge_count_query = "MATCH ()-[r]->() RETURN count(r) as edge_count"
         
-        response = neptune_client.execute_query(
-            graphIdentifier=graph_id,
-            queryString=edge_count_query,
-            language='OPEN_CYPHER'
-        )
-        
-        result_data = process_neptune_response(response)
+        result_data = neptune_client.execute(graph_id, edge_count_query)
         
         if result_data:
             edge_count = result_data[0].get('edge_count', 0)
@@ -137,13 +110,7 @@ def get_neptune_stats():
         # 노드 타입별 분포
         label_query = "MATCH (n) RETURN labels(n) as labels, count(n) as count ORDER BY count DESC LIMIT 10"
         
-        response = neptune_client.execute_query(
-            graphIdentifier=graph_id,
-            queryString=label_query,
-            language='OPEN_CYPHER'
-        )
-        
-        result_data = process_neptune_response(response)
+        result_data = neptune_client.execute(graph_id, label_query)
         
         print("노드 타입별 분포:")
         for item in result_data:
@@ -154,19 +121,16 @@ def get_neptune_stats():
         # 관계 타입별 분포
         rel_query = "MATCH ()-[r]->() RETURN type(r) as rel_type, count(r) as count ORDER BY count DESC LIMIT 10"
         
-        response = neptune_client.execute_query(
-            graphIdentifier=graph_id,
-            queryString=rel_query,
-            language='OPEN_CYPHER'
-        )
-        
-        result_data = process_neptune_response(response)
+        result_data = neptune_client.execute(graph_id, rel_query)
         
         print("관계 타입별 분포:")
         for item in result_data:
             rel_type = item.get('rel_type', '')
             count = item.get('count', 0)
             print(f"- {rel_type}: {count:,}개")
+        
+        metrics = neptune_client.metrics_summary()
+        print(f"쿼리 {metrics['queries']}개, 총 {metrics['total_seconds']:.2f}초 (최대 {metrics['max_seconds']:.2f}초)")
             
     except Exception as e:
         print(f"Neptune 조회 오류: {e}")
@@ -176,51 +140,9 @@ def get_sparql_stats():
     print("\n=== SPARQL 온톨로지 통계 조회 ===")
     
     try:
-        # Neptune SPARQL 엔드포인트
-        neptune_endpoint = "shi-neptune-2.cluster-ct0is2emg3pe.us-west-2.neptune.amazonaws.com"
-        sparql_endpoint = f"https://{neptune_endpoint}:8182/sparql"
-        
-        # AWS 인증 설정
-        session = boto3.Session()
-        credentials = session.get_credentials()
-        region = 'us-west-2'
-        
         # 총 트리플 수 조회
         count_query = "SELECT (COUNT(*) as ?count) WHERE { ?s ?p ?o }"
         
-        headers = {
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'Accept': 'application/sparql-results+json'
-        }
-        
-        data = f"query={requests.utils.quote(count_query)}"
-        
-        request = AWSRequest(
-            method='POST',
-            url=sparql_endpoint,
-            data=data,
-            headers=headers
-        )
-        
-        SigV4Auth(credentials, 'neptune-db', region).add_auth(request)
-        prepared_request = request.prepare()
-        
-        response = requests.post(
-            prepared_request.url,
-            data=prepared_request.body,
-            headers=prepared_request.headers,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            bindings = result.get('results', {}).get('bindings', [])
-            if bindings:
-                total_triples = bindings[0]['count']['value']
-                print(f"총 트리플 수: {total_triples}개")
-        else:
-            print(f"SPARQL 쿼리 실패: {response.status_code}")
-        
         # 클래스 수 조회
         class_query = """
         PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
@@ -232,25 +154,6 @@ def get_sparql_stats():
         }
         """
         
-        data = f"query={requests.utils.quote(class_query)}"
-        request = AWSRequest(method='POST', url=sparql_endpoint, data=data, headers=headers)
-        SigV4Auth(credentials, 'neptune-db', region).add_auth(request)
-        prepared_request = request.prepare()
-        
-        response = requests.post(
-            prepared_request.url,
-            data=prepared_request.body,
-            headers=prepared_request.headers,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            bindings = result.get('results', {}).get('bindings', [])
-            if bindings:
-                class_count = bindings[0]['count']['value']
-                print(f"FSS 클래스 수: {class_count}개")
-        
         # 인스턴스 수 조회
         instance_query = """
         PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
@@ -261,24 +164,17 @@ def get_sparql_stats():
         }
         """
         
-        data = f"query={requests.utils.quote(instance_query)}"
-        request = AWSRequest(method='POST', url=sparql_endpoint, data=data, headers=headers)
-        SigV4Auth(credentials, 'neptune-db', region).add_auth(request)
-        prepared_request = request.prepare()
-        
-        response = requests.post(
-            prepared_request.url,
-            data=prepared_request.body,
-            headers=prepared_request.headers,
-            timeout=30
-        )
+        # 세 쿼리를 같은 연결 풀에서 동시에 실행
+        results = get_sparql_client().query_many([count_query, class_query, instance_query])
         
-        if response.status_code == 200:
-            result = response.json()
+        for label, result in zip(["총 트리플 수", "FSS 클래스 수", "FSS 인스턴스 수"], results):
+            if result is None:
+                print(f"{label} 조회 실패")
+                continue
+            
             bindings = result.get('results', {}).get('bindings', [])
             if bindings:
-                instance_count = bindings[0]['count']['value']
-                print(f"FSS 인스턴스 수: {instance_count}개")
+                print(f"{label}: {bindings[0]['count']['value']}개")
                 
     except Exception as e:
         print(f"SPARQL 조회 오류: {e}")
@@ -0,0 +1,149 @@
+"""
+질문 임베딩 캐시 + 의미 기반 답변 캐시
+질문 임베딩은 정규화한 텍스트 기준 LRU로 한 번만 계산하고(Titan Text Embeddings V2),
+같은 임베딩을 답변과 함께 저장해 거의 같은 질문은 검색/Rerank/응답 생성 없이 캐시된 답변으로 응답
+(규정 질문은 조항 번호/대상 공간만 달라도 답이 다르므로 질문 속 숫자와 연결 엔티티가 같을 때만 사용)
+(Bedrock retrieve는 질문을 서버에서 다시 임베딩하므로 retrieve 호출 자체에는 사용하지 않음)
+"""
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+DEFAULT_EMBEDDING_MODEL_ID = 'amazon.titan-embed-text-v2:0'
+
+def normalize_query(text: str) -> str:
+    """캐시 키용 질문 정규화 (소문자, 공백 1개, 앞뒤 문장부호 제거)"""
+    return re.sub(r'\s+', ' ', text.lower()).strip(' ?!.,~')
+
+NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)*')
+
+def query_signature(text: str, entity_ids: Iterable[str] = ()) -> Tuple[tuple, tuple]:
+    """캐시 답변을 재사용하려면 일치해야 하는 질문 속 숫자(조항 번호, 수치)와 연결 엔티티"""
+    return tuple(sorted(set(NUMBER_PATTERN.findall(text)))), tuple(sorted(set(entity_ids)))
+
+def dot(a: List[float], b: List[float]) -> float:
+    """정규화된 임베딩의 코사인 유사도"""
+    return sum(x * y for x, y in zip(a, b))
+
+class QueryEmbeddingCache:
+    """질문 임베딩 LRU 캐시 (스레드 안전, 실패 시 None → 호출 측은 캐시 없이 진행)"""
+
+    def __init__(self, model_id: str = DEFAULT_EMBEDDING_MODEL_ID, dimensions: int = 512,
+                 max_entries: int = 1024):
+        self.model_id = model_id
+        self.dimensions = dimensions
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._client = None
+
+    def embed(self, text: str) -> Optional[List[float]]:
+        """정규화한 질문 → 단위 벡터 (캐시에 없을 때만 임베딩 모델 호출)"""
+        key = normalize_query(text)
+        if not key:
+            return None
+
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                return embedding
+
+        try:
+            if self._client is None:
+                import boto3
+                self._client = boto3.client('bedrock-runtime', region_name='us-west-2')
+
+            response = self._client.invoke_model(
+                modelId=self.model_id,
+                body=json.dumps({"inputText": key, "dimensions": self.dimensions, "normalize": True})
+            )
+            embedding = json.loads(response['body'].read())['embedding']
+        except Exception as e:
+            print(f"질문 임베딩 실패: {e}")
+            return None
+
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return embedding
+
+class CachedAnswer(NamedTuple):
+    query: str
+    kb_id: str
+    signature: Tuple[tuple, tuple]
+    embedding: List[float]
+    content: str
+    references: list
+    stored_at: float
+
+class SemanticAnswerCache:
+    """임베딩 유사도 기반 답변 캐시 (KB와 질문 서명이 같은 항목만, TTL 경과 항목은 조회 시 제외)"""
+
+    def __init__(self, max_entries: int = 256, min_similarity: float = 0.95, ttl_seconds: int = 3600):
+        self.max_entries = max_entries
+        self.min_similarity = min_similarity
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, embedding: List[float], kb_id: str, signature: Tuple[tuple, tuple]) -> Optional[CachedAnswer]:
+        """가장 유사한 캐시 답변 (유사도가 min_similarity 미만이거나 서명이 다르면 None)"""
+        now = time.time()
+        best, best_similarity = None, self.min_similarity
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if now - entry.stored_at > self.ttl_seconds:
+                    del self._entries[key]
+                    continue
+                if entry.kb_id != kb_id or entry.signature != signature:
+                    continue
+                similarity = dot(embedding, entry.embedding)
+                if similarity >= best_similarity:
+                    best, best_similarity = entry, similarity
+
+            if best is not None:
+                self._entries.move_to_end((best.kb_id, normalize_query(best.query)))
+
+        return best
+
+    def store(self, query: str, kb_id: str, signature: Tuple[tuple, tuple], embedding: List[float],
+              content: str, references: list):
+        """답변 저장"""
+        key = (kb_id, normalize_query(query))
+        with self._lock:
+            self._entries[key] = CachedAnswer(query, kb_id, signature, embedding, content, references, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+_embedding_cache: Optional[QueryEmbeddingCache] = None
+_answer_cache: Optional[SemanticAnswerCache] = None
+_cache_lock = threading.Lock()
+
+def get_query_embedding_cache(model_id: str = DEFAULT_EMBEDDING_MODEL_ID, dimensions: int = 512,
+                              max_entries: int = 1024) -> QueryEmbeddingCache:
+    """프로세스 공용 질문 임베딩 캐시 (첫 호출의 설정으로 생성)"""
+    global _embedding_cache
+
+    with _cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = QueryEmbeddingCache(model_id, dimensions, max_entries)
+        return _embedding_cache
+
+def get_semantic_answer_cache(max_entries: int = 256, min_similarity: float = 0.95,
+                              ttl_seconds: int = 3600) -> SemanticAnswerCache:
+    """프로세스 공용 답변 캐시 (첫 호출의 설정으로 생성)"""
+    global _answer_cache
+
+    with _cache_lock:
+        if _answer_cache is None:
+            _answer_cache = SemanticAnswerCache(max_entries, min_similarity, ttl_seconds)
+        return _answer_cache
@@ -0,0 +1,95 @@
+"""
+Neptune SPARQL 공용 클라이언트
+requests.Session 연결 풀(keep-alive)을 재사용하고, 자격 증명은 캐시하되 만료 전에 자동 갱신하며,
+SigV4 서명 요청에 타임아웃과 gzip 응답을 적용
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlencode
+
+import boto3
+import requests
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+NEPTUNE_ENDPOINT = "shi-neptune-2.cluster-ct0is2emg3pe.us-west-2.neptune.amazonaws.com"
+SPARQL_ENDPOINT = f"https://{NEPTUNE_ENDPOINT}:8182/sparql"
+REGION = "us-west-2"
+
+class SPARQLClient:
+    """SigV4 서명 SPARQL 클라이언트 (스레드 간 공유)"""
+
+    def __init__(self, endpoint: str = SPARQL_ENDPOINT, region: str = REGION,
+                 connect_timeout: float = 5, read_timeout: float = 60,
+                 pool_size: int = 8, max_workers: int = 4):
+        self.endpoint = endpoint
+        self.region = region
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_workers = max_workers
+
+        # 연결 풀 + 일시적 오류 재시도 (SPARQL 조회는 멱등이므로 POST도 재시도)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({'POST'})
+            )
+        )
+        self.session.mount('https://', adapter)
+
+        # RefreshableCredentials: get_frozen_credentials() 호출 시 만료 임박하면 자동 갱신
+        self._credentials = boto3.Session().get_credentials()
+
+    def query(self, query: str) -> Dict:
+        """SELECT/ASK 쿼리 실행 → SPARQL JSON 결과 (HTTP 오류 시 예외)"""
+        body = urlencode({'query': query})
+        headers = {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Accept': 'application/sparql-results+json',
+            'Accept-Encoding': 'gzip'
+        }
+
+        request = AWSRequest(method='POST', url=self.endpoint, data=body, headers=headers)
+        SigV4Auth(self._credentials.get_frozen_credentials(), 'neptune-db', self.region).add_auth(request)
+
+        response = self.session.post(
+            self.endpoint,
+            data=body,
+            headers=dict(request.headers),
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def query_many(self, queries: Sequence[str]) -> List[Optional[Dict]]:
+        """여러 쿼리를 같은 연결 풀에서 동시에 실행 (순서 유지, 실패한 쿼리는 None)"""
+        def run(query):
+            try:
+                return self.query(query)
+            except Exception as e:
+                print(f"SPARQL 쿼리 실패: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(queries)) or 1) as executor:
+            return list(executor.map(run, queries))
+
+_client: Optional[SPARQLClient] = None
+_client_lock = threading.Lock()
+
+def get_sparql_client() -> SPARQLClient:
+    """프로세스 공용 SPARQL 클라이언트"""
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SPARQLClient()
+
+    return _client
@@ -0,0 +1,145 @@
+"""
+조항 색인 테스트 (AWS 없이 실행: python -m pytest test_clause_index.py)
+"""
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from clause_index import (
+    ClauseIndex, clause_excerpt, extract_clauses, is_clause_lookup, is_contents_page, parse_clause_reference,
+    rebuild_document_clauses
+)
+
+SOLAS_PAGES = [
+    (11, "Regulation 9\nContainment of fire\n1 Purpose\nThe purpose of this regulation is to contain a fire."),
+    (12, "2.3 Protection of openings\n2.3.1 General\nOpenings shall be closed.\n2.4 Ventilation\nDucts ..."),
+]
+
+def is_lookup(text):
+    reference = parse_clause_reference(text)
+    return reference is not None and is_clause_lookup(text, reference)
+
+def test_parse_reference_with_document_and_unit():
+    reference = parse_clause_reference("SOLAS II-2 Reg 9.2.3")
+    assert reference.document_id == 'solas_chapter2'
+    assert reference.clause_key == '9.2.3'
+
+def test_parse_bare_number_requires_document():
+    assert parse_clause_reference("IGC 11.5").clause_key == '11.5'
+    assert parse_clause_reference("pressure 11.5 bar") is None
+
+def test_korean_unit_reference():
+    reference = parse_clause_reference("SOLAS 규칙 9.2.3 원문")
+    assert reference.clause_key == '9.2.3'
+
+def test_pure_clause_lookups():
+    assert is_lookup("SOLAS II-2 Reg 9.2.3")
+    assert is_lookup("SOLAS II-2 Reg 9.2.3 원문 보여줘")
+    assert is_lookup("IGC Code 11.5의 내용")
+
+def test_questions_about_clause_content_are_not_lookups():
+    assert not is_lookup("FSS Code Chapter 5 CO2 discharge time")
+    assert not is_lookup("SOLAS Reg 10 소화기 비치 기준은?")
+    assert not is_lookup("SOLAS II-2 Reg 9.2.3에서 A-60 구획의 요구사항은 무엇인가?")
+
+def test_lookup_requires_document():
+    assert not is_lookup("Chapter 9")
+    assert not is_lookup("Chapter 9 fire detection requirements")
+
+SHARED_PARAGRAPH_PAGES = [
+    (3, "CONTENTS\nRegulation 1 Application .......... 5\nRegulation 2 Definitions .......... 6\n"
+        "2.3 Ships constructed before ..... 5"),
+    (5, "Regulation 1\nApplication\n2.3 Ships constructed before 1 July 2012 shall comply ..."),
+    (6, "Regulation 2\nDefinitions\n1 Accommodation spaces are ...\n3 Cargo areas are spaces ..."),
+    (7, "Regulation 3\nFire pumps\n2.3 Each fire pump shall ..."),
+]
+
+def write_index(path, document_id, pages):
+    from lexical_index import LexicalIndexWriter
+
+    with LexicalIndexWriter(path) as writer:
+        for page_number, text in pages:
+            writer.upsert_page({'document_id': document_id, 'page_number': page_number, 'ocr_text': text})
+
+def test_extract_clauses_prefixes_unit_number():
+    keys = {(key, kind, page) for key, kind, page, _ in extract_clauses(SOLAS_PAGES)}
+    assert ('9', 'unit', 11) in keys
+    assert ('9.1', 'qualified', 11) in keys
+    assert ('2.3.1', 'raw', 12) in keys
+    assert ('9.2.3.1', 'qualified', 12) in keys
+    assert ('9.2.4', 'qualified', 12) in keys
+
+def test_extract_clauses_keeps_chapter_prefixed_numbers():
+    pages = [(40, "Chapter 11\n11.5 Dry chemical powder\nSystems shall ...")]
+    keys = [(key, kind) for key, kind, _, _ in extract_clauses(pages)]
+    assert ('11.5', 'qualified') in keys
+    assert '11.11.5' not in [key for key, _ in keys]
+
+def test_contents_pages_are_skipped():
+    assert is_contents_page(SHARED_PARAGRAPH_PAGES[0][1])
+    assert not is_contents_page(SHARED_PARAGRAPH_PAGES[1][1])
+    assert 3 not in {page for _, _, page, _ in extract_clauses(SHARED_PARAGRAPH_PAGES)}
+
+def test_clause_excerpt_stops_at_next_heading():
+    text = SOLAS_PAGES[1][1]
+    offset = text.index('2.3.1')
+    assert clause_excerpt(text, offset) == "2.3.1 General\nOpenings shall be closed."
+
+def test_lookup_from_index(tmp_path):
+    path = str(tmp_path / 'lexical_index.sqlite')
+    write_index(path, 'solas_chapter2', SOLAS_PAGES)
+
+    hit = ClauseIndex(path).lookup(parse_clause_reference("SOLAS II-2 Reg 9.2.3"))
+    assert (hit.document_id, hit.page_number) == ('solas_chapter2', 12)
+    assert hit.text[hit.offset:].startswith('2.3 Protection of openings')
+
+def test_unit_reference_ignores_shared_paragraph_numbers(tmp_path):
+    path = str(tmp_path / 'lexical_index.sqlite')
+    write_index(path, 'solas_chapter2', SHARED_PARAGRAPH_PAGES)
+    index = ClauseIndex(path)
+
+    hit = index.lookup(parse_clause_reference("SOLAS Reg 2.3"))
+    assert hit.page_number == 6
+    assert hit.text[hit.offset:].startswith('3 Cargo areas')
+
+    hit = index.lookup(parse_clause_reference("SOLAS Reg 3.2.3"))
+    assert hit.page_number == 7
+
+    # 규칙 4에는 2.3 단락이 없으므로 다른 규칙의 2.3으로 답하지 않음
+    assert index.lookup(parse_clause_reference("SOLAS Reg 4.2.3")) is None
+
+def test_bare_number_prefers_qualified_keys(tmp_path):
+    path = str(tmp_path / 'lexical_index.sqlite')
+    write_index(path, 'igc_code', [
+        (1, "1.1 Application\nThis Code applies ..."),
+        (40, "Chapter 11\n11.5 Dry chemical powder\nSystems shall ..."),
+    ])
+
+    assert ClauseIndex(path).lookup(parse_clause_reference("IGC 11.5")).page_number == 40
+    assert ClauseIndex(path).lookup(parse_clause_reference("IGC 1.1")).page_number == 1
+
+def test_old_clause_table_is_rebuilt(tmp_path):
+    path = str(tmp_path / 'lexical_index.sqlite')
+    write_index(path, 'solas_chapter2', SOLAS_PAGES)
+    conn = sqlite3.connect(path)
+    conn.execute('DROP TABLE clauses')
+    conn.execute('CREATE TABLE clauses (document_id TEXT, clause_key TEXT, page_number INTEGER, offset INTEGER)')
+    conn.commit()
+    conn.close()
+
+    write_index(path, 'igc_code', [(40, "Chapter 11\n11.5 Dry chemical powder")])
+    assert ClauseIndex(path).lookup(parse_clause_reference("SOLAS Reg 9.2.3")).page_number == 12
+
+def test_rebuild_replaces_document_clauses(tmp_path):
+    from lexical_index import LexicalIndexWriter
+
+    path = str(tmp_path / 'lexical_index.sqlite')
+    write_index(path, 'igc_code', [(1, "Chapter 11\n11.5 Powder")])
+    with LexicalIndexWriter(path) as writer:
+        writer.delete_document('igc_code')
+
+    conn = sqlite3.connect(path)
+    rebuild_document_clauses(conn, 'igc_code')
+    assert conn.execute('SELECT COUNT(*) FROM clauses').fetchone()[0] == 0
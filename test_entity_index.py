@@ -0,0 +1,70 @@
+"""
+엔티티 연결 테스트 (AWS 없이 실행: python -m pytest test_entity_index.py)
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity_index import AhoCorasick, EntityIndex, normalize
+
+ENTITIES = [
+    {'id': 'e-valve', 'name': 'valve', 'chunks': 120},
+    {'id': 'e-relief-valve', 'name': 'relief valve', 'chunks': 8},
+    {'id': 'e-valves', 'name': 'valves', 'chunks': 3},
+    {'id': 'e-fire-pump', 'name': 'fire pump', 'chunks': 12},
+    {'id': 'e-pump', 'name': 'pump', 'chunks': 40},
+    {'id': 'e-machinery-space', 'name': 'machinery space', 'chunks': 30},
+]
+
+SYNONYMS = {
+    'relief valve': ['안전 밸브'],
+    'machinery space': ['기관실'],
+    'unknown entity': ['무시'],
+}
+
+def linked(index, text, **kwargs):
+    return [match.entity_id for match in index.link(text, **kwargs)]
+
+def test_automaton_reports_overlapping_matches():
+    automaton = AhoCorasick()
+    for pattern in ('he', 'she', 'his', 'hers'):
+        automaton.add(pattern, pattern)
+    automaton.build()
+
+    matches = sorted((start, end, value) for start, end, value in automaton.iter_matches('ushers'))
+    assert matches == [(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')]
+
+def test_normalize_singularizes_and_drops_punctuation():
+    assert normalize("Relief-Valves, Pumps!") == 'relief valve pump'
+    assert normalize("class") == 'class'
+
+def test_longest_leftmost_match_wins():
+    index = EntityIndex(ENTITIES, synonyms=SYNONYMS)
+    assert linked(index, "Relief valve set pressure") == ['e-relief-valve']
+    assert linked(index, "fire pump capacity") == ['e-fire-pump']
+
+def test_plural_name_links_both_entities():
+    index = EntityIndex(ENTITIES, synonyms=SYNONYMS)
+    assert linked(index, "valves in the cargo line") == ['e-valve', 'e-valves']
+
+def test_word_boundaries_for_english():
+    index = EntityIndex(ENTITIES, synonyms=SYNONYMS)
+    assert linked(index, "pumpkin storage") == []
+
+def test_korean_synonyms_with_particles_and_no_spaces():
+    index = EntityIndex(ENTITIES, synonyms=SYNONYMS)
+    assert linked(index, "기관실의 환기 요구사항") == ['e-machinery-space']
+    assert linked(index, "안전밸브 설정 압력") == ['e-relief-valve']
+
+def test_synonyms_for_missing_entities_are_ignored():
+    index = EntityIndex(ENTITIES, synonyms=SYNONYMS)
+    assert linked(index, "무시") == []
+
+def test_max_chunk_count_skips_generic_entities():
+    index = EntityIndex(ENTITIES, synonyms=SYNONYMS)
+    assert linked(index, "valve and pump", max_chunk_count=50) == ['e-valves', 'e-pump']
+
+def test_search_lists_linked_then_contained_names():
+    index = EntityIndex(ENTITIES, synonyms=SYNONYMS)
+    assert index.search("pump") == ['e-pump', 'e-fire-pump']
@@ -0,0 +1,88 @@
+"""
+그래프 정적 레이아웃 테스트 (AWS 없이 실행: python -m pytest test_graph_layout.py)
+"""
+import math
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import graph_layout
+from graph_layout import LayoutCache, force_directed_layout
+
+def distance(positions, a, b):
+    return math.dist(positions[a], positions[b])
+
+def test_empty_and_single_node():
+    assert force_directed_layout([], []) == {}
+    assert set(force_directed_layout(['a'], [])) == {'a'}
+
+def test_layout_is_deterministic_and_centered():
+    nodes = [f"n{i}" for i in range(20)]
+    edges = [(nodes[i], nodes[i + 1]) for i in range(19)]
+
+    first = force_directed_layout(nodes, edges)
+    assert first == force_directed_layout(nodes, edges)
+    assert abs(sum(x for x, _ in first.values()) / len(nodes)) < 1e-3
+    assert abs(sum(y for _, y in first.values()) / len(nodes)) < 1e-3
+
+def test_connected_nodes_are_closer_than_unconnected():
+    nodes = ['a1', 'a2', 'a3', 'b1', 'b2', 'b3']
+    edges = [('a1', 'a2'), ('a2', 'a3'), ('a3', 'a1'), ('b1', 'b2'), ('b2', 'b3'), ('b3', 'b1')]
+    positions = force_directed_layout(nodes, edges, iterations=200)
+
+    within = max(distance(positions, 'a1', 'a2'), distance(positions, 'b1', 'b2'))
+    between = min(distance(positions, a, b) for a in ('a1', 'a2', 'a3') for b in ('b1', 'b2', 'b3'))
+    assert within < between
+
+def test_unknown_and_self_edges_are_ignored():
+    positions = force_directed_layout(['a', 'b'], [('a', 'a'), ('a', 'missing'), ('a', 'b')])
+    assert set(positions) == {'a', 'b'}
+
+def test_blocked_repulsion_matches_single_block(monkeypatch):
+    nodes = [f"n{i}" for i in range(30)]
+    edges = [(nodes[i], nodes[(i * 7) % 30]) for i in range(30)]
+    single = force_directed_layout(nodes, edges)
+
+    monkeypatch.setattr(graph_layout, 'REPULSION_BLOCK_SIZE', 4)
+    blocked = force_directed_layout(nodes, edges)
+    for node_id in nodes:
+        assert math.dist(single[node_id], blocked[node_id]) < 1e-2
+
+def test_layout_cache_computes_once_per_key(monkeypatch):
+    calls = []
+
+    def layout(node_ids, edges):
+        calls.append(tuple(node_ids))
+        return {node_id: (0.0, 0.0) for node_id in node_ids}
+
+    monkeypatch.setattr(graph_layout, 'force_directed_layout', layout)
+    cache = LayoutCache(max_entries=1)
+    cache.get_or_compute(('g', 1), ['a'], [])
+    cache.get_or_compute(('g', 1), ['a'], [])
+    cache.get_or_compute(('g', 2), ['b'], [])
+    cache.get_or_compute(('g', 1), ['a'], [])
+    assert calls == [('a',), ('b',), ('a',)]
+
+def test_concurrent_misses_compute_once(monkeypatch):
+    calls = []
+
+    def layout(node_ids, edges):
+        calls.append(tuple(node_ids))
+        time.sleep(0.05)
+        return {node_id: (0.0, 0.0) for node_id in node_ids}
+
+    monkeypatch.setattr(graph_layout, 'force_directed_layout', layout)
+    cache = LayoutCache()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute(('g', 1), ['a'], [])))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [('a',)]
+    assert len(results) == 4 and all(result is results[0] for result in results)
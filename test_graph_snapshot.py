@@ -0,0 +1,48 @@
+"""
+그래프 스냅샷 버전 테스트 (AWS 없이 실행: python -m pytest test_graph_snapshot.py)
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 스냅샷 모듈은 Neptune 클라이언트(boto3)를 import하므로 없는 환경에서는 건너뜀
+graph_snapshot = pytest.importorskip('graph_snapshot')
+
+class FakeSnapshotCache(graph_snapshot.GraphSnapshotCache):
+    """Neptune 대신 메모리의 노드/엣지를 반환"""
+
+    def __init__(self):
+        super().__init__()
+        self.nodes = [{'id': 'n1', 'labels': ['Chunk'], 'text': 'pump'}, {'id': 'n2', 'labels': ['Entity']}]
+        self.edges = [{'source': 'n1', 'target': 'n2', 'label': 'CONTAINS'}]
+
+    def _query(self, graph_id, query, parameters=None):
+        if 'count(n)' in query:
+            return [{'count': len(self.nodes)}]
+        if 'count(r)' in query:
+            return [{'count': len(self.edges)}]
+        if 'type(r)' in query:
+            return list(self.edges)
+        return list(self.nodes)
+
+def test_reload_without_changes_keeps_version():
+    cache = FakeSnapshotCache()
+    first = cache._load('g')
+    second = cache._load('g')
+
+    assert second is not first
+    assert (first.version, second.version) == (1, 1)
+
+def test_changed_content_bumps_version():
+    cache = FakeSnapshotCache()
+    cache._load('g')
+
+    cache.edges.append({'source': 'n2', 'target': 'n1', 'label': 'MENTIONED_IN'})
+    assert cache._load('g').version == 2
+
+    cache.nodes[0] = dict(cache.nodes[0], text='fire pump')
+    assert cache._load('g').version == 3
+    assert cache._load('g').version == 3
@@ -0,0 +1,76 @@
+"""
+BM25 색인/RRF 결합 테스트 (AWS 없이 실행: python -m pytest test_lexical_index.py)
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.references import PageReference
+from lexical_index import LexicalIndex, LexicalIndexWriter, build_match_query
+
+def test_clause_numbers_become_phrases():
+    assert build_match_query("SOLAS II-2 Reg 10.5.1") == '"solas" OR "ii 2" OR "reg" OR "10 5 1"'
+
+def test_stopwords_and_korean_are_dropped():
+    assert build_match_query("What are the requirements for A-60 bulkheads?") == '"a 60" OR "bulkheads"'
+    assert build_match_query("기관실 환기 요구사항") == ''
+
+def test_duplicate_terms_are_kept_once():
+    assert build_match_query("pump Pump PUMP 5") == '"pump" OR "5"'
+
+def test_search_ranks_clause_page_first(tmp_path):
+    path = str(tmp_path / 'lexical_index.sqlite')
+    with LexicalIndexWriter(path) as writer:
+        writer.upsert_page({'document_id': 'solas_chapter2', 'page_number': 40,
+                            'ocr_text': "10.5.1 Fixed fire-extinguishing systems in machinery spaces"})
+        writer.upsert_page({'document_id': 'solas_chapter2', 'page_number': 41,
+                            'ocr_text': "10.6 Fire-extinguishing arrangements in control stations"})
+
+    hits = LexicalIndex(path).search("Reg 10.5.1 machinery space")
+    assert [(hit.document_id, hit.page_number) for hit in hits] == [('solas_chapter2', '40')]
+
+def fusion_agent(kb_id='CDPB5AI6BH'):
+    agent_module = pytest.importorskip('agents.plan_execute_agent.agent')
+    agent = agent_module.PlanExecuteAgent.__new__(agent_module.PlanExecuteAgent)
+    agent.kb_id = kb_id
+    agent.retrieval_config = {'lexical': {'rrf_k': 60}}
+    return agent
+
+def vector_reference(chunk_id, raw_page_number, score=0.5):
+    """KB 벡터 검색 청크 참조 (CDPB5AI6BH 원본 페이지 번호는 0부터)"""
+    return PageReference(chunk_id, 'doc.pdf', f'CDPB5AI6BH/doc/{raw_page_number}', raw_page_number + 1, score,
+                         chunk_id=chunk_id, text=f"chunk {chunk_id}")
+
+def lexical_reference(agent, i, page_number):
+    """BM25 색인 페이지 참조 (에이전트와 같은 방식으로 생성, chunk_id 없음)"""
+    return agent._ocr_page_reference(f"bm25_{i}", 'doc', page_number, f"page {page_number} text", '', 'doc.pdf', 1.0)
+
+def test_rrf_fusion_merges_lexical_pages_with_vector_chunks():
+    agent = fusion_agent()
+    vector = [vector_reference('a', 0, 0.9), vector_reference('b', 1, 0.8), vector_reference('c', 2, 0.7)]
+    # OCR 페이지 3 = 원본 페이지 2 (청크 c와 같은 페이지), OCR 페이지 9는 BM25에만 있음
+    lexical = [lexical_reference(agent, 1, 3), lexical_reference(agent, 2, 9)]
+    fused = agent._fuse_results(vector, lexical)
+
+    assert [doc.id for doc in fused] == ['c', 'a', 'b', 'bm25_2']
+    assert fused[0].score == pytest.approx((1 / 63 + 1 / 61) / (2 / 61))
+    assert fused[0].text == 'chunk c'
+    # 결합 점수는 사본에만 반영
+    assert fused[0] is not vector[2] and vector[2].score == 0.7
+
+def test_rrf_fusion_scores_chunks_of_the_same_page_together():
+    agent = fusion_agent()
+    vector = [vector_reference('a', 0), vector_reference('b', 0), vector_reference('c', 1)]
+    lexical = [lexical_reference(agent, 1, 2)]
+    fused = agent._fuse_results(vector, lexical)
+
+    assert [doc.id for doc in fused] == ['c', 'a', 'b']
+    assert fused[1].score == fused[2].score
+
+def test_rrf_fusion_without_lexical_results_keeps_vector_order():
+    agent = fusion_agent()
+    vector = [vector_reference('a', 0), vector_reference('b', 1)]
+    assert agent._fuse_results(vector, []) is vector
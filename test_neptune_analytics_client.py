@@ -0,0 +1,100 @@
+"""
+Neptune Analytics 응답 스트림 파싱 테스트 (AWS 없이 실행: python -m pytest test_neptune_analytics_client.py)
+"""
+import io
+import json
+import os
+import sys
+import threading
+from collections import deque
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 클라이언트 모듈은 boto3를 import하므로 없는 환경에서는 건너뜀
+neptune_analytics_client = pytest.importorskip('neptune_analytics_client')
+iter_json_results = neptune_analytics_client.iter_json_results
+
+from botocore.exceptions import ReadTimeoutError
+
+def stream(payload):
+    return io.BytesIO(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+def test_items_are_parsed_across_chunk_boundaries():
+    rows = [{'id': f"x-amz-bedrock-kb-{i}", 'name': '배관 단열 ' * i, 'chunks': i} for i in range(50)]
+    assert list(iter_json_results(stream({'results': rows}), chunk_size=7)) == rows
+
+def test_multibyte_characters_split_between_chunks():
+    rows = [{'name': '기관실'}, {'name': '화물창'}]
+    assert list(iter_json_results(stream({'results': rows}), chunk_size=1)) == rows
+
+def test_empty_and_missing_results():
+    assert list(iter_json_results(stream({'results': []}))) == []
+    assert list(iter_json_results(stream({'error': 'none'}))) == []
+
+def test_results_after_other_keys():
+    payload = {'meta': {'results_count': 2}, 'results': [1, [2, 3]]}
+    assert list(iter_json_results(stream(payload), chunk_size=4)) == [1, [2, 3]]
+
+def test_truncated_payload_raises():
+    data = b'{"results": [{"id": 1}, {"id": '
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_results(io.BytesIO(data), chunk_size=8))
+
+class FailingPayload:
+    """data를 끝까지 읽기 전에 읽기 타임아웃을 내는 응답 스트림"""
+
+    def __init__(self, data, fail_after):
+        self.stream = io.BytesIO(data)
+        self.fail_after = fail_after
+
+    def read(self, size):
+        if self.stream.tell() >= self.fail_after:
+            raise ReadTimeoutError(endpoint_url='https://neptune-graph.us-west-2.amazonaws.com')
+        return self.stream.read(min(size, self.fail_after - self.stream.tell()))
+
+class FakeNeptune:
+    def __init__(self, payloads):
+        self.payloads = list(payloads)
+        self.calls = 0
+
+    def execute_query(self, **kwargs):
+        self.calls += 1
+        return {'payload': self.payloads.pop(0)}
+
+def client_with(payloads):
+    client = neptune_analytics_client.NeptuneAnalyticsClient.__new__(neptune_analytics_client.NeptuneAnalyticsClient)
+    client.client = FakeNeptune(payloads)
+    client.max_attempts = 3
+    client.base_delay = client.max_delay = 0.0
+    client.log_queries = False
+    client.metrics = deque(maxlen=10)
+    client._metrics_lock = threading.Lock()
+    return client
+
+ROWS = [{'id': f"n{i}"} for i in range(20)]
+DATA = json.dumps({'results': ROWS}).encode('utf-8')
+
+def test_execute_retries_payload_read_failure():
+    client = client_with([FailingPayload(DATA, fail_after=len(DATA) // 2), io.BytesIO(DATA)])
+
+    assert client.execute('g', 'MATCH (n) RETURN id(n) AS id') == ROWS
+    assert client.client.calls == 2
+    assert client.metrics[-1]['attempts'] == 2
+
+def test_streaming_read_failure_before_first_row_is_retried():
+    client = client_with([FailingPayload(DATA, fail_after=5), io.BytesIO(DATA)])
+    assert list(client.iter_results('g', 'MATCH (n) RETURN id(n) AS id')) == ROWS
+
+def test_streaming_read_failure_after_rows_stops_with_partial_error():
+    client = client_with([FailingPayload(DATA, fail_after=len(DATA) // 2), io.BytesIO(DATA)])
+    received = []
+
+    with pytest.raises(neptune_analytics_client.PartialResultsError) as error:
+        for row in client.iter_results('g', 'MATCH (n) RETURN id(n) AS id'):
+            received.append(row)
+
+    assert received == ROWS[:error.value.row_count] and 0 < len(received) < len(ROWS)
+    assert client.client.calls == 1
+    assert client.metrics[-1]['error']
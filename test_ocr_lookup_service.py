@@ -0,0 +1,62 @@
+"""
+OCR 조회 서비스 테스트 (AWS 없이 실행: python -m pytest test_ocr_lookup_service.py)
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 서비스 모듈은 boto3를 import하므로 없는 환경에서는 건너뜀
+ocr_lookup_service = pytest.importorskip('ocr_lookup_service')
+
+from core.page_cache import PageTextCache
+from core.references import PageReference
+
+class FakeDynamoDB:
+    def __init__(self, events):
+        self.events = events
+
+    def batch_get_item(self, RequestItems):
+        (table_name, request), = RequestItems.items()
+        self.events.append(('batch_get_item', [key['page_number'] for key in request['Keys']]))
+        items = [dict(key, ocr_text=f"ocr {key['page_number']}") for key in request['Keys']]
+        return {'Responses': {table_name: items}}
+
+@pytest.fixture
+def service(monkeypatch):
+    events = []
+    monkeypatch.setattr(ocr_lookup_service, 'get_ocr_snapshot', lambda: None)
+    monkeypatch.setattr(PageTextCache, '_load_from_ocr_store',
+                        lambda cache, document_id, page_number: events.append(('store_read', page_number)) or '')
+    monkeypatch.setattr(ocr_lookup_service.OCRLookupService, '_missing_pages', {})
+
+    service = ocr_lookup_service.OCRLookupService.__new__(ocr_lookup_service.OCRLookupService)
+    service.dynamodb = FakeDynamoDB(events)
+    service.ocr_table_name = 'ship-firefighting-ocr'
+    service.max_s3_workers = 2
+    service.last_lookup_failures = {}
+    return service, events
+
+def page_reference(page_number):
+    return PageReference(f"ref_{page_number}", 'solas_chapter2.pdf', f'PWRU19RDNE/solas_chapter2/{page_number}',
+                         page_number, 0.9)
+
+def test_explicit_page_number_skips_text_patterns(service):
+    service, _ = service
+    kb_response = {'references': [
+        {'page_number': 12, 'source': 'solas_page_3.pdf', 'content': 'see page 99'},
+        {'source': 'solas_page_3.pdf', 'content': 'see page 99'},
+    ]}
+    assert service.extract_reference_pages(kb_response) == [['12'], ['3', '99']]
+
+def test_no_store_reads_before_batch(service):
+    service, events = service
+    kb_response = {'references': [page_reference(15), page_reference(16), page_reference(15)]}
+
+    enhanced = service.enhance_kb_response_with_ocr(kb_response, kb_id='PWRU19RDNE', document_id='solas_chapter2')
+
+    assert events == [('batch_get_item', ['15', '16'])]
+    assert [ref.text for ref in enhanced['references']] == ['ocr 15', 'ocr 16', 'ocr 15']
+    assert all(ref.text == '' for ref in kb_response['references'])
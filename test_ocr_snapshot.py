@@ -0,0 +1,57 @@
+"""
+OCR 스냅샷 교체 테스트 (AWS 없이 실행: python -m pytest test_ocr_snapshot.py)
+"""
+import os
+import sqlite3
+import sys
+import zlib
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 스냅샷 모듈은 내보내기용 boto3를 import하므로 없는 환경에서는 건너뜀
+ocr_snapshot = pytest.importorskip('ocr_snapshot')
+
+def write_snapshot(path, text, mtime):
+    """export_ocr_snapshot과 같은 방식(임시 파일 작성 후 os.replace)으로 페이지 1개짜리 스냅샷 생성"""
+    tmp_path = path + '.tmp'
+    conn = sqlite3.connect(tmp_path)
+    conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+    conn.execute(f"CREATE TABLE pages ({', '.join(ocr_snapshot.PAGE_COLUMNS)}, "
+                 "PRIMARY KEY (document_id, page_number)) WITHOUT ROWID")
+    row = dict.fromkeys(ocr_snapshot.PAGE_COLUMNS, '')
+    row.update(document_id='solas_chapter2', page_number='3', ocr_text=zlib.compress(text.encode('utf-8')),
+               ocr_markdown=b'')
+    conn.execute(f"INSERT INTO pages VALUES ({', '.join('?' for _ in row)})", list(row.values()))
+    conn.commit()
+    conn.close()
+
+    os.replace(tmp_path, path)
+    os.utime(path, (mtime, mtime))
+
+@pytest.fixture
+def snapshot_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'ocr_snapshot.sqlite')
+    monkeypatch.setenv('OCR_SNAPSHOT_PATH', path)
+    monkeypatch.setattr(ocr_snapshot, '_snapshot', None)
+    monkeypatch.setattr(ocr_snapshot, '_snapshot_mtime', None)
+    return path
+
+def test_missing_file_returns_none(snapshot_path):
+    assert ocr_snapshot.get_ocr_snapshot() is None
+
+def test_replaced_file_is_reopened_and_old_connection_closed(snapshot_path):
+    write_snapshot(snapshot_path, 'old text', 1000)
+    old = ocr_snapshot.get_ocr_snapshot()
+    assert old.get_page('solas_chapter2', '3')['ocr_text'] == 'old text'
+    assert ocr_snapshot.get_ocr_snapshot() is old
+
+    write_snapshot(snapshot_path, 'new text', 2000)
+    new = ocr_snapshot.get_ocr_snapshot()
+
+    assert new is not old
+    assert new.get_page('solas_chapter2', '3')['ocr_text'] == 'new text'
+    # 이전 스냅샷을 들고 있던 호출자는 없음으로 처리되어 DynamoDB로 폴백
+    assert old.get_page('solas_chapter2', '3') is None
+    assert old.get_pages('solas_chapter2', ['3']) == {}
@@ -0,0 +1,68 @@
+"""
+의미 기반 답변 캐시 테스트 (AWS 없이 실행: python -m pytest test_semantic_cache.py)
+"""
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from semantic_cache import SemanticAnswerCache, normalize_query, query_signature
+
+def unit(angle):
+    """코사인 유사도가 cos(angle)인 2차원 단위 벡터"""
+    return [math.cos(angle), math.sin(angle)]
+
+def store(cache, query, embedding, kb_id='PWRU19RDNE', entity_ids=()):
+    cache.store(query, kb_id, query_signature(query, entity_ids), embedding, f"answer: {query}", [])
+
+def test_hit_above_threshold():
+    cache = SemanticAnswerCache(min_similarity=0.95)
+    store(cache, "CO2 system pressure in Reg 10", unit(0.0))
+
+    hit = cache.lookup(unit(0.2), 'PWRU19RDNE', query_signature("co2 system pressure of Reg 10"))
+    assert hit.content == "answer: CO2 system pressure in Reg 10"
+
+def test_miss_below_threshold():
+    cache = SemanticAnswerCache(min_similarity=0.95)
+    store(cache, "CO2 system pressure in Reg 10", unit(0.0))
+
+    # cos(0.4) ≈ 0.92
+    assert cache.lookup(unit(0.4), 'PWRU19RDNE', query_signature("CO2 system pressure in Reg 10")) is None
+
+def test_different_clause_number_is_a_miss():
+    cache = SemanticAnswerCache(min_similarity=0.95)
+    store(cache, "SOLAS Reg 10 portable extinguishers", unit(0.0))
+
+    assert cache.lookup(unit(0.0), 'PWRU19RDNE', query_signature("SOLAS Reg 11 portable extinguishers")) is None
+
+def test_different_linked_entity_is_a_miss():
+    cache = SemanticAnswerCache(min_similarity=0.95)
+    store(cache, "fire detection in machinery space", unit(0.0), entity_ids=['machinery space'])
+
+    signature = query_signature("fire detection in cargo hold", ['cargo hold'])
+    assert cache.lookup(unit(0.0), 'PWRU19RDNE', signature) is None
+
+def test_different_kb_is_a_miss():
+    cache = SemanticAnswerCache(min_similarity=0.95)
+    store(cache, "CO2 system pressure", unit(0.0))
+
+    assert cache.lookup(unit(0.0), 'CDPB5AI6BH', query_signature("CO2 system pressure")) is None
+
+def test_expired_entries_are_dropped():
+    cache = SemanticAnswerCache(min_similarity=0.95, ttl_seconds=-1)
+    store(cache, "CO2 system pressure", unit(0.0))
+
+    assert cache.lookup(unit(0.0), 'PWRU19RDNE', query_signature("CO2 system pressure")) is None
+
+def test_lru_eviction():
+    cache = SemanticAnswerCache(max_entries=2, min_similarity=0.95)
+    store(cache, "question 1", unit(0.0))
+    store(cache, "question 2", unit(1.0))
+    store(cache, "question 3", unit(2.0))
+
+    assert cache.lookup(unit(0.0), 'PWRU19RDNE', query_signature("question 1")) is None
+    assert cache.lookup(unit(2.0), 'PWRU19RDNE', query_signature("question 3")) is not None
+
+def test_normalize_query():
+    assert normalize_query("  CO2   시스템 압력은?  ") == "co2 시스템 압력은"
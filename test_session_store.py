@@ -0,0 +1,61 @@
+"""
+세션 대화 기록 저장소 테스트 (AWS 없이 실행: python -m pytest test_session_store.py)
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.references import PageReference
+from core.session_store import SessionStore
+
+def turn(store, session_id, index, answer_size=10, references=()):
+    store.append(session_id, {'role': 'user', 'content': f"question {index}"})
+    store.append(session_id, {'role': 'assistant', 'content': 'x' * answer_size, 'references': list(references)})
+
+def test_hot_turns_limit(tmp_path):
+    store = SessionStore(db_path=str(tmp_path / 'sessions.sqlite'), hot_turns=2)
+    for index in range(5):
+        turn(store, 's1', index)
+
+    history = store.get_history('s1')
+    assert len(history.hot) == 4
+    assert history.hot[0]['content'] == 'question 3'
+    assert [message['content'] for message in store.load_spilled('s1')][::2] == [
+        'question 0', 'question 1', 'question 2'
+    ]
+
+def test_byte_budget_keeps_latest_turn(tmp_path):
+    store = SessionStore(db_path=str(tmp_path / 'sessions.sqlite'), hot_turns=10, max_session_bytes=1000)
+    turn(store, 's1', 0, answer_size=800)
+    turn(store, 's1', 1, answer_size=5000)
+
+    history = store.get_history('s1')
+    assert len(history.hot) == 2
+    assert history.hot[0]['content'] == 'question 1'
+    assert store.session_report('s1')['spilled_messages'] == 2
+
+def test_spilled_references_keep_chunk_text(tmp_path):
+    store = SessionStore(db_path=str(tmp_path / 'sessions.sqlite'), hot_turns=1)
+    reference = PageReference('ref_1', 'doc.pdf', 'CDPB5AI6BH/doc/3', 4, 0.9, chunk_id='c1', text='chunk text')
+    turn(store, 's1', 0, references=[reference])
+    turn(store, 's1', 1)
+
+    restored = store.load_spilled('s1')[1]['references'][0]
+    assert isinstance(restored, PageReference)
+    assert restored.content == 'chunk text'
+
+def test_sessions_are_isolated(tmp_path):
+    store = SessionStore(db_path=str(tmp_path / 'sessions.sqlite'), hot_turns=1)
+    for index in range(3):
+        turn(store, 's1', index)
+    turn(store, 's2', 0)
+
+    store.clear('s1')
+    assert store.load_spilled('s1') == []
+    assert store.get_history('s2').hot[0]['content'] == 'question 0'
+
+def test_default_file_is_per_process(tmp_path, monkeypatch):
+    monkeypatch.setenv('SESSION_STORE_PATH', str(tmp_path / 'sessions.sqlite'))
+    store = SessionStore()
+    assert store.db_path == str(tmp_path / f"sessions_{os.getpid()}.sqlite")
@@ -130,8 +130,8 @@ try:
             print(f"  - 이미지 소스: DynamoDB 조회")
             
             # DynamoDB 연결 테스트
-            doc_id = agent._extract_document_id_from_source(metadata.get('x-amz-bedrock-kb-source-uri', ''))
-            page_num = str(int(metadata.get('x-amz-bedrock-kb-document-page-number', 1)))
+            doc_id = first_result.document_id
+            page_num = first_result.page_key.split('/')[-1]
             
             ocr_text = agent._get_ocr_from_dynamodb(doc_id, page_num)
             image_url = agent._get_image_url_from_dynamodb(doc_id, page_num)
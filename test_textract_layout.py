@@ -0,0 +1,112 @@
+"""
+Textract 레이아웃 → Markdown 변환 테스트 (AWS 없이 실행: python -m pytest test_textract_layout.py)
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from textract_layout import encode_block_index, render_page_markdown
+
+def block(block_id, block_type, children=(), text=None, box=(0.1, 0.1, 0.8, 0.1), **fields):
+    """Textract 블록 (CHILD 관계와 bbox 포함)"""
+    item = dict(fields, Id=block_id, BlockType=block_type, Geometry={'BoundingBox': dict(
+        Left=box[0], Top=box[1], Width=box[2], Height=box[3]
+    )})
+    if children:
+        item['Relationships'] = [{'Type': 'CHILD', 'Ids': list(children)}]
+    if text is not None:
+        item['Text'] = text
+    return item
+
+def cell(block_id, row, column, words, **fields):
+    return block(block_id, 'CELL', [word_id for word_id, _ in words], RowIndex=row, ColumnIndex=column, **fields)
+
+def table_blocks(box=(0.1, 0.5, 0.8, 0.3)):
+    words = [('w1', 'Space'), ('w2', 'Class'), ('w3', 'Machinery'), ('w4', 'A-60'), ('w5', 'a|b')]
+    return [
+        block('t1', 'TABLE', ['c1', 'c2', 'c3', 'c4'], box=box),
+        cell('c1', 1, 1, [words[0]]),
+        cell('c2', 1, 2, [words[1]]),
+        cell('c3', 2, 1, [words[2]]),
+        cell('c4', 2, 2, [words[3], words[4]]),
+    ] + [block(word_id, 'WORD', text=text) for word_id, text in words]
+
+def test_layout_blocks_in_reading_order():
+    blocks = [
+        block('h', 'LAYOUT_HEADER', ['l0']),
+        block('t', 'LAYOUT_TITLE', ['l1']),
+        block('s', 'LAYOUT_SECTION_HEADER', ['l2']),
+        block('p', 'LAYOUT_TEXT', ['l3', 'l4']),
+        block('list', 'LAYOUT_LIST', ['i1', 'i2']),
+        block('i1', 'LAYOUT_TEXT', ['l5']),
+        block('i2', 'LAYOUT_TEXT', ['l6']),
+        block('n', 'LAYOUT_PAGE_NUMBER', ['l7']),
+        block('l0', 'LINE', text='SOLAS Consolidated Edition'),
+        block('l1', 'LINE', text='Regulation 10'),
+        block('l2', 'LINE', text='2 Water supply systems'),
+        block('l3', 'LINE', text='Fire pumps shall be'),
+        block('l4', 'LINE', text='independently driven.'),
+        block('l5', 'LINE', text='sea inlet valves'),
+        block('l6', 'LINE', text='isolating valves'),
+        block('l7', 'LINE', text='42'),
+    ]
+    markdown, _ = render_page_markdown(blocks)
+
+    assert markdown == (
+        "# Regulation 10\n\n## 2 Water supply systems\n\n"
+        "Fire pumps shall be\nindependently driven.\n\n- sea inlet valves\n- isolating valves"
+    )
+
+def test_table_renders_with_header_row_and_escaped_pipes():
+    blocks = [block('lt', 'LAYOUT_TABLE', box=(0.1, 0.5, 0.8, 0.3))] + table_blocks()
+    markdown, block_index = render_page_markdown(blocks)
+
+    assert markdown == "| Space | Class |\n|---|---|\n| Machinery | A-60 a\\|b |"
+    assert [entry[0] for entry in block_index] == ['TABLE']
+
+def test_spanned_and_selected_cells():
+    blocks = [
+        block('t1', 'TABLE', ['c1', 'c2', 'c3']),
+        cell('c1', 1, 1, [('w1', 'Item')], ColumnSpan=2),
+        cell('c2', 2, 1, [('w2', 'CO2')]),
+        cell('c3', 2, 2, [('x1', '')]),
+        block('w1', 'WORD', text='Item'),
+        block('w2', 'WORD', text='CO2'),
+        block('x1', 'SELECTION_ELEMENT', SelectionStatus='SELECTED'),
+    ]
+    markdown, _ = render_page_markdown(blocks)
+
+    assert markdown == "| Item |  |\n|---|---|\n| CO2 | ☑ |"
+
+def test_unmatched_tables_are_appended_after_layout_text():
+    blocks = [block('p', 'LAYOUT_TEXT', ['l1'], box=(0.1, 0.1, 0.8, 0.1)), block('l1', 'LINE', text='Table 10.1')]
+    blocks += table_blocks()
+    markdown, block_index = render_page_markdown(blocks)
+
+    assert markdown.startswith("Table 10.1\n\n| Space | Class |")
+    assert [entry[0] for entry in block_index] == ['TEXT', 'TABLE']
+
+def test_lines_are_used_without_layout_blocks():
+    blocks = [block('l1', 'LINE', text='first'), block('l2', 'LINE', text='second')]
+    assert render_page_markdown(blocks)[0] == "first\n\nsecond"
+
+def test_block_index_offsets_match_markdown():
+    blocks = [
+        block('t', 'LAYOUT_TITLE', ['l1'], box=(0.12345, 0.2, 0.5, 0.05)),
+        block('p', 'LAYOUT_TEXT', ['l2']),
+        block('l1', 'LINE', text='Regulation 10'),
+        block('l2', 'LINE', text='Fire pumps'),
+    ]
+    markdown, block_index = render_page_markdown(blocks)
+
+    assert block_index[0][:5] == ['TITLE', 0.1235, 0.2, 0.5, 0.05]
+    assert [markdown[entry[5]:entry[6]] for entry in block_index] == ['# Regulation 10', 'Fire pumps']
+
+def test_block_index_encoding_round_trip():
+    _, block_index = render_page_markdown([block('t', 'LAYOUT_TITLE', ['l1']), block('l1', 'LINE', text='제10규칙')])
+    encoded = encode_block_index(block_index)
+
+    assert ' ' not in encoded
+    assert json.loads(encoded) == block_index
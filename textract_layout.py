@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Textract LAYOUT/TABLES 분석 결과를 페이지별 Markdown으로 변환
+표 구조, 섹션 헤더, 읽기 순서를 보존하고 UI 하이라이트용 블록 인덱스 생성
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+# 페이지 머리글/바닥글/쪽번호는 검색 품질을 떨어뜨리므로 Markdown에서 제외
+SKIPPED_LAYOUT_TYPES = {'LAYOUT_HEADER', 'LAYOUT_FOOTER', 'LAYOUT_PAGE_NUMBER'}
+
+def render_page_markdown(blocks: List[Dict]) -> Tuple[str, List[List]]:
+    """한 페이지의 Textract 블록을 Markdown과 블록 인덱스로 변환
+
+    블록 인덱스 항목: [타입, left, top, width, height, md_start, md_end]
+    (좌표는 페이지 대비 비율, md_start/md_end는 Markdown 문자 오프셋)
+    """
+
+    blocks_by_id = {block['Id']: block for block in blocks}
+    layout_blocks = [block for block in blocks if block['BlockType'].startswith('LAYOUT_')]
+    tables = [block for block in blocks if block['BlockType'] == 'TABLE']
+
+    # LAYOUT_LIST의 자식 LAYOUT_TEXT는 리스트 항목으로만 출력
+    list_children = set()
+    for block in layout_blocks:
+        if block['BlockType'] == 'LAYOUT_LIST':
+            list_children.update(_child_ids(block))
+
+    sections = []
+    used_tables = set()
+
+    # LAYOUT 블록은 Textract가 읽기 순서대로 반환
+    for block in layout_blocks:
+        block_type = block['BlockType']
+        if block_type in SKIPPED_LAYOUT_TYPES or block['Id'] in list_children:
+            continue
+
+        if block_type == 'LAYOUT_TABLE':
+            table = _match_table(block, tables, used_tables)
+            if table:
+                used_tables.add(table['Id'])
+                sections.append((block, _render_table(table, blocks_by_id)))
+                continue
+
+        text = _render_layout_block(block, blocks_by_id)
+        if text:
+            sections.append((block, text))
+
+    # LAYOUT 블록과 매칭되지 않은 표는 페이지 끝에 추가
+    for table in tables:
+        if table['Id'] not in used_tables:
+            sections.append((table, _render_table(table, blocks_by_id)))
+
+    # LAYOUT 정보가 없는 페이지는 LINE 단위로 폴백
+    if not sections:
+        for block in blocks:
+            if block['BlockType'] == 'LINE':
+                sections.append((block, block.get('Text', '')))
+
+    markdown_parts = []
+    block_index = []
+    offset = 0
+
+    for block, text in sections:
+        if markdown_parts:
+            offset += 2  # 구분자 '\n\n'
+
+        markdown_parts.append(text)
+        block_index.append([_short_type(block['BlockType'])] + _bbox(block) + [offset, offset + len(text)])
+        offset += len(text)
+
+    return '\n\n'.join(markdown_parts), block_index
+
+def encode_block_index(block_index: List[List]) -> str:
+    """블록 인덱스를 DynamoDB 저장용 압축 JSON 문자열로 변환 (float 미지원 회피)"""
+
+    return json.dumps(block_index, separators=(',', ':'), ensure_ascii=False)
+
+def _render_layout_block(block: Dict, blocks_by_id: Dict) -> str:
+    """LAYOUT 블록 하나를 Markdown 문단으로 변환"""
+
+    block_type = block['BlockType']
+
+    if block_type == 'LAYOUT_LIST':
+        items = []
+        for child_id in _child_ids(block):
+            child = blocks_by_id.get(child_id)
+            if child:
+                item_text = _collect_line_text(child, blocks_by_id, separator=' ')
+                if item_text:
+                    items.append(f"- {item_text}")
+        return '\n'.join(items)
+
+    if block_type == 'LAYOUT_TITLE':
+        text = _collect_line_text(block, blocks_by_id, separator=' ')
+        return f"# {text}" if text else ''
+
+    if block_type == 'LAYOUT_SECTION_HEADER':
+        text = _collect_line_text(block, blocks_by_id, separator=' ')
+        return f"## {text}" if text else ''
+
+    return _collect_line_text(block, blocks_by_id, separator='\n')
+
+def _render_table(table: Dict, blocks_by_id: Dict) -> str:
+    """TABLE 블록을 Markdown 표로 변환 (병합 셀은 첫 칸에만 텍스트)"""
+
+    cells = {}
+    row_count = 0
+    column_count = 0
+
+    for cell_id in _child_ids(table):
+        cell = blocks_by_id.get(cell_id)
+        if not cell or cell['BlockType'] != 'CELL':
+            continue
+
+        row = cell['RowIndex']
+        column = cell['ColumnIndex']
+        row_count = max(row_count, row + cell.get('RowSpan', 1) - 1)
+        column_count = max(column_count, column + cell.get('ColumnSpan', 1) - 1)
+        cells[(row, column)] = _collect_word_text(cell, blocks_by_id)
+
+    if not cells:
+        return ''
+
+    rows = []
+    for row in range(1, row_count + 1):
+        values = [cells.get((row, column), '').replace('|', '\\|') for column in range(1, column_count + 1)]
+        rows.append('| ' + ' | '.join(values) + ' |')
+
+        # 첫 행을 헤더로 사용
+        if row == 1:
+            rows.append('|' + '---|' * column_count)
+
+    return '\n'.join(rows)
+
+def _match_table(layout_block: Dict, tables: List[Dict], used_tables: set) -> Optional[Dict]:
+    """LAYOUT_TABLE과 가장 많이 겹치는 TABLE 블록 찾기"""
+
+    best_table = None
+    best_overlap = 0.0
+
+    for table in tables:
+        if table['Id'] in used_tables:
+            continue
+
+        overlap = _overlap_area(layout_block, table)
+        if overlap > best_overlap:
+            best_table = table
+            best_overlap = overlap
+
+    return best_table
+
+def _overlap_area(a: Dict, b: Dict) -> float:
+    """두 블록 bbox의 교집합 면적"""
+
+    a_left, a_top, a_width, a_height = _bbox(a)
+    b_left, b_top, b_width, b_height = _bbox(b)
+
+    width = min(a_left + a_width, b_left + b_width) - max(a_left, b_left)
+    height = min(a_top + a_height, b_top + b_height) - max(a_top, b_top)
+
+    return width * height if width > 0 and height > 0 else 0.0
+
+def _collect_line_text(block: Dict, blocks_by_id: Dict, separator: str) -> str:
+    """LAYOUT 블록의 자식 LINE 텍스트 결합"""
+
+    lines = []
+    for child_id in _child_ids(block):
+        child = blocks_by_id.get(child_id)
+        if not child:
+            continue
+
+        if child['BlockType'] == 'LINE':
+            lines.append(child.get('Text', ''))
+        elif child['BlockType'].startswith('LAYOUT_'):
+            lines.append(_collect_line_text(child, blocks_by_id, separator))
+
+    return separator.join(line for line in lines if line).strip()
+
+def _collect_word_text(cell: Dict, blocks_by_id: Dict) -> str:
+    """CELL 블록의 자식 WORD 텍스트 결합"""
+
+    words = []
+    for child_id in _child_ids(cell):
+        child = blocks_by_id.get(child_id)
+        if not child:
+            continue
+
+        if child['BlockType'] == 'WORD':
+            words.append(child.get('Text', ''))
+        elif child['BlockType'] == 'SELECTION_ELEMENT' and child.get('SelectionStatus') == 'SELECTED':
+            words.append('☑')
+
+    return ' '.join(words)
+
+def _child_ids(block: Dict) -> List[str]:
+    """CHILD 관계의 블록 ID 목록"""
+
+    ids = []
+    for relationship in block.get('Relationships', []):
+        if relationship['Type'] == 'CHILD':
+            ids.extend(relationship['Ids'])
+    return ids
+
+def _bbox(block: Dict) -> List[float]:
+    """블록의 bbox [left, top, width, height] (소수점 4자리)"""
+
+    box = block.get('Geometry', {}).get('BoundingBox', {})
+    return [
+        round(float(box.get('Left', 0.0)), 4),
+        round(float(box.get('Top', 0.0)), 4),
+        round(float(box.get('Width', 0.0)), 4),
+        round(float(box.get('Height', 0.0)), 4)
+    ]
+
+def _short_type(block_type: str) -> str:
+    """블록 타입 축약 (LAYOUT_SECTION_HEADER → SECTION_HEADER)"""
+
+    return block_type.replace('LAYOUT_', '')
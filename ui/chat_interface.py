@@ -7,11 +7,14 @@ from typing import Dict, List
 class ChatInterface:
     """채팅 인터페이스 관리 클래스"""
     
-    def __init__(self, agent_manager):
+    def __init__(self, agent_manager, session_store):
         self.agent_manager = agent_manager
+        self.session_store = session_store
     
     def render_chat_history(self):
         """채팅 히스토리 렌더링"""
+        self._render_spilled_history()
+        
         for message in st.session_state.messages:
             with st.chat_message(message["role"]):
                 if message["role"] == "assistant":
@@ -19,6 +22,29 @@ class ChatInterface:
                 else:
                     self._render_user_message(message)
     
+    def _render_spilled_history(self):
+        """디스크로 이동된 이전 대화 (펼칠 때만 로드, 참조는 요약만 표시)"""
+        report = self.session_store.session_report(st.session_state.session_id)
+        if not report['spilled_messages']:
+            return
+        
+        with st.expander(f"📁 이전 대화 {report['spilled_messages']}개"):
+            if not st.checkbox("이전 대화 불러오기", key="load_spilled_history"):
+                return
+            
+            for message in self.session_store.load_spilled(st.session_state.session_id):
+                icon = "🧑" if message["role"] == "user" else "🤖"
+                st.markdown(f"{icon} {message['content']}")
+                
+                references = message.get("references", [])
+                if references:
+                    ref_summary = ", ".join([
+                        f"[{i}] {ref.get('source_file', ref.get('source', 'Unknown'))}"
+                        for i, ref in enumerate(references, 1)
+                    ])
+                    st.caption(f"📚 참조: {ref_summary}")
+                st.markdown("---")
+    
     def _render_user_message(self, message: Dict):
         """사용자 메시지 렌더링"""
         st.markdown(message["content"])
@@ -7,8 +7,9 @@ import uuid
 class Sidebar:
     """사이드바 관리 클래스"""
     
-    def __init__(self, agent_manager):
+    def __init__(self, agent_manager, session_store):
         self.agent_manager = agent_manager
+        self.session_store = session_store
     
     def render_sidebar(self):
         """사이드바 전체 렌더링"""
@@ -170,8 +171,15 @@ class Sidebar:
         """세션 제어"""
         st.markdown("### 📋 세션")
         
+        # 현재 세션 대화 기록 메모리 사용량
+        report = self.session_store.session_report(st.session_state.session_id)
+        st.caption(
+            f"💾 대화 기록 {report['hot_bytes'] / 1024:.1f} KB "
+            f"(메모리 {report['hot_messages']}개 / 디스크 {report['spilled_messages']}개)"
+        )
+        
         if st.button("🔄 새 세션", use_container_width=True):
-            st.session_state.messages = []
+            self.session_store.clear(st.session_state.session_id)
             st.session_state.session_id = str(uuid.uuid4())
             # 지식 그래프 초기화
             st.session_state.show_knowledge_graph = False